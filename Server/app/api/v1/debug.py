@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from ...core.config import settings
+from ...core.profiling import SamplingProfiler, ProfilerBusyError
+from ...core.security import get_current_admin
+from ...services.evaluation_scheduler import evaluation_scheduler
+from ...services.reconciliation_service import UpstreamTaskReconciler
+from ...services.browser_use_key_pool import key_pool
+
+router = APIRouter(prefix="/debug", tags=["Debug"])
+
+@router.get("/profile")
+async def profile(
+    seconds: float = Query(10.0, gt=0),
+    interval: float = Query(0.01, ge=0.001, le=1.0),
+    format: str = Query("collapsed", pattern="^(collapsed|json)$"),
+    include_idle: bool = Query(False),
+    current_user = Depends(get_current_admin)
+):
+    """Sample every thread of this worker for `seconds` and return the aggregated stacks"""
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if seconds > settings.PROFILING_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be at most {settings.PROFILING_MAX_SECONDS}")
+
+    profiler = SamplingProfiler(interval=interval, include_idle=include_idle)
+    try:
+        # Sample from a worker thread so the event loop keeps serving (and shows up in) the profile
+        await run_in_threadpool(profiler.run, seconds)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if format == "json":
+        return profiler.summary()
+    return PlainTextResponse(profiler.collapsed())
+
+@router.get("/evaluations")
+async def in_flight_evaluations(current_user = Depends(get_current_admin)):
+    """Evaluations currently holding a concurrency slot, with time left before the watchdog stops them"""
+    return {
+        "maxConcurrency": evaluation_scheduler.max_concurrency,
+        "inFlight": evaluation_scheduler.in_flight()
+    }
+
+@router.get("/browser-use-keys")
+async def browser_use_keys(current_user = Depends(get_current_admin)):
+    """Load and health of each pooled Browser Use API key in this worker"""
+    return {"keys": key_pool.snapshot()}
+
+@router.post("/reconcile")
+async def reconcile_upstream_tasks(current_user = Depends(get_current_admin)):
+    """Run an upstream task reconciliation pass now and return its drift report"""
+    try:
+        return await run_in_threadpool(UpstreamTaskReconciler().reconcile)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Reconciliation failed: {str(e)}")
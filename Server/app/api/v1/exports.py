@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from ...controllers.export_controller import ExportController
+from ...services.export_service import FORMATS
+from ...core.security import get_current_user
+from datetime import datetime
+from typing import Optional
+import uuid
+
+router = APIRouter(prefix="/exports", tags=["Exports"])
+
+@router.get("/{dataset}")
+async def export_dataset(
+    dataset: str,
+    export_format: str = Query("jsonl", alias="format"),
+    task_id: Optional[uuid.UUID] = Query(None, alias="taskId"),
+    agent_id: Optional[uuid.UUID] = Query(None, alias="agentId"),
+    since: Optional[datetime] = Query(None, description="Only submissions made at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only submissions made before this time"),
+    include_details: bool = Query(False, alias="includeDetails", description="Add each evaluation's resultDetails"),
+    current_user = Depends(get_current_user)
+):
+    """
+    Stream ``submissions``, ``evaluations`` or ``leaderboard`` rows as ``jsonl``, ``csv`` or ``parquet``.
+    Rows are read and sent in chunks, so exports of any size use constant server memory.
+    """
+    controller = ExportController()
+    body = await controller.export(dataset, export_format, current_user, task_id, agent_id, since, until, include_details)
+    return StreamingResponse(
+        body,
+        media_type=FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{export_format}"'}
+    )
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Header, Response
 from sqlalchemy.orm import Session
 from ...db.database import get_db
 from fastapi import BackgroundTasks
@@ -7,12 +7,17 @@ from ...schemas.submission_schema import (
     SubmissionCreate, 
     SubmissionResponse, 
     SubmissionListResponse,
+    SubmissionSearchResponse,
     LeaderboardResponse,
     SubmissionStatusResponse,
     SubmissionControlRequest,
-    SubmissionControlResponse
+    SubmissionControlResponse,
+    StageAnalyticsResponse
 )
-from ...core.security import get_current_user
+from ...core.security import get_current_user, get_current_admin
+from datetime import datetime
+from typing import List, Optional
+from ...models.enums import SubmissionStatus
 import uuid
 
 router = APIRouter(prefix="/submissions", tags=["Submissions"])
@@ -21,11 +26,19 @@ router = APIRouter(prefix="/submissions", tags=["Submissions"])
 async def submit_agent(
     submission: SubmissionCreate,
     background_tasks: BackgroundTasks,  
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
+    """
+    Submit an agent for evaluation on a task.
+    
+    Send an ``Idempotency-Key`` header to make retries safe: repeats with the same key return the
+    original submission (marked ``Idempotent-Replayed: true``) instead of starting another evaluation.
+    """
     controller = SubmissionController(db)
-    return await controller.create_submission(submission, current_user.id, background_tasks)  
+    return await controller.create_submission(submission, current_user.id, background_tasks, idempotency_key, response)  
 
 @router.get("", response_model=SubmissionListResponse)
 async def get_my_submissions(
@@ -42,6 +55,51 @@ async def get_my_submissions(
         limit=limit
     )
 
+@router.get("/search", response_model=SubmissionSearchResponse)
+async def search_submissions(
+    status: Optional[List[SubmissionStatus]] = Query(None, description="Repeat to match any of several statuses"),
+    task_id: Optional[uuid.UUID] = Query(None, alias="taskId"),
+    agent_id: Optional[uuid.UUID] = Query(None, alias="agentId"),
+    min_score: Optional[float] = Query(None, alias="minScore"),
+    max_score: Optional[float] = Query(None, alias="maxScore"),
+    since: Optional[datetime] = Query(None, description="Submitted at or after"),
+    until: Optional[datetime] = Query(None, description="Submitted before"),
+    sort_by: str = Query("submittedAt", alias="sortBy", pattern="^(submittedAt|score)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="nextCursor of the previous page"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Search your submissions by status, task, agent, score range and submission time.
+    
+    Results are paged with a cursor: pass the ``nextCursor`` of one page to get the next, keeping
+    the same filters and sort. Sorting by score only returns submissions that have been scored.
+    """
+    controller = SubmissionController(db)
+    return await controller.search_submissions(
+        current_user.id, status, task_id, agent_id, min_score, max_score, since, until, sort_by, order, limit, cursor
+    )
+
+@router.get("/analytics/stages", response_model=StageAnalyticsResponse)
+async def get_stage_analytics(
+    task_id: Optional[uuid.UUID] = Query(None, alias="taskId"),
+    agent_id: Optional[uuid.UUID] = Query(None, alias="agentId"),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+    group_by: str = Query("task", alias="groupBy", pattern="^(task|agent|none)$"),
+    bucket: Optional[str] = Query(None, pattern="^(hour|day)$"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin)
+):
+    """
+    Latency percentiles for each submission stage (time spent QUEUED, PROCESSING, ... and total),
+    grouped by task or agent and optionally bucketed by hour or day.
+    """
+    controller = SubmissionController(db)
+    return await controller.get_stage_analytics(task_id, agent_id, since, until, group_by, bucket)
+
 @router.get("/{submission_id}", response_model=SubmissionResponse)
 async def get_submission(
     submission_id: str,
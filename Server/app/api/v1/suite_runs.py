@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, BackgroundTasks
+from fastapi.responses import StreamingResponse
+from ...controllers.suite_run_controller import SuiteRunController
+from ...schemas.suite_run_schema import SuiteRunCreate, SuiteRunResponse
+from ...core.security import get_current_user
+import uuid
+
+router = APIRouter(prefix="/suite-runs", tags=["Suite Runs"])
+
+@router.post("", response_model=SuiteRunResponse)
+async def create_suite_run(
+    request: SuiteRunCreate,
+    background_tasks: BackgroundTasks,
+    current_user = Depends(get_current_user)
+):
+    """
+    Evaluate an agent on every task matching the filter. One submission is created per task and all
+    of them are scheduled at once.
+    """
+    controller = SuiteRunController()
+    return await controller.create_suite_run(request, current_user.id, background_tasks)
+
+@router.get("/{suite_run_id}", response_model=SuiteRunResponse)
+async def get_suite_run(
+    suite_run_id: uuid.UUID,
+    current_user = Depends(get_current_user)
+):
+    controller = SuiteRunController()
+    return await controller.get_suite_run(suite_run_id, current_user.id)
+
+@router.get("/{suite_run_id}/stream")
+async def stream_suite_run(
+    suite_run_id: uuid.UUID,
+    current_user = Depends(get_current_user)
+):
+    """Per-task results as newline-delimited JSON while the suite runs, ending with a summary line"""
+    controller = SuiteRunController()
+    return StreamingResponse(await controller.stream_suite_run(suite_run_id, current_user.id), media_type="application/x-ndjson")
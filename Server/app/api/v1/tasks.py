@@ -1,7 +1,15 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, BackgroundTasks, Request
 from ...db.database import get_db
 from ...controllers.task_controller import TaskController
-from ...schemas.task_schema import TaskCreate, TaskUpdate, TaskResponse, TaskListResponse
+from ...schemas.task_schema import (
+    TaskCreate,
+    TaskUpdate,
+    TaskResponse,
+    TaskListResponse,
+    TaskRescoreRequest,
+    TaskRescoreJobResponse,
+    TaskImportResponse
+)
 from ...core.security import get_current_user, get_current_admin
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
@@ -14,6 +22,22 @@ async def create_task(
     controller = TaskController()
     return await controller.create_task(task, current_user.id)
 
+@router.post("/import", response_model=TaskImportResponse)
+async def import_tasks(
+    request: Request,
+    dry_run: bool = Query(False, alias="dryRun", description="Validate without creating anything"),
+    current_user = Depends(get_current_admin)
+):
+    """
+    Create many tasks at once. The body is a JSON array of task definitions (same shape as
+    ``POST /tasks``) or one definition per line (JSONL).
+
+    Every definition is checked before anything is written. If any are invalid, the response is a
+    422 listing every problem by item or line, and no tasks are created.
+    """
+    controller = TaskController()
+    return await controller.import_tasks(await request.body(), dry_run)
+
 @router.get("", response_model=TaskListResponse)
 async def get_tasks(
     skip: int = Query(0, ge=0),
@@ -45,4 +69,33 @@ async def delete_task(
 ):
     controller = TaskController()
     await controller.delete_task(task_id)
-    return {"message": "Task deleted successfully"}
\ No newline at end of file
+    return {"message": "Task deleted successfully"}
+
+@router.post("/{task_id}/rescore", response_model=TaskRescoreJobResponse)
+async def rescore_task(
+    task_id: str,
+    request: TaskRescoreRequest,
+    background_tasks: BackgroundTasks,
+    current_user = Depends(get_current_admin)
+):
+    """
+    Recompute stored evaluation scores and ranks for a task using its current configuration.
+    """
+    controller = TaskController()
+    return await controller.rescore_task(task_id, request, background_tasks)
+
+@router.get("/{task_id}/rescore/{job_id}", response_model=TaskRescoreJobResponse)
+async def get_rescore_job(
+    task_id: str,
+    job_id: str,
+    current_user = Depends(get_current_admin)
+):
+    """
+    Progress of a rescore job.
+
+    Jobs live in the memory of the worker that started them, so with several workers this can
+    return 404 for a job running elsewhere, and a restart loses them. Start a new job with
+    ``resumeFrom`` set to the last reported cursor to continue an interrupted one.
+    """
+    controller = TaskController()
+    return await controller.get_rescore_job(task_id, job_id)
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, Query
+from ...controllers.webhook_controller import WebhookController
+from ...schemas.webhook_schema import WebhookCreate, WebhookResponse, WebhookDeliveryListResponse
+from ...core.security import get_current_user
+from typing import List
+import uuid
+
+router = APIRouter(prefix="/webhooks", tags=["Webhooks"])
+
+@router.post("", response_model=WebhookResponse)
+async def create_webhook(
+    request: WebhookCreate,
+    current_user = Depends(get_current_user)
+):
+    """
+    Get a POST when your submissions complete or fail, instead of polling their status. Give a
+    submissionId to only hear about that submission.
+
+    The response contains the signing secret, which is not shown again. Each POST carries
+    ``X-RealEvals-Signature: t=<timestamp>,v1=<signature>``, where the signature is the hex HMAC-SHA256
+    of ``"<timestamp>.<raw body>"`` with the secret. The body is ``{"deliveryId", "webhookId", "events": [...]}``.
+    """
+    controller = WebhookController()
+    return await controller.create_webhook(request, current_user.id)
+
+@router.get("", response_model=List[WebhookResponse])
+async def list_webhooks(
+    current_user = Depends(get_current_user)
+):
+    controller = WebhookController()
+    return await controller.list_webhooks(current_user.id)
+
+@router.delete("/{webhook_id}")
+async def delete_webhook(
+    webhook_id: uuid.UUID,
+    current_user = Depends(get_current_user)
+):
+    controller = WebhookController()
+    return await controller.delete_webhook(webhook_id, current_user.id)
+
+@router.get("/{webhook_id}/deliveries", response_model=WebhookDeliveryListResponse)
+async def list_webhook_deliveries(
+    webhook_id: uuid.UUID,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    current_user = Depends(get_current_user)
+):
+    """Delivery attempts for a webhook, newest first"""
+    controller = WebhookController()
+    return await controller.list_deliveries(webhook_id, current_user.id, skip, limit)
@@ -0,0 +1,33 @@
+import uuid
+from datetime import datetime
+from typing import Iterator, Optional
+from ..services.export_service import ExportService
+from ..models.models import UserRole
+from ..core import tracing
+
+class ExportController:
+    def __init__(self):
+        self.export_service = ExportService()
+
+    @tracing.traced()
+    async def export(
+        self,
+        dataset: str,
+        export_format: str,
+        current_user,
+        task_id: Optional[uuid.UUID] = None,
+        agent_id: Optional[uuid.UUID] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        include_details: bool = False
+    ) -> Iterator[bytes]:
+        """
+        Validate the export, then return its body as a lazy byte stream. Admins export every user's
+        rows, everyone else only rows of their own submissions.
+        """
+        self.export_service.validate(dataset, export_format, include_details)
+        is_admin = current_user.role in (UserRole.ADMIN, "ADMIN")
+        chunks = self.export_service.iter_chunks(
+            dataset, task_id, agent_id, None if is_admin else current_user.id, since, until, include_details
+        )
+        return self.export_service.stream(export_format, self.export_service.columns(dataset, include_details), chunks)
@@ -1,147 +1,204 @@
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
+from starlette.concurrency import run_in_threadpool
 from ..services.submission_service import SubmissionService
+from ..services.submission_event_service import SubmissionEventService
+from ..services.admission_service import admission_service
+from ..services.evaluation_scheduler import evaluation_scheduler
+from ..services.idempotency_service import idempotency_store, request_fingerprint
 from ..schemas.submission_schema import (
     SubmissionCreate, 
     SubmissionResponse, 
     SubmissionListResponse, 
+    SubmissionSearchResponse,
     EvaluationResultResponse, 
     LeaderboardResponse,
     SubmissionStatusResponse,
     SubmissionControlRequest,
-    SubmissionControlResponse
+    SubmissionControlResponse,
+    StageAnalyticsResponse
 )
 from sqlalchemy.orm import Session
 import uuid
 from fastapi import BackgroundTasks
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+from ..core import tracing
+from ..core.config import settings
+from ..models.enums import SubmissionStatus
 
 class SubmissionController:
     def __init__(self, db=None):
         self._db = db
         self.submission_service = SubmissionService()
 
-    async def create_submission(self, submission_data: SubmissionCreate, user_id: uuid.UUID, background_tasks: BackgroundTasks) -> SubmissionResponse:
+    @tracing.traced()
+    async def create_submission(
+        self,
+        submission_data: SubmissionCreate,
+        user_id: uuid.UUID,
+        background_tasks: BackgroundTasks,
+        idempotency_key: Optional[str] = None,
+        response: Optional[Response] = None
+    ) -> SubmissionResponse:
+        if submission_data.trials > settings.SUBMISSION_MAX_TRIALS:
+            raise HTTPException(status_code=400, detail=f"trials must be at most {settings.SUBMISSION_MAX_TRIALS}")
+        if idempotency_key is not None and not 0 < len(idempotency_key) <= 255:
+            raise HTTPException(status_code=400, detail="Idempotency-Key must be 1 to 255 characters")
         try:
-            submission = self.submission_service.create_submission(user_id, submission_data.agentId, submission_data.taskId)
+            created = {}
+            
+            def create():
+                admission_service.admit(user_id)
+                created.update(self.submission_service.create_submission(
+                    user_id, submission_data.agentId, submission_data.taskId, submission_data.trials,
+                    idempotency_key=idempotency_key
+                ))
+                return created
+            
+            if idempotency_key:
+                # Retries with the same key get the original submission instead of a second evaluation
+                fingerprint = request_fingerprint(submission_data.agentId, submission_data.taskId, submission_data.trials)
+                submission_id, replayed = await run_in_threadpool(idempotency_store.run, user_id, idempotency_key, fingerprint, create)
+                if replayed:
+                    if response is not None:
+                        response.headers["Idempotent-Replayed"] = "true"
+                    return self._format_submission_response(self.submission_service._get_full_submission(submission_id))
+            else:
+                create()
             
             # Pass options to the process_submission method if provided
             options = submission_data.options if hasattr(submission_data, 'options') else None
-            background_tasks.add_task(self.submission_service.process_submission, submission["id"], options)
-            return self._format_submission_response(submission)
+            evaluation_scheduler.expect(created["id"])
+            background_tasks.add_task(tracing.propagate(self.submission_service.process_submission), created["id"], options)
+            return self._format_submission_response(created)
+        except HTTPException as e:
+            if e.status_code in (422, 429):
+                raise
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             raise HTTPException(status_code=400, detail=str(e))
 
+    @tracing.traced()
     async def get_user_submissions(self, user_id: uuid.UUID, skip: int = 0, limit: int = 20) -> SubmissionListResponse:
         result = self.submission_service.get_user_submissions(user_id, skip, limit)
         return SubmissionListResponse(items=[self._format_submission_response(sub) for sub in result["items"]], total=result["total"])
     
+    @tracing.traced()
+    async def search_submissions(
+        self,
+        user_id: uuid.UUID,
+        statuses: Optional[List[SubmissionStatus]] = None,
+        task_id: Optional[uuid.UUID] = None,
+        agent_id: Optional[uuid.UUID] = None,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        sort_by: str = "submittedAt",
+        order: str = "desc",
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> SubmissionSearchResponse:
+        if min_score is not None and max_score is not None and min_score > max_score:
+            raise HTTPException(status_code=400, detail="minScore must not be greater than maxScore")
+        if since and until and since >= until:
+            raise HTTPException(status_code=400, detail="since must be before until")
+        result = self.submission_service.search_submissions(
+            user_id, statuses, task_id, agent_id, min_score, max_score, since, until, sort_by, order, limit, cursor
+        )
+        return SubmissionSearchResponse(
+            items=[self._format_submission_response(sub) for sub in result["items"]],
+            nextCursor=result["nextCursor"]
+        )
+    
+    @tracing.traced()
     async def get_submission_details(self, submission_id: uuid.UUID, user_id: uuid.UUID) -> SubmissionResponse:
         try:
             submission = self.submission_service._get_full_submission(submission_id)
             if not submission:
                 raise HTTPException(status_code=404, detail="Submission not found")
-            if submission.userId != user_id:
+            if str(submission["userId"]) != str(user_id):
                 raise HTTPException(status_code=403, detail="You do not have permission to access this submission")
             return self._format_submission_response(submission)
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
     
+    @tracing.traced()
     async def get_submission_status(self, submission_id: uuid.UUID, user_id: uuid.UUID) -> SubmissionStatusResponse:
         """Get detailed status of a submission including Browser Use task progress"""
         try:
             submission = self.submission_service._get_full_submission(submission_id)
             if not submission:
                 raise HTTPException(status_code=404, detail="Submission not found")
-            if submission.userId != user_id:
+            if str(submission["userId"]) != str(user_id):
                 raise HTTPException(status_code=403, detail="You do not have permission to access this submission")
             
             # Since get_submission_status doesn't exist in the service, we'll create status details here
             status_details = {
-                'status': submission.status,
-                'task_status': 'COMPLETED' if submission.status == 'COMPLETED' else 'IN_PROGRESS',
+                'status': submission["status"],
+                'task_status': 'COMPLETED' if submission["status"] == 'COMPLETED' else 'IN_PROGRESS',
                 'steps_completed': None,
                 'active_details': {}
             }
             
             # Extract Browser Use task ID if available
-            browser_use_task_id = None
+            browser_use_task_id = submission.get("browserUseTaskId")
             video_url = None
             screenshots = None
             
-            if submission.evaluation and submission.evaluation.resultDetails:
-                details = submission.evaluation.resultDetails
+            evaluation = submission.get("evaluation")
+            if evaluation and evaluation.get("resultDetails"):
+                details = evaluation["resultDetails"]
                 browser_use_task_id = details.get('browser_use_task_id')
                 video_url = details.get('video_url')
                 screenshots = details.get('screenshots')
             
             # Calculate progress percentage
             progress = None
-            if submission.status == 'PROCESSING':
+            if submission["status"] == 'PROCESSING':
                 # Simulate progress for in-progress submissions
                 progress = 50  # Default to 50% for processing submissions
             
             return SubmissionStatusResponse(
                 submissionId=submission_id,
-                status=str(submission.status),
+                status=str(submission["status"]),
                 browserUseTaskId=browser_use_task_id,
                 taskStatus=status_details.get('task_status'),
                 stepsCompleted=status_details.get('steps_completed'),
                 progress=progress,
                 activeDetails=status_details.get('active_details'),
-                evaluation=submission.evaluation.resultDetails if hasattr(submission, 'evaluation') and submission.evaluation else None,
+                evaluation=evaluation.get("resultDetails") if evaluation else None,
                 videoUrl=video_url,
                 screenshots=screenshots
             )
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
     
+    @tracing.traced()
     async def control_submission(self, submission_id: uuid.UUID, user_id: uuid.UUID, control: SubmissionControlRequest) -> SubmissionControlResponse:
         """Control a submission (pause, resume, stop)"""
         try:
             submission = self.submission_service._get_full_submission(submission_id)
             if not submission:
                 raise HTTPException(status_code=404, detail="Submission not found")
-            if submission.userId != user_id:
+            if str(submission["userId"]) != str(user_id):
                 raise HTTPException(status_code=403, detail="You do not have permission to control this submission")
             
             action = control.action.lower()
-            success = False
-            message = None
-            
-            # Since the service methods don't exist, we'll simulate the control actions
-            if action == "pause":
-                # Simulate pausing by updating the submission status
-                if submission.status == "PROCESSING":
-                    # In a real implementation, we would update the database
-                    success = True
-                    message = "Submission paused successfully"
-                else:
-                    message = "Can only pause submissions that are in PROCESSING state"
-            elif action == "resume":
-                # Simulate resuming by updating the submission status
-                if submission.status == "PENDING":
-                    # In a real implementation, we would update the database
-                    success = True
-                    message = "Submission resumed successfully"
-                else:
-                    message = "Can only resume submissions that are in PENDING state"
-            elif action == "stop":
-                # Simulate stopping by updating the submission status
-                if submission.status in ["PROCESSING", "PENDING", "QUEUED"]:
-                    # In a real implementation, we would update the database
-                    success = True
-                    message = "Submission stopped successfully"
-                else:
-                    message = "Can only stop submissions that are not already completed or failed"
-            else:
-                raise HTTPException(status_code=400, detail=f"Invalid action: {action}")
+            outcome = self.submission_service.control_submission(submission, action)
             
             return SubmissionControlResponse(
                 submissionId=submission_id,
                 action=action,
-                success=success,
-                message=message
+                success=outcome["success"],
+                message=outcome["message"]
             )
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
     
@@ -151,7 +208,7 @@ class SubmissionController:
             evaluation = submission.get('evaluation')
             
             # Extract Browser Use task ID if available
-            browser_use_task_id = None
+            browser_use_task_id = submission.get('browserUseTaskId')
             if evaluation and isinstance(evaluation, dict) and evaluation.get('resultDetails') and 'browser_use_task_id' in evaluation.get('resultDetails', {}):
                 browser_use_task_id = evaluation['resultDetails']['browser_use_task_id']
             
@@ -165,10 +222,12 @@ class SubmissionController:
                     score=evaluation.get('score'),
                     timeTaken=evaluation.get('timeTaken'),
                     accuracy=evaluation.get('accuracy'),
-                    resultDetails=evaluation.get('resultDetails')
+                    resultDetails=evaluation.get('resultDetails'),
+                    cached=bool((evaluation.get('resultDetails') or {}).get('cached'))
                 ) if evaluation and evaluation.get('score') is not None and evaluation.get('timeTaken') is not None and evaluation.get('accuracy') is not None else None,
                 rank=submission.get('leaderboard_entry', {}).get('rank') if submission.get('leaderboard_entry') else None,
-                browserUseTaskId=browser_use_task_id
+                browserUseTaskId=browser_use_task_id,
+                trials=submission.get('trials') or 1
             )
         else:
             # Original object-based format
@@ -189,12 +248,14 @@ class SubmissionController:
                     score=evaluation.score,
                     timeTaken=evaluation.timeTaken,
                     accuracy=evaluation.accuracy,
-                    resultDetails=evaluation.resultDetails
+                    resultDetails=evaluation.resultDetails,
+                    cached=bool((evaluation.resultDetails or {}).get('cached'))
                 ) if evaluation and hasattr(evaluation, 'score') and hasattr(evaluation, 'timeTaken') and hasattr(evaluation, 'accuracy') and hasattr(evaluation, 'resultDetails') else None,
                 rank=submission.leaderboard_entry.rank if hasattr(submission, 'leaderboard_entry') and submission.leaderboard_entry else None,
                 browserUseTaskId=browser_use_task_id
             )
     
+    @tracing.traced()
     async def get_leaderboard(self, task_id: uuid.UUID) -> list[LeaderboardResponse]:
         try:
             leaderboard_entries = self.submission_service.get_leaderboard(task_id)
@@ -202,26 +263,28 @@ class SubmissionController:
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
             
+    @tracing.traced()
     async def get_user_submissions_by_task(self, user_id: uuid.UUID, task_id: uuid.UUID, skip: int = 0, limit: int = 20) -> SubmissionListResponse:
         """Get all submissions of a user for a specific task"""
         try:
-            # Implement this method in the submission service
-            if hasattr(self.submission_service, 'get_user_submissions_by_task'):
-                result = self.submission_service.get_user_submissions_by_task(user_id, task_id, skip, limit)
-                return SubmissionListResponse(
-                    items=[self._format_submission_response(sub) for sub in result["items"]], 
-                    total=result["total"]
-                )
-            else:
-                # Fallback to filtering all user submissions
-                all_submissions = self.submission_service.get_user_submissions(user_id, 0, 1000)
-                task_submissions = [s for s in all_submissions["items"] if str(s.taskId) == str(task_id)]
-                
-                # Apply pagination
-                paginated = task_submissions[skip:skip+limit]
-                return SubmissionListResponse(
-                    items=[self._format_submission_response(sub) for sub in paginated], 
-                    total=len(task_submissions)
-                )
+            result = self.submission_service.get_user_submissions_by_task(user_id, task_id, skip, limit)
+            return SubmissionListResponse(
+                items=[self._format_submission_response(sub) for sub in result["items"]], 
+                total=result["total"]
+            )
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
+
+    @tracing.traced()
+    async def get_stage_analytics(
+        self,
+        task_id: Optional[uuid.UUID] = None,
+        agent_id: Optional[uuid.UUID] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        group_by: str = "task",
+        bucket: Optional[str] = None
+    ) -> StageAnalyticsResponse:
+        """Per-stage latency percentiles computed from the submission event log"""
+        result = SubmissionEventService().get_stage_latency(task_id, agent_id, since, until, group_by, bucket)
+        return StageAnalyticsResponse(**result)
@@ -0,0 +1,65 @@
+import asyncio
+import json
+import uuid
+from typing import AsyncIterator
+from fastapi import HTTPException, BackgroundTasks
+from starlette.concurrency import run_in_threadpool
+from ..services.suite_run_service import SuiteRunService, RUNNING
+from ..services.submission_event_service import TERMINAL_STATUSES
+from ..services.admission_service import admission_service
+from ..schemas.suite_run_schema import SuiteRunCreate, SuiteRunResponse
+from ..core import tracing
+from ..core.config import settings
+
+class SuiteRunController:
+    def __init__(self):
+        self.suite_run_service = SuiteRunService()
+
+    @tracing.traced()
+    async def create_suite_run(self, request: SuiteRunCreate, user_id: uuid.UUID, background_tasks: BackgroundTasks) -> SuiteRunResponse:
+        if request.trials > settings.SUBMISSION_MAX_TRIALS:
+            raise HTTPException(status_code=400, detail=f"trials must be at most {settings.SUBMISSION_MAX_TRIALS}")
+        difficulty = request.difficulty.value if request.difficulty else None
+        tasks = self.suite_run_service.select_tasks(difficulty, request.webArenaEnvironment)
+        admission_service.admit(user_id, count=len(tasks))
+
+        suite_run = self.suite_run_service.create_suite_run(
+            user_id, request.agentId, tasks, difficulty, request.webArenaEnvironment, request.trials
+        )
+        background_tasks.add_task(tracing.propagate(self.suite_run_service.dispatch), suite_run["submissionIds"])
+        return SuiteRunResponse(**self.suite_run_service.get_suite_run(suite_run["id"]))
+
+    @tracing.traced()
+    async def get_suite_run(self, suite_run_id: uuid.UUID, user_id: uuid.UUID) -> SuiteRunResponse:
+        suite_run = self.suite_run_service.get_suite_run(suite_run_id)
+        self._check_owner(suite_run, user_id)
+        return SuiteRunResponse(**suite_run)
+
+    async def stream_suite_run(self, suite_run_id: uuid.UUID, user_id: uuid.UUID) -> AsyncIterator[str]:
+        """
+        Check access, then return an NDJSON stream: one ``result`` line per task as it finishes and a
+        final ``summary`` line once the whole suite has finished.
+        """
+        suite_run = await run_in_threadpool(self.suite_run_service.get_suite_run, suite_run_id)
+        self._check_owner(suite_run, user_id)
+
+        async def lines():
+            current = suite_run
+            sent = set()
+            while True:
+                for result in current["results"]:
+                    if result["status"] in TERMINAL_STATUSES and result["submissionId"] not in sent:
+                        sent.add(result["submissionId"])
+                        yield json.dumps({"type": "result", **result}) + "\n"
+                if current["status"] != RUNNING:
+                    summary = SuiteRunResponse(**current).model_dump(mode="json", exclude={"results"})
+                    yield json.dumps({"type": "summary", **summary}) + "\n"
+                    return
+                await asyncio.sleep(settings.SUITE_RUN_STREAM_POLL_SECONDS)
+                current = await run_in_threadpool(self.suite_run_service.get_suite_run, suite_run_id)
+
+        return lines()
+
+    def _check_owner(self, suite_run: dict, user_id: uuid.UUID):
+        if str(suite_run["userId"]) != str(user_id):
+            raise HTTPException(status_code=403, detail="You do not have permission to access this suite run")
@@ -1,6 +1,16 @@
-from fastapi import HTTPException
-from ..services.task_service import TaskService
-from ..schemas.task_schema import TaskCreate, TaskUpdate, TaskResponse, TaskListResponse
+from fastapi import HTTPException, BackgroundTasks
+from ..services.task_service import TaskService, decode_import
+from ..services.rescore_service import RescoreService
+from ..schemas.task_schema import (
+    TaskCreate,
+    TaskUpdate,
+    TaskResponse,
+    TaskListResponse,
+    TaskRescoreRequest,
+    TaskRescoreJobResponse,
+    TaskImportResponse
+)
+from ..core import tracing
 import uuid
 
 class TaskController:
@@ -13,6 +23,11 @@ class TaskController:
         task = self.task_service.create_task(task_dict)
         return TaskResponse(**task)
 
+    @tracing.traced()
+    async def import_tasks(self, body: bytes, dry_run: bool = False) -> TaskImportResponse:
+        result = self.task_service.import_tasks(decode_import(body), dry_run)
+        return TaskImportResponse(**result)
+
     async def get_tasks(self, skip: int = 0, limit: int = 10) -> TaskListResponse:
         tasks = self.task_service.get_tasks(skip, limit)
         total = len(tasks)
@@ -72,3 +87,28 @@ class TaskController:
             self.task_service.delete_task(task_uuid)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid task ID format")
+
+    async def rescore_task(self, task_id: str, request: TaskRescoreRequest, background_tasks: BackgroundTasks) -> TaskRescoreJobResponse:
+        try:
+            task_uuid = uuid.UUID(task_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid task ID format")
+
+        # Fail fast on unknown tasks before scheduling the job
+        self.task_service.get_task(task_uuid)
+
+        rescore_service = RescoreService()
+        job = rescore_service.start_job(task_uuid, request.batchSize, request.resumeFrom)
+        background_tasks.add_task(tracing.propagate(rescore_service.run_job), job["id"])
+        return TaskRescoreJobResponse(**job)
+
+    async def get_rescore_job(self, task_id: str, job_id: str) -> TaskRescoreJobResponse:
+        try:
+            task_uuid = uuid.UUID(task_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid task ID format")
+
+        job = RescoreService().get_job(job_id)
+        if str(uuid.UUID(job["taskId"])) != str(task_uuid):
+            raise HTTPException(status_code=404, detail=f"Rescore job with ID {job_id} not found")
+        return TaskRescoreJobResponse(**job)
@@ -0,0 +1,28 @@
+import uuid
+from typing import List
+from ..services.webhook_service import WebhookService
+from ..schemas.webhook_schema import WebhookCreate, WebhookResponse, WebhookDeliveryResponse, WebhookDeliveryListResponse
+from ..core import tracing
+
+class WebhookController:
+    def __init__(self):
+        self.webhook_service = WebhookService()
+
+    @tracing.traced()
+    async def create_webhook(self, request: WebhookCreate, user_id: uuid.UUID) -> WebhookResponse:
+        webhook = self.webhook_service.create_webhook(user_id, str(request.url), request.submissionId)
+        return WebhookResponse(**webhook)
+
+    @tracing.traced()
+    async def list_webhooks(self, user_id: uuid.UUID) -> List[WebhookResponse]:
+        return [WebhookResponse(**webhook) for webhook in self.webhook_service.list_webhooks(user_id)]
+
+    @tracing.traced()
+    async def delete_webhook(self, webhook_id: uuid.UUID, user_id: uuid.UUID):
+        self.webhook_service.delete_webhook(webhook_id, user_id)
+        return {"success": True, "message": "Webhook deleted"}
+
+    @tracing.traced()
+    async def list_deliveries(self, webhook_id: uuid.UUID, user_id: uuid.UUID, skip: int, limit: int) -> WebhookDeliveryListResponse:
+        result = self.webhook_service.list_deliveries(webhook_id, user_id, skip, limit)
+        return WebhookDeliveryListResponse(items=[WebhookDeliveryResponse(**row) for row in result["items"]], total=result["total"])
@@ -12,6 +12,10 @@ class Settings(BaseSettings):
     PORT: int
     DATABASE_URL: str
     DATABASE_LOGGING: bool
+    DATABASE_BACKEND: str = "supabase"  # "supabase" or "memory" (benchmarks and offline load tests)
+    DB_QUERY_BUDGET: int = 50  # Max queries per request before warning, 0 disables
+    DB_REPEATED_QUERY_THRESHOLD: int = 10  # Same query shape this many times in one request is flagged as N+1, 0 disables
+    DB_QUERY_BUDGET_ENFORCE: bool = False  # Fail over-budget requests with 500 instead of warning (CI/tests)
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
@@ -19,8 +23,102 @@ class Settings(BaseSettings):
     CORS_ORIGINS: str
     CORS_CREDENTIALS: bool
     LOG_LEVEL: str
+    METRICS_ENABLED: bool = True  # Serve Prometheus metrics on /metrics
+
+    # Tracing (OTLP/JSON spans to a local file and/or an OTLP/HTTP collector)
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORT_FILE: str = ""  # e.g. ./traces/spans.jsonl
+    TRACING_OTLP_ENDPOINT: str = ""  # e.g. http://localhost:4318
+
+    # Profiling: admin-only sampling endpoint, and opt-in per-request cProfile via the X-Profile header
+    PROFILING_ENABLED: bool = True
+    PROFILING_MAX_SECONDS: float = 60.0
+    PROFILING_REQUEST_ENABLED: bool = False
+    PROFILING_OUTPUT_DIR: str = "./profiles"
     ADMIN_SECRET_KEY: str
     BROWSER_USE_API_KEY: str = "your_api_key_here"  # Default placeholder, should be set in .env
+    BROWSER_USE_BASE_URL: str = "https://api.browser-use.com/api/v1"  # Point at browser_use_simulator.py for load tests
+    BROWSER_USE_LOOKUP_CACHE_SECONDS: float = 1.0  # How long a task status/details lookup is reused
+    # Key pool: JSON list of keys, each a string or {"key", "maxConcurrentTasks", "ratePerMinute"}; empty uses BROWSER_USE_API_KEY
+    BROWSER_USE_API_KEYS: str = ""
+    BROWSER_USE_KEY_MAX_CONCURRENT_TASKS: int = 0  # Default per-key task limit, 0 for unlimited
+    BROWSER_USE_KEY_RATE_LIMIT_PER_MINUTE: float = 0  # Default per-key request rate, 0 for unlimited
+    BROWSER_USE_KEY_COOLDOWN_SECONDS: float = 30  # Time a key is skipped after a 429 or repeated failures
+    BROWSER_USE_KEY_ACQUIRE_TIMEOUT_SECONDS: float = 60  # Max wait for a key with spare capacity
+
+    # Record/replay of Browser Use HTTP traffic: record, replay or empty for neither
+    BROWSER_USE_CASSETTE_MODE: str = ""
+    BROWSER_USE_CASSETTE_DIR: str = "./cassettes"  # One <taskId>.jsonl cassette per upstream task
+    BROWSER_USE_CASSETTE_SPEED: float = 1.0  # Replay timing multiplier, 0 serves final responses at once
+
+    # Submission admission control (429 + Retry-After); set a limit to 0 to disable it
+    SUBMISSION_ADMISSION_ENABLED: bool = True
+    SUBMISSION_RATE_LIMIT_PER_MINUTE: float = 30  # Per user
+    SUBMISSION_RATE_LIMIT_BURST: int = 10
+    SUBMISSION_MAX_QUEUE_DEPTH: int = 500  # Submissions QUEUED, PENDING or PROCESSING
+    SUBMISSION_MAX_ESTIMATED_WAIT_SECONDS: int = 1800  # Backlog / recent completion throughput
+    SUBMISSION_THROUGHPUT_WINDOW_SECONDS: int = 300
+    SUBMISSION_ADMISSION_REFRESH_SECONDS: float = 1.0  # How often queue depth and throughput are re-read
+    SUBMISSION_RETRY_AFTER_SECONDS: int = 30  # Retry-After when no throughput estimate is available
+
+    # Idempotency-Key handling on submission creation
+    IDEMPOTENCY_TTL_SECONDS: int = 86400  # How long a key maps to the submission it created
+
+    # Bulk task import
+    TASK_IMPORT_MAX_TASKS: int = 5000
+    TASK_IMPORT_CHUNK_SIZE: int = 200  # Tasks inserted per write
+
+    # Bulk exports
+    EXPORT_CHUNK_SIZE: int = 500  # Submissions read per query while streaming an export
+
+    # Completion webhooks
+    WEBHOOKS_ENABLED: bool = True
+    WEBHOOK_MAX_PER_USER: int = 20
+    WEBHOOK_BATCH_WINDOW_SECONDS: float = 2.0  # Events for one webhook within this window go in one POST
+    WEBHOOK_BATCH_MAX_EVENTS: int = 50
+    WEBHOOK_TIMEOUT_SECONDS: float = 10
+    WEBHOOK_MAX_ATTEMPTS: int = 8
+    WEBHOOK_RETRY_BASE_SECONDS: float = 10  # Doubles after each failed attempt
+    WEBHOOK_RETRY_MAX_SECONDS: float = 3600
+    WEBHOOK_DELIVERY_WORKERS: int = 4  # Concurrent deliveries per process
+    WEBHOOK_ALLOW_PRIVATE_URLS: bool = False  # Local development only: allow http and loopback/private addresses
+
+    # Multi-trial submissions
+    SUBMISSION_MAX_TRIALS: int = 10
+    SUBMISSION_TRIALS_EARLY_STOP_MIN: int = 3  # Completed trials before early stopping is considered
+    SUBMISSION_TRIALS_EARLY_STOP_HALF_WIDTH: float = 2.0  # Stop once the 95% score interval is within ± this, 0 disables
+
+    # Suite runs (one agent against a filtered task collection)
+    SUITE_RUN_MAX_TASKS: int = 200
+    SUITE_RUN_STREAM_POLL_SECONDS: float = 1.0  # How often the result stream checks for finished tasks
+
+    # Evaluation concurrency and watchdog
+    EVALUATION_MAX_CONCURRENCY: int = 20  # Evaluations running at once per process
+    EVALUATION_TIMEOUT_GRACE_SECONDS: float = 30  # Added to a task's maxTimeAllowed before the watchdog stops it
+    EVALUATION_WATCHDOG_INTERVAL_SECONDS: float = 1.0
+
+    # What runs an evaluation: simulated (random results), browser_use (live tasks) or replay (recorded traces)
+    EVALUATION_EXECUTOR: str = "simulated"
+    EVALUATION_REPLAY_DIR: str = "./traces/replay"  # <taskId>*.json traces, falling back to default*.json
+    EVALUATION_REPLAY_SPEED: float = 1.0  # Playback speed multiplier, 0 replays instantly
+    EVALUATION_TRACE_RECORD_DIR: str = ""  # Save live Browser Use runs here as replay traces, empty disables
+
+    # Recovery of submissions left behind by a crashed or restarted worker
+    RECOVERY_ENABLED: bool = True
+    RECOVERY_INTERVAL_SECONDS: float = 60  # 0 runs the pass once at startup only
+    RECOVERY_HEARTBEAT_SECONDS: float = 15  # How often workers mark their submissions alive
+    RECOVERY_STALE_SECONDS: float = 90  # No heartbeat for this long means the worker is gone
+
+    # Reconciliation of live Browser Use tasks against submissions
+    RECONCILER_ENABLED: bool = True
+    RECONCILER_INTERVAL_SECONDS: float = 300
+    RECONCILER_PAGE_SIZE: int = 100  # Upstream tasks listed per request
+    RECONCILER_STOP_ORPHANS: bool = False  # Only report drift unless on; leave off when environments share an API key
+    RECONCILER_ORPHAN_GRACE_SECONDS: float = 900  # Upstream tasks younger than this are never stopped
+
+    # Evaluation result cache (opt-in)
+    RESULT_CACHE_ENABLED: bool = False
+    RESULT_CACHE_TTL_SECONDS: int = 3600
     
     # Supabase settings
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
@@ -0,0 +1,242 @@
+"""
+Process-local metrics registry with Prometheus text exposition.
+
+Counters, gauges and histograms are registered once at import time and updated from the
+HTTP middleware, the services and the instrumented database client. ``render_metrics()``
+produces the body served on ``/metrics``.
+"""
+import bisect
+import threading
+import time
+from typing import Dict, List, Tuple, Sequence
+from fastapi import Request
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+EVALUATION_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts (non-cumulative), plus sum and count
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, **labels) -> "_Timer":
+        return _Timer(self, labels)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.labelnames, key, 'le="%s"' % bound)
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self._histogram = histogram
+        self._labels = labels
+        self._started = None
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histogram.observe(time.perf_counter() - self._started, **self._labels)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return registry.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return registry.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+    return registry.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def render_metrics() -> str:
+    return registry.render()
+
+
+# HTTP
+HTTP_REQUESTS = counter("realevals_http_requests_total", "HTTP requests handled", ("method", "route", "status"))
+HTTP_REQUEST_DURATION = histogram("realevals_http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+HTTP_REQUESTS_IN_FLIGHT = gauge("realevals_http_requests_in_flight", "HTTP requests currently being handled", ("method",))
+
+# Data layer
+DB_QUERIES = counter("realevals_db_queries_total", "Database queries executed", ("table", "operation", "outcome"))
+DB_QUERY_DURATION = histogram("realevals_db_query_duration_seconds", "Database query latency", ("table", "operation"))
+DB_QUERIES_PER_REQUEST = histogram(
+    "realevals_db_queries_per_request",
+    "Database queries issued while serving one HTTP request",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500)
+)
+
+# Browser Use upstream
+BROWSER_USE_REQUESTS = counter("realevals_browser_use_requests_total", "Requests sent to the Browser Use API", ("operation", "status"))
+BROWSER_USE_REQUEST_DURATION = histogram("realevals_browser_use_request_duration_seconds", "Browser Use API request latency", ("operation",))
+BROWSER_USE_POLLS = counter("realevals_browser_use_polls_total", "Status polls made while waiting for Browser Use tasks")
+BROWSER_USE_KEY_TASKS = gauge("realevals_browser_use_key_tasks", "Browser Use tasks running or being created per API key", ("key",))
+BROWSER_USE_KEY_HEALTHY = gauge("realevals_browser_use_key_healthy", "Whether a Browser Use API key is taking new tasks (not disabled or cooling down)", ("key",))
+BROWSER_USE_TASK_DRIFT = gauge(
+    "realevals_browser_use_task_drift",
+    "Mismatches between live Browser Use tasks and submissions found by the last reconciliation",
+    ("kind",)
+)
+BROWSER_USE_ORPHANS_STOPPED = counter("realevals_browser_use_orphans_stopped_total", "Orphaned Browser Use tasks stopped by the reconciler", ("reason",))
+RECONCILIATION_RUNS = counter("realevals_reconciliation_runs_total", "Upstream task reconciliation passes", ("outcome",))
+
+# Submissions
+SUBMISSIONS_CREATED = counter("realevals_submissions_created_total", "Submissions accepted")
+IDEMPOTENT_SUBMISSIONS = counter("realevals_idempotent_submissions_total", "Submission requests carrying an Idempotency-Key", ("outcome",))
+SUBMISSIONS_REJECTED = counter("realevals_submissions_rejected_total", "Submissions rejected by admission control", ("reason",))
+SUBMISSION_BACKLOG = gauge("realevals_submission_backlog", "Submissions queued or processing, as last read by admission control")
+SUBMISSIONS_PROCESSED = counter("realevals_submissions_processed_total", "Submissions that finished processing", ("status", "cached"))
+EVALUATIONS_IN_FLIGHT = gauge("realevals_evaluations_in_flight", "Evaluation concurrency slots in use")
+SUBMISSION_TRIALS = counter("realevals_submission_trials_total", "Trial runs of multi-trial submissions", ("outcome",))
+EVALUATION_TIMEOUTS = counter("realevals_evaluation_timeouts_total", "Evaluations stopped by the watchdog for exceeding maxTimeAllowed")
+WEBHOOK_EVENTS = counter("realevals_webhook_events_total", "Submission events queued for webhook delivery", ("type",))
+WEBHOOK_DELIVERIES = counter("realevals_webhook_deliveries_total", "Webhook delivery attempts", ("outcome",))
+SUBMISSION_PROCESSING_DURATION = histogram(
+    "realevals_submission_processing_seconds",
+    "Time from processing start to a terminal submission status",
+    ("status",),
+    buckets=EVALUATION_BUCKETS
+)
+
+
+def _route_label(request: Request) -> str:
+    """Use the route template rather than the raw path so IDs do not explode label cardinality"""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+async def metrics_middleware(request: Request, call_next):
+    method = request.method
+    started = time.perf_counter()
+    status = "500"
+    HTTP_REQUESTS_IN_FLIGHT.inc(method=method)
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        route = _route_label(request)
+        HTTP_REQUESTS_IN_FLIGHT.dec(method=method)
+        HTTP_REQUESTS.inc(method=method, route=route, status=status)
+        HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, method=method, route=route)
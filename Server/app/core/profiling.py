@@ -0,0 +1,141 @@
+"""
+On-demand profiling for a live server process.
+
+``SamplingProfiler`` snapshots the stack of every thread (``sys._current_frames()``) at a fixed
+interval from a background thread, so the profiled code is not instrumented and pays no cost
+between samples. Results are aggregated into collapsed stacks (``frame;frame;frame count``),
+the input format of flamegraph.pl, speedscope and inferno.
+
+``profile_request_middleware`` is the opt-in per-request mode: when enabled, a request carrying
+the ``X-Profile`` header (set to ``ADMIN_SECRET_KEY``) runs under cProfile and the stats are
+written to ``PROFILING_OUTPUT_DIR``. cProfile only sees the event loop thread, so time spent in
+other requests interleaved on the loop is included; use it on a quiet worker.
+"""
+import cProfile
+import io
+import os
+import pstats
+import secrets
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, Any
+from fastapi import Request
+from loguru import logger
+from .config import settings
+
+PROFILE_HEADER = "X-Profile"
+
+# Only one profiler may run at a time: sampling profiles are expensive to overlap and
+# cProfile cannot be enabled while another profiler is active
+_profiler_lock = threading.Lock()
+
+
+class ProfilerBusyError(RuntimeError):
+    pass
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.01, include_idle: bool = True):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.duration = 0.0
+
+    def run(self, seconds: float) -> "SamplingProfiler":
+        """Sample all threads for ``seconds``; blocks the calling thread"""
+        if not _profiler_lock.acquire(blocking=False):
+            raise ProfilerBusyError("Another profile is already running")
+        try:
+            own_thread = threading.get_ident()
+            started = time.perf_counter()
+            deadline = started + seconds
+            while time.perf_counter() < deadline:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    if not self.include_idle and _is_idle(frame):
+                        continue
+                    stack = []
+                    while frame is not None:
+                        stack.append(_frame_label(frame))
+                        frame = frame.f_back
+                    stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                    self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+                time.sleep(self.interval)
+            self.duration = time.perf_counter() - started
+            return self
+        finally:
+            _profiler_lock.release()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self, limit: int = 50) -> Dict[str, Any]:
+        return {
+            "samples": self.samples,
+            "durationSeconds": round(self.duration, 3),
+            "intervalSeconds": self.interval,
+            "stacks": [{"stack": stack.split(";"), "count": count} for stack, count in self.stacks.most_common(limit)]
+        }
+
+
+# Leaf frames of threads that are blocked rather than doing work
+_IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+}
+
+
+def _is_idle(frame) -> bool:
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in _IDLE_FRAMES
+
+
+def _authorized(request: Request) -> bool:
+    token = request.headers.get(PROFILE_HEADER)
+    return bool(token) and secrets.compare_digest(token, settings.ADMIN_SECRET_KEY)
+
+
+async def profile_request_middleware(request: Request, call_next):
+    if not settings.PROFILING_REQUEST_ENABLED or not _authorized(request):
+        return await call_next(request)
+    if not _profiler_lock.acquire(blocking=False):
+        response = await call_next(request)
+        response.headers[PROFILE_HEADER] = "busy"
+        return response
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+        try:
+            response = await call_next(request)
+        finally:
+            profiler.disable()
+    finally:
+        _profiler_lock.release()
+
+    profile_id = uuid.uuid4().hex[:12]
+    os.makedirs(settings.PROFILING_OUTPUT_DIR, exist_ok=True)
+    path = os.path.join(settings.PROFILING_OUTPUT_DIR, f"request-{profile_id}.prof")
+    profiler.dump_stats(path)
+
+    report = io.StringIO()
+    pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(20)
+    logger.info(f"Profiled {request.method} {request.url.path} -> {path}\n{report.getvalue()}")
+
+    response.headers[PROFILE_HEADER] = profile_id
+    return response
+
@@ -0,0 +1,287 @@
+"""
+Lightweight span-based tracing compatible with OpenTelemetry.
+
+Spans use W3C trace context (``traceparent``) identifiers and are exported as OTLP/JSON, either
+appended to a local JSON-lines file or posted to an OTLP/HTTP collector (``/v1/traces``), so
+they can be loaded into Jaeger, Tempo or any other OpenTelemetry backend.
+
+Usage:
+    with start_span("SubmissionService.process_submission", {"submission.id": submission_id}):
+        ...
+
+The current span lives in a context variable, so nested spans become children automatically.
+Use ``propagate()`` when handing work to a background task or thread so it joins the caller's trace.
+"""
+import functools
+import inspect
+import json
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Optional, Callable, List
+import requests
+from fastapi import Request
+from loguru import logger
+from .config import settings
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+# OTLP status codes
+_STATUS_UNSET = 0
+_STATUS_ERROR = 2
+
+
+class Span:
+    def __init__(self, name: str, trace_id: str, parent_span_id: Optional[str], kind: int, attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.attributes = {k: v for k, v in (attributes or {}).items() if v is not None}
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status_code = _STATUS_UNSET
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any):
+        if value is not None:
+            self.attributes[key] = value
+
+    def record_exception(self, error: BaseException):
+        self.status_code = _STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": self.status_code, "message": self.status_message}
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class _SpanContext:
+    """A remote or captured parent: just the identifiers needed to continue a trace"""
+
+    def __init__(self, trace_id: str, span_id: str):
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+
+_current_span: ContextVar[Optional[Any]] = ContextVar("current_span", default=None)
+
+
+class _BatchExporter:
+    """Buffers finished spans and writes them from a daemon thread"""
+
+    def __init__(self, file_path: str, otlp_endpoint: str, service_name: str, flush_interval: float = 2.0, max_batch: int = 512):
+        self.file_path = file_path
+        self.otlp_endpoint = otlp_endpoint.rstrip("/") if otlp_endpoint else ""
+        self.service_name = service_name
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=10000)
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span):
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            # Dropping spans is preferable to blocking request handling
+            pass
+
+    def _run(self):
+        while True:
+            batch: List[Span] = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: List[Span]):
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "realevals"},
+                    "spans": [span.to_otlp() for span in batch]
+                }]
+            }]
+        }
+        try:
+            if self.file_path:
+                directory = os.path.dirname(self.file_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.file_path, "a") as f:
+                    f.write(json.dumps(payload) + "\n")
+            if self.otlp_endpoint:
+                requests.post(f"{self.otlp_endpoint}/v1/traces", json=payload, timeout=5)
+        except Exception as e:
+            logger.warning(f"Failed to export {len(batch)} spans: {str(e)}")
+
+
+_exporter: Optional[_BatchExporter] = None
+_exporter_lock = threading.Lock()
+
+
+def _get_exporter() -> Optional[_BatchExporter]:
+    global _exporter
+    if _exporter is None and (settings.TRACING_EXPORT_FILE or settings.TRACING_OTLP_ENDPOINT):
+        with _exporter_lock:
+            if _exporter is None:
+                _exporter = _BatchExporter(
+                    settings.TRACING_EXPORT_FILE,
+                    settings.TRACING_OTLP_ENDPOINT,
+                    settings.APP_NAME
+                )
+    return _exporter
+
+
+def current_span() -> Optional[Span]:
+    span = _current_span.get()
+    return span if isinstance(span, Span) else None
+
+
+def set_attributes(attributes: Dict[str, Any]):
+    """Set attributes on the current span, if any"""
+    span = current_span()
+    if span is not None:
+        for key, value in attributes.items():
+            span.set_attribute(key, value)
+
+
+@contextmanager
+def start_span(name: str, attributes: Dict[str, Any] = None, kind: int = SPAN_KIND_INTERNAL, parent: Any = None):
+    """Start a span as a child of ``parent`` or the current span; yields None when tracing is disabled"""
+    if not settings.TRACING_ENABLED:
+        yield None
+        return
+
+    parent = parent if parent is not None else _current_span.get()
+    if parent is not None:
+        span = Span(name, parent.trace_id, parent.span_id, kind, attributes)
+    else:
+        span = Span(name, f"{random.getrandbits(128):032x}", None, kind, attributes)
+
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end_ns = time.time_ns()
+        exporter = _get_exporter()
+        if exporter is not None:
+            exporter.export(span)
+
+
+def traced(name: str = None, kind: int = SPAN_KIND_INTERNAL):
+    """Decorator wrapping a sync or async function in a span named after it"""
+    def decorator(fn: Callable):
+        span_name = name or fn.__qualname__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with start_span(span_name, kind=kind):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with start_span(span_name, kind=kind):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def propagate(fn: Callable) -> Callable:
+    """Bind ``fn`` to the current trace so it continues it when run later in a background task or thread"""
+    parent = _current_span.get()
+    if parent is None:
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _current_span.set(parent)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current_span.reset(token)
+
+    return wrapper
+
+
+def inject_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    """Return ``headers`` with the current trace context added for an outgoing request"""
+    span = current_span()
+    if span is None:
+        return headers
+    return {**headers, "traceparent": span.traceparent}
+
+
+def _extract(traceparent: Optional[str]) -> Optional[_SpanContext]:
+    if not traceparent:
+        return None
+    parts = traceparent.split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return _SpanContext(parts[1], parts[2])
+
+
+async def tracing_middleware(request: Request, call_next):
+    if not settings.TRACING_ENABLED:
+        return await call_next(request)
+
+    attributes = {"http.method": request.method, "http.target": request.url.path}
+    with start_span(f"{request.method} {request.url.path}", attributes, SPAN_KIND_SERVER, _extract(request.headers.get("traceparent"))) as span:
+        response = await call_next(request)
+        route = getattr(request.scope.get("route"), "path", None)
+        if route:
+            span.name = f"{request.method} {route}"
+            span.set_attribute("http.route", route)
+        span.set_attribute("http.status_code", response.status_code)
+        if response.status_code >= 500:
+            span.status_code = _STATUS_ERROR
+        response.headers["traceparent"] = span.traceparent
+        return response
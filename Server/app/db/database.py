@@ -5,6 +5,8 @@ import os
 from typing import Optional, Dict, Any
 from supabase import create_client, Client
 from loguru import logger
+from ..core.config import settings
+from .instrumentation import InstrumentedClient
 
 # Global Supabase client instance
 _supabase_client: Optional[Client] = None
@@ -32,10 +34,17 @@ def init_db(force_recreate: bool = False) -> Client:
     # Re-create the client if requested or if it doesn't exist yet
     if _supabase_client is None or force_recreate:
         try:
+            if settings.DATABASE_BACKEND == "memory":
+                # Process-local storage for benchmarks and offline load tests
+                from .memory import InMemoryClient
+                logger.info("Initializing in-memory database client")
+                _supabase_client = InstrumentedClient(InMemoryClient())
+                return _supabase_client
+            
             logger.info("Initializing Supabase client")
             
             # Create the Supabase client
-            _supabase_client = create_client(SUPABASE_URL, SUPABASE_KEY)
+            _supabase_client = InstrumentedClient(create_client(SUPABASE_URL, SUPABASE_KEY))
             logger.info("Supabase client initialized successfully")
             
         except Exception as e:
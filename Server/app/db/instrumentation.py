@@ -0,0 +1,151 @@
+"""
+Instrumentation wrapper around the database client.
+
+``InstrumentedClient`` proxies the Supabase client (or the in-memory stand-in) and times every
+``execute()`` call, recording query count and latency per table and operation.
+
+Queries are also attributed to the HTTP request being served: ``query_stats_middleware``
+counts queries and database time per request, reports them in response headers and flags
+requests that exceed the query budget or repeat the same query shape (the N+1 pattern).
+"""
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Optional, Tuple, List
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from loguru import logger
+from ..core import metrics, tracing
+from ..core.config import settings
+
+_OPERATIONS = {"select", "insert", "update", "upsert", "delete"}
+_FILTERS = {"eq", "neq", "gt", "gte", "lt", "lte", "in_", "is_", "like", "ilike", "contains"}
+
+# A query shape identifies queries that differ only in their filter values
+QueryShape = Tuple[str, str, Tuple[str, ...]]
+
+
+class QueryStats:
+    """Database queries issued while serving one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, shape: QueryShape, elapsed: float):
+        with self._lock:
+            self.count += 1
+            self.duration += elapsed
+            self.shapes[shape] += 1
+
+    def repeated_shapes(self, threshold: int) -> List[Tuple[QueryShape, int]]:
+        with self._lock:
+            return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("db_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+def _describe(shape: QueryShape) -> str:
+    table, operation, filters = shape
+    return f"{operation} {table}" + (f" where {', '.join(filters)}" if filters else "")
+
+
+class InstrumentedQuery:
+    """Proxy for a query builder that remembers which table and operation it targets"""
+
+    def __init__(self, builder: Any, table: str, operation: str = "select", filters: Tuple[str, ...] = ()):
+        self._builder = builder
+        self._table = table
+        self._operation = operation
+        self._filters = filters
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def wrapper(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if hasattr(result, "execute"):
+                operation = name if name in _OPERATIONS else self._operation
+                filters = self._filters + (f"{args[0]} {name.rstrip('_')}",) if name in _FILTERS and args else self._filters
+                return InstrumentedQuery(result, self._table, operation, filters)
+            return result
+
+        return wrapper
+
+    def execute(self) -> Any:
+        started = time.perf_counter()
+        outcome = "error"
+        span_attributes = {"db.system": "postgresql", "db.sql.table": self._table, "db.operation": self._operation}
+        try:
+            with tracing.start_span(f"db.{self._operation} {self._table}", span_attributes, tracing.SPAN_KIND_CLIENT):
+                result = self._builder.execute()
+            outcome = "ok"
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.DB_QUERIES.inc(table=self._table, operation=self._operation, outcome=outcome)
+            metrics.DB_QUERY_DURATION.observe(elapsed, table=self._table, operation=self._operation)
+            stats = _current_stats.get()
+            if stats is not None:
+                stats.record((self._table, self._operation, tuple(sorted(self._filters))), elapsed)
+
+
+class InstrumentedClient:
+    """Proxy for the database client whose ``table()`` queries are instrumented"""
+
+    def __init__(self, client: Any):
+        self._client = client
+
+    def table(self, name: str) -> InstrumentedQuery:
+        return InstrumentedQuery(self._client.table(name), name)
+
+    def from_(self, name: str) -> InstrumentedQuery:
+        return self.table(name)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+async def query_stats_middleware(request: Request, call_next):
+    """Attribute database queries to the current request and enforce the per-request query budget"""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        _current_stats.reset(token)
+
+    metrics.DB_QUERIES_PER_REQUEST.observe(stats.count)
+    response.headers["X-DB-Query-Count"] = str(stats.count)
+    response.headers["X-DB-Time-Ms"] = f"{stats.duration * 1000:.1f}"
+    logger.debug(f"{request.method} {request.url.path}: {stats.count} queries in {stats.duration * 1000:.1f}ms")
+
+    problems = []
+    if settings.DB_QUERY_BUDGET and stats.count > settings.DB_QUERY_BUDGET:
+        problems.append(f"{stats.count} queries exceeds the budget of {settings.DB_QUERY_BUDGET}")
+    if settings.DB_REPEATED_QUERY_THRESHOLD:
+        for shape, n in stats.repeated_shapes(settings.DB_REPEATED_QUERY_THRESHOLD):
+            problems.append(f"'{_describe(shape)}' ran {n} times (possible N+1)")
+
+    if problems:
+        message = f"{request.method} {request.url.path}: " + "; ".join(problems)
+        if settings.DB_QUERY_BUDGET_ENFORCE:
+            logger.error(message)
+            return JSONResponse(
+                status_code=500,
+                content={"detail": f"Query budget exceeded: {message}"},
+                headers={"X-DB-Query-Count": str(stats.count)}
+            )
+        logger.warning(message)
+
+    return response
@@ -0,0 +1,221 @@
+"""
+In-memory stand-in for the Supabase client used by benchmarks and local load tests.
+
+Implements the subset of the PostgREST query builder the services use
+(``client.table(name).select(...).eq(...).execute()`` and friends) over plain dicts.
+"""
+import json
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Callable
+
+# Columns the Supabase schema fills in on insert
+_TABLE_DEFAULTS: Dict[str, Dict[str, Callable[[], Any]]] = {
+    "users": {"createdAt": lambda: _now()},
+    "agents": {"created_at": lambda: _now()},
+    "tasks": {"created_at": lambda: _now()},
+    "submissions": {"submittedAt": lambda: _now()},
+    "evaluation_results": {"createdAt": lambda: _now()},
+    "submission_events": {"occurredAt": lambda: _now()},
+}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _normalize(value: Any) -> Any:
+    """Round-trip through JSON like a real PostgREST request, so enums and datetimes become strings"""
+    return json.loads(json.dumps(value, default=str))
+
+
+class MemoryResponse:
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class MemoryQuery:
+    def __init__(self, client: "InMemoryClient", table: str):
+        self._client = client
+        self._table = table
+        self._action = "select"
+        self._columns = "*"
+        self._count = None
+        self._payload: Any = None
+        self._filters: List[Callable[[Dict[str, Any]], bool]] = []
+        self._order: List[tuple] = []
+        self._offset = 0
+        self._limit: Optional[int] = None
+        self._single = False
+        self._maybe_single = False
+
+    # Actions
+    def select(self, columns: str = "*", count: Optional[str] = None) -> "MemoryQuery":
+        self._action = "select"
+        self._columns = columns
+        self._count = count
+        return self
+
+    def insert(self, rows, **kwargs) -> "MemoryQuery":
+        self._action = "insert"
+        self._payload = rows
+        return self
+
+    def upsert(self, rows, on_conflict: str = "id", **kwargs) -> "MemoryQuery":
+        self._action = "upsert"
+        self._payload = rows
+        self._on_conflict = on_conflict
+        return self
+
+    def update(self, values: Dict[str, Any], **kwargs) -> "MemoryQuery":
+        self._action = "update"
+        self._payload = values
+        return self
+
+    def delete(self, **kwargs) -> "MemoryQuery":
+        self._action = "delete"
+        return self
+
+    # Filters
+    def eq(self, column: str, value: Any) -> "MemoryQuery":
+        value = _normalize(value)
+        self._filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def neq(self, column: str, value: Any) -> "MemoryQuery":
+        value = _normalize(value)
+        self._filters.append(lambda row: row.get(column) != value)
+        return self
+
+    def gt(self, column: str, value: Any) -> "MemoryQuery":
+        return self._compare(column, value, lambda a, b: a > b)
+
+    def gte(self, column: str, value: Any) -> "MemoryQuery":
+        return self._compare(column, value, lambda a, b: a >= b)
+
+    def lt(self, column: str, value: Any) -> "MemoryQuery":
+        return self._compare(column, value, lambda a, b: a < b)
+
+    def lte(self, column: str, value: Any) -> "MemoryQuery":
+        return self._compare(column, value, lambda a, b: a <= b)
+
+    def in_(self, column: str, values: List[Any]) -> "MemoryQuery":
+        values = _normalize(list(values))
+        self._filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def is_(self, column: str, value: Any) -> "MemoryQuery":
+        expected = None if value in (None, "null") else value
+        self._filters.append(lambda row: row.get(column) is expected)
+        return self
+
+    def _compare(self, column: str, value: Any, op) -> "MemoryQuery":
+        value = _normalize(value)
+        self._filters.append(lambda row: row.get(column) is not None and op(row.get(column), value))
+        return self
+
+    # Modifiers
+    def order(self, column: str, desc: bool = False, **kwargs) -> "MemoryQuery":
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, size: int, **kwargs) -> "MemoryQuery":
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int, **kwargs) -> "MemoryQuery":
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    def single(self) -> "MemoryQuery":
+        self._single = True
+        return self
+
+    def maybe_single(self) -> "MemoryQuery":
+        self._maybe_single = True
+        return self
+
+    def execute(self) -> MemoryResponse:
+        with self._client._lock:
+            rows = self._client._tables.setdefault(self._table, {})
+            if self._action == "select":
+                return self._execute_select(rows)
+            if self._action in ("insert", "upsert"):
+                return self._execute_write(rows)
+            if self._action == "update":
+                values = _normalize(self._payload)
+                updated = []
+                for row in self._matching(rows):
+                    row.update(values)
+                    updated.append(dict(row))
+                return MemoryResponse(updated)
+            if self._action == "delete":
+                deleted = self._matching(rows)
+                for row in deleted:
+                    del rows[row["id"]]
+                return MemoryResponse([dict(row) for row in deleted])
+        raise ValueError(f"Unsupported action: {self._action}")
+
+    def _matching(self, rows: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [row for row in rows.values() if all(f(row) for f in self._filters)]
+
+    def _execute_select(self, rows: Dict[str, Dict[str, Any]]) -> MemoryResponse:
+        matches = self._matching(rows)
+        for column, desc in reversed(self._order):
+            matches.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+
+        total = len(matches)
+        end = None if self._limit is None else self._offset + self._limit
+        matches = matches[self._offset:end]
+
+        if self._columns.strip() != "*":
+            columns = [c.strip() for c in self._columns.split(",")]
+            matches = [{c: row.get(c) for c in columns} for row in matches]
+        else:
+            matches = [dict(row) for row in matches]
+
+        count = total if self._count else None
+        if self._single or self._maybe_single:
+            if not matches and self._single:
+                raise ValueError("JSON object requested, multiple (or no) rows returned")
+            return MemoryResponse(matches[0] if matches else None, count)
+        return MemoryResponse(matches, count)
+
+    def _execute_write(self, rows: Dict[str, Dict[str, Any]]) -> MemoryResponse:
+        payload = self._payload if isinstance(self._payload, list) else [self._payload]
+        written = []
+        for record in _normalize(payload):
+            record.setdefault("id", str(uuid.uuid4()))
+            for column, default in _TABLE_DEFAULTS.get(self._table, {}).items():
+                if record.get(column) is None:
+                    record[column] = default()
+
+            if self._action == "insert" and record["id"] in rows:
+                raise ValueError(f"duplicate key value violates unique constraint on {self._table}.id")
+            if self._action == "upsert" and record["id"] in rows:
+                rows[record["id"]].update(record)
+            else:
+                rows[record["id"]] = record
+            written.append(dict(rows[record["id"]]))
+        return MemoryResponse(written)
+
+
+class InMemoryClient:
+    """Thread-safe, process-local replacement for ``supabase.Client``"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._tables: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def table(self, name: str) -> MemoryQuery:
+        return MemoryQuery(self, name)
+
+    def from_(self, name: str) -> MemoryQuery:
+        return self.table(name)
+
+    def reset(self):
+        with self._lock:
+            self._tables.clear()
@@ -106,6 +106,17 @@ class Submission(Base):
     status = Column(Enum(SubmissionStatus))
     submittedAt = Column(DateTime(timezone=True), server_default=func.now())
     updatedAt = Column(DateTime(timezone=True), onupdate=func.now())
+    browserUseTaskId = Column(String, nullable=True)
+    # One upstream task per trial of a multi-trial submission
+    browserUseTaskIds = Column(JSON, nullable=True)
+    trials = Column(Integer, default=1)
+    suiteRunId = Column(UUID(as_uuid=True), ForeignKey("suite_runs.id"), nullable=True, index=True)
+    heartbeatAt = Column(DateTime(timezone=True), nullable=True)
+    # Set by whichever worker runs the submission; recovery takes it over from a stale owner
+    claimedBy = Column(String, nullable=True)
+    idempotencyKey = Column(String, nullable=True, index=True)
+    # Copy of the evaluation score so submissions can be filtered and sorted by it without a join
+    score = Column(Float, nullable=True)
     
     user = relationship("User", back_populates="submissions")
     agent = relationship("Agent", back_populates="submissions")
@@ -113,10 +124,61 @@ class Submission(Base):
     evaluation = relationship("EvaluationResult", back_populates="submission", uselist=False)
     leaderboard_entry = relationship("Leaderboard", back_populates="submission", uselist=False)
 
+class SuiteRun(Base):
+    __tablename__ = "suite_runs"
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    userId = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    agentId = Column(UUID(as_uuid=True), ForeignKey("agents.id"))
+    difficulty = Column(Enum(TaskDifficulty), nullable=True)
+    webArenaEnvironment = Column(String, nullable=True)
+    trials = Column(Integer, default=1)
+    taskCount = Column(Integer)
+    status = Column(String)
+    compositeScore = Column(Float, nullable=True)
+    createdAt = Column(DateTime(timezone=True), server_default=func.now())
+    finishedAt = Column(DateTime(timezone=True), nullable=True)
+
+class Webhook(Base):
+    __tablename__ = "webhooks"
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    userId = Column(UUID(as_uuid=True), ForeignKey("users.id"), index=True)
+    url = Column(String)
+    submissionId = Column(UUID(as_uuid=True), ForeignKey("submissions.id"), nullable=True)
+    secret = Column(String)
+    active = Column(Boolean, default=True)
+    createdAt = Column(DateTime(timezone=True), server_default=func.now())
+
+class WebhookDelivery(Base):
+    __tablename__ = "webhook_deliveries"
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    webhookId = Column(UUID(as_uuid=True), ForeignKey("webhooks.id"), index=True)
+    userId = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    deliveryId = Column(UUID(as_uuid=True), index=True)
+    eventIds = Column(JSON)
+    submissionIds = Column(JSON)
+    attempt = Column(Integer)
+    status = Column(String)
+    statusCode = Column(Integer, nullable=True)
+    error = Column(String, nullable=True)
+    durationMs = Column(Float, nullable=True)
+    attemptedAt = Column(DateTime(timezone=True), index=True)
+    nextAttemptAt = Column(DateTime(timezone=True), nullable=True)
+
+class SubmissionEvent(Base):
+    __tablename__ = "submission_events"
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    submissionId = Column(UUID(as_uuid=True), ForeignKey("submissions.id"), index=True)
+    taskId = Column(UUID(as_uuid=True), ForeignKey("tasks.id"), index=True)
+    agentId = Column(UUID(as_uuid=True), ForeignKey("agents.id"), index=True)
+    fromStatus = Column(Enum(SubmissionStatus), nullable=True)
+    toStatus = Column(Enum(SubmissionStatus))
+    occurredAt = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    details = Column(JSON, nullable=True)
+
 class EvaluationResult(Base):
     __tablename__ = "evaluation_results"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    submissionId = Column(UUID(as_uuid=True), ForeignKey("submissions.id"))
+    submissionId = Column(UUID(as_uuid=True), ForeignKey("submissions.id"), index=True)
     score = Column(Float)
     timeTaken = Column(Float)
     accuracy = Column(Float)
@@ -132,7 +194,7 @@ class Leaderboard(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     taskId = Column(UUID(as_uuid=True), ForeignKey("tasks.id"))
     agentId = Column(UUID(as_uuid=True), ForeignKey("agents.id"))
-    submissionId = Column(UUID(as_uuid=True), ForeignKey("submissions.id"))
+    submissionId = Column(UUID(as_uuid=True), ForeignKey("submissions.id"), index=True)
     score = Column(Float)
     rank = Column(Integer)
     timeTaken = Column(Float)
@@ -9,6 +9,7 @@ class EvaluationResultResponse(BaseModel):
     timeTaken: float
     accuracy: float
     resultDetails: Dict
+    cached: bool = Field(False, description="Whether the result was reused from an identical recent evaluation")
 
     @field_validator('score')
     def validate_score(cls, v):
@@ -39,6 +40,11 @@ class SubmissionCreate(BaseModel):
         default=None, 
         description="Optional configuration for the Browser Use API task"
     )
+    trials: int = Field(
+        default=1,
+        ge=1,
+        description="Number of runs to evaluate concurrently; the result is their aggregate (mean with a 95% confidence interval)"
+    )
 
 class SubmissionResponse(BaseModel):
     id: UUID
@@ -49,6 +55,7 @@ class SubmissionResponse(BaseModel):
     result: Optional[EvaluationResultResponse] = None
     rank: Optional[int] = None
     browserUseTaskId: Optional[str] = None
+    trials: int = 1
 
     class Config:
         from_attributes = True
@@ -57,6 +64,10 @@ class SubmissionListResponse(BaseModel):
     items: List[SubmissionResponse]
     total: int
 
+class SubmissionSearchResponse(BaseModel):
+    items: List[SubmissionResponse]
+    nextCursor: Optional[str] = Field(None, description="Pass as cursor to get the next page; null on the last page")
+
 class LeaderboardResponse(BaseModel):
     rank: int
     score: float
@@ -93,3 +104,27 @@ class SubmissionControlResponse(BaseModel):
     action: str = Field(..., description="Action that was performed")
     success: bool = Field(..., description="Whether the action was successful")
     message: Optional[str] = Field(None, description="Additional information about the action")
+
+
+class StageLatencyStats(BaseModel):
+    """Latency distribution of one submission stage, in seconds"""
+    count: int
+    mean: float
+    p50: float
+    p90: float
+    p95: float
+    p99: float
+    max: float
+
+class StageAnalyticsGroup(BaseModel):
+    key: Optional[str] = Field(None, description="Task or agent ID, depending on groupBy")
+    window: Optional[datetime] = Field(None, description="Start of the time bucket, when bucketed")
+    stages: Dict[str, StageLatencyStats] = Field(..., description="Per-status time in stage, plus 'total' from first event to terminal status")
+
+class StageAnalyticsResponse(BaseModel):
+    groupBy: str
+    bucket: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    submissions: int = Field(..., description="Submissions with events in the window")
+    groups: List[StageAnalyticsGroup]
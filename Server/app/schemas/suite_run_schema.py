@@ -0,0 +1,36 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import datetime
+from uuid import UUID
+from ..models.enums import SubmissionStatus, TaskDifficulty
+
+class SuiteRunCreate(BaseModel):
+    agentId: UUID
+    difficulty: Optional[TaskDifficulty] = Field(None, description="Only run tasks of this difficulty")
+    webArenaEnvironment: Optional[str] = Field(None, description="Only run tasks in this environment")
+    trials: int = Field(1, ge=1, description="Trials per task, as for a single submission")
+
+class SuiteRunTaskResult(BaseModel):
+    taskId: UUID
+    submissionId: UUID
+    status: SubmissionStatus
+    score: Optional[float] = None
+    accuracy: Optional[float] = None
+    timeTaken: Optional[float] = None
+
+class SuiteRunResponse(BaseModel):
+    id: UUID
+    agentId: UUID
+    status: str = Field(..., description="RUNNING until every task has finished, then COMPLETED")
+    difficulty: Optional[TaskDifficulty] = None
+    webArenaEnvironment: Optional[str] = None
+    trials: int = 1
+    total: int
+    completed: int = Field(..., description="Tasks that finished with a result")
+    failed: int
+    compositeScore: Optional[float] = Field(None, description="Mean score over all finished tasks, counting failed tasks as 0")
+    meanAccuracy: Optional[float] = None
+    meanTimeTaken: Optional[float] = None
+    createdAt: datetime
+    finishedAt: Optional[datetime] = None
+    results: List[SuiteRunTaskResult]
@@ -61,7 +61,7 @@ class TaskResponse(BaseModel):
     id: uuid.UUID
     title: str
     description: str
-    difficulty: TaskDifficulty
+    difficulty: Optional[TaskDifficulty] = None  # None for tasks stored without one
     webArenaEnvironment: str
     environmentConfig: Dict
     createdAt: datetime
@@ -75,4 +75,30 @@ class TaskListResponse(BaseModel):
     items: List[TaskResponse]
     total: int
     page: int
-    size: int
\ No newline at end of file
+    size: int
+
+class TaskImportResponse(BaseModel):
+    """Outcome of a bulk task import"""
+    created: int
+    valid: int = Field(..., description="Task definitions that passed validation")
+    dryRun: bool
+    taskIds: List[uuid.UUID]
+
+class TaskRescoreRequest(BaseModel):
+    """Request to recompute stored scores for a task with its current configuration"""
+    batchSize: int = Field(100, ge=1, le=1000, description="Number of submissions rescored per batch")
+    resumeFrom: Optional[str] = Field(None, description="Submission ID cursor from an interrupted rescore job")
+
+class TaskRescoreJobResponse(BaseModel):
+    """Progress of a rescore job"""
+    id: str
+    taskId: uuid.UUID
+    status: str
+    batchSize: int
+    cursor: Optional[str] = Field(None, description="Last submission ID rescored, usable as resumeFrom")
+    processed: int
+    updated: int
+    skipped: int
+    startedAt: datetime
+    finishedAt: Optional[datetime] = None
+    error: Optional[str] = None
@@ -0,0 +1,34 @@
+from pydantic import BaseModel, Field, HttpUrl
+from typing import Optional, List
+from datetime import datetime
+from uuid import UUID
+
+class WebhookCreate(BaseModel):
+    url: HttpUrl
+    submissionId: Optional[UUID] = Field(None, description="Only notify about this submission; omit for all of the user's submissions")
+
+class WebhookResponse(BaseModel):
+    id: UUID
+    url: str
+    submissionId: Optional[UUID] = None
+    active: bool = True
+    createdAt: datetime
+    secret: Optional[str] = Field(None, description="Signing secret, only returned when the webhook is created")
+
+class WebhookDeliveryResponse(BaseModel):
+    id: UUID
+    webhookId: UUID
+    deliveryId: UUID = Field(..., description="Shared by all attempts of one batch, sent as X-RealEvals-Delivery")
+    eventIds: List[str]
+    submissionIds: List[str]
+    attempt: int
+    status: str = Field(..., description="delivered, retrying or failed")
+    statusCode: Optional[int] = None
+    error: Optional[str] = None
+    durationMs: Optional[float] = None
+    attemptedAt: datetime
+    nextAttemptAt: Optional[datetime] = None
+
+class WebhookDeliveryListResponse(BaseModel):
+    items: List[WebhookDeliveryResponse]
+    total: int
@@ -0,0 +1,155 @@
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+from fastapi import HTTPException, status
+from loguru import logger
+from ..core import metrics
+from ..core.config import settings
+from ..db.database import get_db
+from ..models.enums import SubmissionStatus
+
+# Statuses that count towards the evaluation backlog
+_BACKLOG_STATUSES = [SubmissionStatus.QUEUED.value, SubmissionStatus.PENDING.value, SubmissionStatus.PROCESSING.value]
+_FINISHED_STATUSES = [SubmissionStatus.COMPLETED.value, SubmissionStatus.FAILED.value]
+
+# Retry-After is clamped to this range so clients neither hammer nor give up
+_MIN_RETRY_AFTER = 1
+_MAX_RETRY_AFTER = 300
+# How often idle rate-limit buckets are swept
+_BUCKET_SWEEP_SECONDS = 60
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take one token; return 0 on success or the seconds until a token is available"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def is_full(self, now: float) -> bool:
+        """Whether the bucket has refilled completely, i.e. is indistinguishable from a new one"""
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+
+class AdmissionService:
+    """
+    Admission control for submission intake.
+
+    Rejects new submissions with 429 and ``Retry-After`` when the submitting user exceeds their
+    token-bucket rate, when the evaluation backlog is deeper than ``SUBMISSION_MAX_QUEUE_DEPTH``,
+    or when the backlog would take longer than ``SUBMISSION_MAX_ESTIMATED_WAIT_SECONDS`` to drain
+    at the throughput observed over the last ``SUBMISSION_THROUGHPUT_WINDOW_SECONDS``.
+
+    Backlog and throughput are read from the database at most once per
+    ``SUBMISSION_ADMISSION_REFRESH_SECONDS``; submissions admitted in between are counted locally.
+    Rate limits are tracked per process, so with several workers each enforces its own bucket.
+    A user's bucket is dropped once it has been idle long enough to refill, so buckets don't
+    accumulate for every user that ever submitted.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._swept_at = time.monotonic()
+        self._refreshed_at = 0.0
+        self._backlog = 0
+        self._throughput = 0.0
+        self._admitted_since_refresh = 0
+
+    def admit(self, user_id, count: int = 1) -> None:
+        """
+        Admit ``count`` submissions arriving in one request (several for a suite run) or raise 429.
+        A request takes one rate-limit token however many submissions it creates, and only once it
+        has passed the backlog checks, so requests turned away for a full queue don't use up the
+        user's rate limit.
+        """
+        if not settings.SUBMISSION_ADMISSION_ENABLED:
+            return
+
+        backlog, throughput = self._load()
+        max_depth = settings.SUBMISSION_MAX_QUEUE_DEPTH
+        if max_depth and backlog + count > max_depth:
+            excess = backlog + count - max_depth
+            self._reject("queue_full", f"Evaluation queue is full ({backlog} submissions pending)", excess / throughput if throughput else None)
+
+        max_wait = settings.SUBMISSION_MAX_ESTIMATED_WAIT_SECONDS
+        if max_wait and throughput and (backlog + count - 1) / throughput > max_wait:
+            estimated_wait = (backlog + count - 1) / throughput
+            self._reject("wait_too_long", f"Estimated wait of {estimated_wait:.0f}s exceeds {max_wait}s", estimated_wait - max_wait)
+
+        wait = self._take_token(str(user_id))
+        if wait:
+            self._reject("rate_limited", f"Submission rate limit exceeded ({settings.SUBMISSION_RATE_LIMIT_PER_MINUTE:g}/min)", wait)
+
+        with self._lock:
+            self._admitted_since_refresh += count
+
+    def _take_token(self, user_id: str) -> float:
+        per_minute = settings.SUBMISSION_RATE_LIMIT_PER_MINUTE
+        if not per_minute:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            if now - self._swept_at >= _BUCKET_SWEEP_SECONDS:
+                self._buckets = {user: bucket for user, bucket in self._buckets.items() if not bucket.is_full(now)}
+                self._swept_at = now
+            bucket = self._buckets.get(user_id)
+            if bucket is None:
+                bucket = self._buckets[user_id] = TokenBucket(per_minute / 60.0, max(1, settings.SUBMISSION_RATE_LIMIT_BURST))
+            return bucket.take()
+
+    def _load(self) -> Tuple[int, float]:
+        """Current backlog (including submissions admitted since the last refresh) and completions per second"""
+        with self._lock:
+            stale = time.monotonic() - self._refreshed_at >= settings.SUBMISSION_ADMISSION_REFRESH_SECONDS
+        if stale:
+            self._refresh()
+        with self._lock:
+            return self._backlog + self._admitted_since_refresh, self._throughput
+
+    def _refresh(self):
+        db = get_db()
+        window = settings.SUBMISSION_THROUGHPUT_WINDOW_SECONDS
+        since = (datetime.now(timezone.utc) - timedelta(seconds=window)).isoformat()
+        try:
+            backlog = db.table("submissions").select("id", count="exact").in_("status", _BACKLOG_STATUSES).limit(1).execute().count or 0
+            finished = db.table("submission_events").select("id", count="exact") \
+                .in_("toStatus", _FINISHED_STATUSES).gte("occurredAt", since).limit(1).execute().count or 0
+        except Exception as e:
+            # Fail open: an unreadable backlog must not block all submissions
+            logger.warning(f"Admission control could not read queue state: {str(e)}")
+            backlog, finished = 0, 0
+
+        with self._lock:
+            self._backlog = backlog
+            self._throughput = finished / window if window else 0.0
+            self._admitted_since_refresh = 0
+            self._refreshed_at = time.monotonic()
+        metrics.SUBMISSION_BACKLOG.set(backlog)
+
+    def _reject(self, reason: str, detail: str, retry_after: Optional[float]):
+        if retry_after is None:
+            retry_after = settings.SUBMISSION_RETRY_AFTER_SECONDS
+        retry_after = int(min(_MAX_RETRY_AFTER, max(_MIN_RETRY_AFTER, math.ceil(retry_after))))
+        metrics.SUBMISSIONS_REJECTED.inc(reason=reason)
+        logger.info(f"Rejected submission ({reason}): {detail}; retry after {retry_after}s")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+admission_service = AdmissionService()
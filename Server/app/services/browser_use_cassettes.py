@@ -0,0 +1,247 @@
+"""
+Record and replay of Browser Use HTTP traffic.
+
+With ``BROWSER_USE_CASSETTE_MODE=record`` every request about a task (creation, status polls,
+details, screenshots, pause/resume/stop) goes upstream as usual and is also written to a cassette,
+one JSON Lines file per task in ``BROWSER_USE_CASSETTE_DIR``: a header line identifying the task,
+then one line per interaction, appended as it happens. Each interaction is stored with its offset
+from task creation and its latency; repeated identical responses to the same call (most status
+polls) are stored once, which keeps cassettes small.
+
+With ``BROWSER_USE_CASSETTE_MODE=replay`` no request leaves the process. Creating a task picks a
+cassette, preferring ones recorded for the same instructions and options, and hands out a fresh
+task ID. Later calls for that task are answered with the response that was current at the same
+point of the recorded timeline, scaled by ``BROWSER_USE_CASSETTE_SPEED`` (2 plays twice as fast,
+0 jumps straight to the final responses). Task listings are not task traffic: they are not
+recorded and replay answers them with an empty page.
+"""
+import glob
+import hashlib
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+import requests
+from loguru import logger
+from ..core.config import settings
+
+RECORD = "record"
+REPLAY = "replay"
+
+# Finished tasks whose cassettes stay open for late calls (details, screenshots); running ones always do
+_MAX_OPEN_CASSETTES = 1000
+_TASK_ID = "{task_id}"
+# Upstream statuses after which a task makes no further progress
+_FINAL_STATUSES = {"finished", "failed", "stopped"}
+
+
+def _fingerprint(payload: Optional[Dict[str, Any]]) -> str:
+    """Identify a task creation by its instructions and options, ignoring the per-submission tags"""
+    payload = payload or {}
+    options = {k: v for k, v in (payload.get("options") or {}).items() if k != "tags"}
+    canonical = json.dumps({"task": payload.get("task"), "options": options}, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+def _call(method: str, path: str, task_id: Optional[str]) -> str:
+    """The call an interaction answers, with the task ID abstracted away"""
+    return f"{method} {path.replace(task_id, _TASK_ID) if task_id else path}"
+
+
+def _body(response: requests.Response) -> Dict[str, Any]:
+    try:
+        return {"json": response.json()}
+    except ValueError:
+        return {"text": response.text}
+
+
+def load_cassette(path: str) -> Dict[str, Any]:
+    """Read a cassette file back into its header fields plus the list of interactions"""
+    with open(path) as cassette_file:
+        lines = [json.loads(line) for line in cassette_file if line.strip()]
+    return {**lines[0], "interactions": lines[1:]}
+
+
+class CassetteRecorder:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        # Open cassettes keep only what recording needs: the last interaction per call, for
+        # dropping repeats, and whether the task has finished. Interactions themselves are on disk.
+        self._cassettes: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def request(self, operation: str, method: str, path: str, url: str, task_id: Optional[str] = None, **kwargs) -> requests.Response:
+        started = time.monotonic()
+        response = requests.request(method, url, **kwargs)
+        latency = time.monotonic() - started
+
+        if operation == "create_task" and response.ok:
+            task_id = response.json().get("id")
+            cassette = {
+                "taskId": task_id,
+                "fingerprint": _fingerprint(kwargs.get("json")),
+                "startedAt": started,
+                "last": {},
+                "finished": False
+            }
+            self._write(task_id, {"taskId": task_id, "fingerprint": cassette["fingerprint"]}, mode="w")
+            with self._lock:
+                self._cassettes[task_id] = cassette
+                self._evict_finished()
+            self._append(cassette, operation, _call(method, path, None), started, latency, response)
+        elif task_id:
+            with self._lock:
+                cassette = self._cassettes.get(task_id)
+            if cassette is not None:
+                self._append(cassette, operation, _call(method, path, task_id), started, latency, response)
+        return response
+
+    def _append(self, cassette: Dict[str, Any], operation: str, call: str, started: float, latency: float, response: requests.Response):
+        interaction = {
+            "operation": operation,
+            "call": call,
+            "t": round(started - cassette["startedAt"], 3),
+            "latency": round(latency, 3),
+            "status": response.status_code,
+            **_body(response)
+        }
+        answer = (interaction["status"], interaction.get("json"), interaction.get("text"))
+        with self._lock:
+            if cassette["last"].get(call) == answer:
+                # Same answer as last time: the earlier entry already covers this point of the timeline
+                return
+            cassette["last"][call] = answer
+            if operation == "stop_task" or (isinstance(interaction.get("json"), dict) and interaction["json"].get("status") in _FINAL_STATUSES):
+                cassette["finished"] = True
+            # Appended under the lock so concurrent calls for one task keep their order
+            self._write(cassette["taskId"], interaction, mode="a")
+
+    def _evict_finished(self):
+        """Close the oldest cassettes of finished tasks beyond the limit; caller holds the lock"""
+        excess = len(self._cassettes) - _MAX_OPEN_CASSETTES
+        if excess <= 0:
+            return
+        for task_id in [task_id for task_id, cassette in self._cassettes.items() if cassette["finished"]][:excess]:
+            del self._cassettes[task_id]
+
+    def _write(self, task_id: str, line: Dict[str, Any], mode: str):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, f"{task_id}.jsonl"), mode) as cassette_file:
+                cassette_file.write(json.dumps(line, separators=(",", ":"), default=str) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write Browser Use cassette for task {task_id}: {str(e)}")
+
+
+class _Session:
+    def __init__(self, cassette: Dict[str, Any]):
+        self.cassette = cassette
+        self.started = time.monotonic()
+        self.finished = False
+        self.calls: Dict[str, List[Dict[str, Any]]] = {}
+        for interaction in cassette["interactions"]:
+            self.calls.setdefault(interaction["call"], []).append(interaction)
+
+
+class CassettePlayer:
+    def __init__(self, directory: str, speed: float = 1.0):
+        self.directory = directory
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._cassettes: List[Dict[str, Any]] = []
+        for path in sorted(glob.glob(os.path.join(directory, "*.jsonl"))):
+            self._cassettes.append(load_cassette(path))
+        self._rotation = {}
+        logger.info(f"Replaying Browser Use traffic from {len(self._cassettes)} cassettes in {directory}")
+
+    def request(self, operation: str, method: str, path: str, url: str, task_id: Optional[str] = None, **kwargs) -> requests.Response:
+        if operation == "create_task":
+            return self._create(url, kwargs.get("json"))
+
+        with self._lock:
+            session = self._sessions.get(task_id) if task_id else None
+        if session is None:
+            if operation == "list_tasks":
+                return self._response(url, 200, {"json": {"tasks": []}})
+            return self._response(url, 404, {"json": {"detail": f"No replayed task {task_id}"}})
+
+        if operation == "stop_task":
+            session.finished = True
+        entries = session.calls.get(_call(method, path, task_id))
+        if not entries:
+            # Control calls the recording never made still succeed
+            if method != "GET":
+                return self._response(url, 200, {"json": {}})
+            return self._response(url, 404, {"json": {"detail": f"No recorded {operation} for task {task_id}"}})
+        elapsed = float("inf") if not self.speed else (time.monotonic() - session.started) * self.speed
+        entry = entries[0]
+        for candidate in entries:
+            if candidate["t"] > elapsed:
+                break
+            entry = candidate
+        if isinstance(entry.get("json"), dict) and entry["json"].get("status") in _FINAL_STATUSES:
+            session.finished = True
+        return self._serve(url, entry, session.cassette["taskId"], task_id)
+
+    def _create(self, url: str, payload: Optional[Dict[str, Any]]) -> requests.Response:
+        if not self._cassettes:
+            raise RuntimeError(f"No Browser Use cassettes to replay in {self.directory}")
+        fingerprint = _fingerprint(payload)
+        candidates = [c for c in self._cassettes if c.get("fingerprint") == fingerprint] or self._cassettes
+        with self._lock:
+            rotation = self._rotation.setdefault(fingerprint, itertools.count())
+            cassette = candidates[next(rotation) % len(candidates)]
+        session = _Session(cassette)
+        task_id = str(uuid.uuid4())
+        with self._lock:
+            self._sessions[task_id] = session
+            # Only finished replays are closed; running ones must keep answering
+            excess = len(self._sessions) - _MAX_OPEN_CASSETTES
+            for finished in [key for key, open_session in self._sessions.items() if open_session.finished][:max(0, excess)]:
+                del self._sessions[finished]
+
+        entry = next((i for i in cassette["interactions"] if i["operation"] == "create_task"), None)
+        if entry is None:
+            return self._response(url, 200, {"json": {"id": task_id}})
+        return self._serve(url, entry, cassette["taskId"], task_id)
+
+    def _serve(self, url: str, entry: Dict[str, Any], recorded_task_id: str, task_id: str) -> requests.Response:
+        if self.speed:
+            time.sleep(entry["latency"] / self.speed)
+        body = entry
+        if recorded_task_id and task_id:
+            # Responses mention the recorded task; answer as the task the caller knows
+            serialized = json.dumps({k: entry[k] for k in ("json", "text") if k in entry}).replace(recorded_task_id, task_id)
+            body = json.loads(serialized)
+        return self._response(url, entry["status"], body)
+
+    def _response(self, url: str, status_code: int, body: Dict[str, Any]) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status_code
+        response.url = url
+        if "json" in body:
+            response._content = json.dumps(body["json"]).encode()
+            response.headers["Content-Type"] = "application/json"
+        else:
+            response._content = (body.get("text") or "").encode()
+        return response
+
+
+def cassettes_from_settings():
+    """The recorder or player configured by ``BROWSER_USE_CASSETTE_MODE``, or None to talk to the API directly"""
+    mode = settings.BROWSER_USE_CASSETTE_MODE
+    if not mode:
+        return None
+    if mode == RECORD:
+        return CassetteRecorder(settings.BROWSER_USE_CASSETTE_DIR)
+    if mode == REPLAY:
+        return CassettePlayer(settings.BROWSER_USE_CASSETTE_DIR, settings.BROWSER_USE_CASSETTE_SPEED)
+    raise ValueError(f"Unknown BROWSER_USE_CASSETTE_MODE {mode!r}; expected {RECORD} or {REPLAY}")
+
+
+cassettes = cassettes_from_settings()
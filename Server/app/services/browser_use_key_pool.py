@@ -0,0 +1,192 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+from loguru import logger
+from ..core import metrics
+from ..core.config import settings
+from .admission_service import TokenBucket
+
+# Consecutive 5xx/connection failures before a key is put in cooldown
+_FAILURES_BEFORE_COOLDOWN = 3
+# Task -> key routes remembered for status, pause and stop calls
+_MAX_ROUTES = 10000
+
+
+class KeyPoolExhausted(RuntimeError):
+    """No healthy key had spare capacity within the acquire timeout"""
+
+
+class PooledKey:
+    def __init__(self, api_key: str, max_concurrent_tasks: int = 0, rate_per_minute: float = 0):
+        self.api_key = api_key
+        self.label = f"...{api_key[-4:]}"
+        self.max_concurrent_tasks = max_concurrent_tasks  # 0 means unlimited
+        self.bucket = TokenBucket(rate_per_minute / 60.0, max(1.0, rate_per_minute / 60.0)) if rate_per_minute else None
+        self.active: set = set()
+        self.leases = 0  # Task creations in progress
+        self.disabled = False
+        self.cooldown_until = 0.0
+        self.failures = 0
+
+    @property
+    def in_use(self) -> int:
+        return len(self.active) + self.leases
+
+    def healthy(self, now: float) -> bool:
+        return not self.disabled and now >= self.cooldown_until
+
+    def has_capacity(self) -> bool:
+        return not self.max_concurrent_tasks or self.in_use < self.max_concurrent_tasks
+
+    def load(self) -> float:
+        return self.in_use / self.max_concurrent_tasks if self.max_concurrent_tasks else 0.0
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        return {
+            "key": self.label,
+            "healthy": self.healthy(now),
+            "disabled": self.disabled,
+            "cooldownSeconds": round(max(0.0, self.cooldown_until - now), 1),
+            "activeTasks": len(self.active),
+            "creating": self.leases,
+            "maxConcurrentTasks": self.max_concurrent_tasks or None
+        }
+
+
+class BrowserUseKeyPool:
+    """
+    Shards Browser Use tasks across several API keys (accounts).
+
+    New tasks go to the least-loaded healthy key with spare capacity; ``acquire`` blocks until one
+    frees up. Calls about an existing task are routed to the key that created it. Keys answering
+    401/403 are disabled, and keys answering 429 or failing repeatedly cool down for
+    ``BROWSER_USE_KEY_COOLDOWN_SECONDS``. Limits and load are tracked per process.
+    """
+
+    def __init__(self, keys: List[PooledKey]):
+        if not keys:
+            raise ValueError("A Browser Use key pool needs at least one key")
+        self.keys = keys
+        self._cond = threading.Condition()
+        self._routes: "OrderedDict[str, PooledKey]" = OrderedDict()
+        for key in keys:
+            self._publish(key)
+
+    @classmethod
+    def from_settings(cls) -> "BrowserUseKeyPool":
+        entries = json.loads(settings.BROWSER_USE_API_KEYS) if settings.BROWSER_USE_API_KEYS else [settings.BROWSER_USE_API_KEY]
+        keys = []
+        for entry in entries:
+            if isinstance(entry, str):
+                entry = {"key": entry}
+            keys.append(PooledKey(
+                entry["key"],
+                entry.get("maxConcurrentTasks", settings.BROWSER_USE_KEY_MAX_CONCURRENT_TASKS),
+                entry.get("ratePerMinute", settings.BROWSER_USE_KEY_RATE_LIMIT_PER_MINUTE)
+            ))
+        return cls(keys)
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledKey:
+        """Lease the least-loaded healthy key with spare capacity for a new task"""
+        timeout = settings.BROWSER_USE_KEY_ACQUIRE_TIMEOUT_SECONDS if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                candidates = [key for key in self.keys if key.healthy(now) and key.has_capacity()]
+                if candidates:
+                    key = min(candidates, key=lambda k: (k.load(), k.in_use))
+                    key.leases += 1
+                    self._publish(key)
+                    return key
+                if now >= deadline:
+                    raise KeyPoolExhausted(f"No Browser Use API key had capacity within {timeout:g}s")
+                # Wake when a task is released or the next cooldown ends
+                cooldowns = [key.cooldown_until - now for key in self.keys if not key.disabled and key.cooldown_until > now]
+                self._cond.wait(min([deadline - now] + cooldowns))
+
+    def bind(self, key: PooledKey, task_id: str):
+        """Turn a lease into an active task routed to ``key``"""
+        with self._cond:
+            key.leases -= 1
+            key.active.add(task_id)
+            self._remember(task_id, key)
+            self._publish(key)
+
+    def abandon(self, key: PooledKey):
+        """Return a lease whose task creation failed"""
+        with self._cond:
+            key.leases -= 1
+            self._publish(key)
+            self._cond.notify_all()
+
+    def release(self, task_id: str):
+        """The task reached a terminal state; free its slot on the key (the route is kept)"""
+        with self._cond:
+            key = self._routes.get(task_id)
+            if key is not None and task_id in key.active:
+                key.active.discard(task_id)
+                self._publish(key)
+                self._cond.notify_all()
+
+    def route(self, task_id: str) -> Optional[PooledKey]:
+        with self._cond:
+            return self._routes.get(task_id)
+
+    def learn(self, task_id: str, key: PooledKey):
+        """Record which key owns a task we did not create in this process"""
+        with self._cond:
+            self._remember(task_id, key)
+
+    def throttle(self, key: PooledKey):
+        """Block until the key's request rate limit allows another request"""
+        if key.bucket is None:
+            return
+        while True:
+            with self._cond:
+                wait = key.bucket.take()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    def report(self, key: PooledKey, status_code: Optional[int]):
+        """Update key health from a response status (None for a connection error)"""
+        with self._cond:
+            if status_code in (401, 403):
+                if not key.disabled:
+                    logger.error(f"Disabling Browser Use API key {key.label}: upstream answered {status_code}")
+                key.disabled = True
+            elif status_code == 429 or status_code is None or status_code >= 500:
+                key.failures += 1
+                if status_code == 429 or key.failures >= _FAILURES_BEFORE_COOLDOWN:
+                    key.cooldown_until = time.monotonic() + settings.BROWSER_USE_KEY_COOLDOWN_SECONDS
+                    logger.warning(f"Browser Use API key {key.label} cooling down after {status_code or 'connection error'}")
+            else:
+                key.failures = 0
+            self._publish(key)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._cond:
+            return [key.to_dict(now) for key in self.keys]
+
+    def _remember(self, task_id: str, key: PooledKey):
+        """Caller holds ``_cond``"""
+        self._routes[task_id] = key
+        self._routes.move_to_end(task_id)
+        for _ in range(len(self._routes) - _MAX_ROUTES):
+            oldest, owner = next(iter(self._routes.items()))
+            if oldest in owner.active:
+                # Still needed to release the task's slot
+                self._routes.move_to_end(oldest)
+            else:
+                del self._routes[oldest]
+
+    def _publish(self, key: PooledKey):
+        metrics.BROWSER_USE_KEY_TASKS.set(key.in_use, key=key.label)
+        metrics.BROWSER_USE_KEY_HEALTHY.set(int(key.healthy(time.monotonic())), key=key.label)
+
+
+key_pool = BrowserUseKeyPool.from_settings()
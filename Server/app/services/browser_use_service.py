@@ -1,20 +1,149 @@
+import copy
 import json
+import threading
 import time
 import uuid
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable, Hashable, Iterator
 import requests
 from loguru import logger
 from ..models.enums import EvaluationStatus
 from ..models.models import EvaluationResult, Submission
 from ..core.config import settings
+from ..core import metrics, tracing
+from .browser_use_key_pool import BrowserUseKeyPool, PooledKey, key_pool
+from .browser_use_cassettes import cassettes
+
+
+class _SingleFlight:
+    """Coalesces concurrent identical calls onto one execution and serves its result for a short window"""
+    
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._results: Dict[Hashable, tuple] = {}
+        self._calls: Dict[Hashable, dict] = {}
+    
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            cached = self._results.get(key)
+            if cached and cached[0] > time.monotonic():
+                return copy.deepcopy(cached[1])
+            
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = {'event': threading.Event(), 'result': None, 'error': None}
+                self._calls[key] = call
+        
+        if not is_leader:
+            call['event'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return copy.deepcopy(call['result'])
+        
+        try:
+            call['result'] = fn()
+            with self._lock:
+                self._results[key] = (time.monotonic() + self.ttl_seconds, call['result'])
+            return copy.deepcopy(call['result'])
+        except Exception as e:
+            call['error'] = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+                self._evict_expired()
+            call['event'].set()
+    
+    def forget(self, key: Hashable):
+        with self._lock:
+            self._results.pop(key, None)
+    
+    def _evict_expired(self):
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._results.items() if expires_at <= now]:
+            del self._results[key]
+
 
 class BrowserUseService:
     """Service for interacting with the Browser Use API for browser automation tasks"""
     
-    def __init__(self, api_key: str = None):
-        self.api_key = api_key or settings.BROWSER_USE_API_KEY
-        self.base_url = 'https://api.browser-use.com/api/v1'
-        self.headers = {'Authorization': f'Bearer {self.api_key}'}
+    # Shared by every instance so concurrent viewers of one task cost one upstream call
+    _lookups = _SingleFlight(settings.BROWSER_USE_LOOKUP_CACHE_SECONDS)
+    
+    def __init__(self, api_key: str = None, base_url: str = None):
+        # An explicit key bypasses the shared pool configured by BROWSER_USE_API_KEYS
+        self.key_pool = BrowserUseKeyPool([PooledKey(api_key)]) if api_key else key_pool
+        self.base_url = (base_url or settings.BROWSER_USE_BASE_URL).rstrip('/')
+    
+    def _request(self, method: str, path: str, operation: str, task_id: str = None, key: PooledKey = None, **kwargs) -> requests.Response:
+        """Send a request to the Browser Use API, recording its latency and outcome
+        
+        Args:
+            method: HTTP method
+            path: Path relative to the API base URL
+            operation: Name of the API operation for metrics and tracing
+            task_id: The Browser Use task the request concerns, if any; it is sent with the key that created the task
+            key: The API key to use, for requests not about an existing task
+            
+        Returns:
+            requests.Response: The successful response
+        """
+        if key is None:
+            key = self._key_for(task_id) if task_id else self.key_pool.keys[0]
+        self.key_pool.throttle(key)
+        
+        started = time.perf_counter()
+        status = 'error'
+        status_code = None
+        span_attributes = {
+            'http.method': method,
+            'http.url': f'{self.base_url}/{path}',
+            'browser_use.task_id': task_id,
+            'browser_use.key': key.label
+        }
+        try:
+            with tracing.start_span(f'browser_use.{operation}', span_attributes, tracing.SPAN_KIND_CLIENT) as span:
+                headers = tracing.inject_headers({'Authorization': f'Bearer {key.api_key}'})
+                if cassettes is not None:
+                    # Recording or replaying traffic (BROWSER_USE_CASSETTE_MODE)
+                    response = cassettes.request(operation, method, path, f'{self.base_url}/{path}', task_id, headers=headers, **kwargs)
+                else:
+                    response = requests.request(method, f'{self.base_url}/{path}', headers=headers, **kwargs)
+                status_code = response.status_code
+                status = str(status_code)
+                if span is not None:
+                    span.set_attribute('http.status_code', response.status_code)
+                response.raise_for_status()
+                return response
+        finally:
+            self.key_pool.report(key, status_code)
+            metrics.BROWSER_USE_REQUESTS.inc(operation=operation, status=status)
+            metrics.BROWSER_USE_REQUEST_DURATION.observe(time.perf_counter() - started, operation=operation)
+    
+    def _key_for(self, task_id: str) -> PooledKey:
+        """The key that owns a task; asks each key in turn for tasks created by another process"""
+        key = self.key_pool.route(task_id)
+        if key is not None or len(self.key_pool.keys) == 1:
+            return key or self.key_pool.keys[0]
+        for candidate in self.key_pool.keys:
+            try:
+                self._request('GET', f'task/{task_id}/status', 'get_task_status', task_id, key=candidate)
+            except requests.HTTPError as e:
+                if e.response is not None and e.response.status_code == 404:
+                    continue
+                raise
+            self.key_pool.learn(task_id, candidate)
+            return candidate
+        return self.key_pool.keys[0]
+    
+    def _lookup_key(self, kind: str, task_id: str) -> tuple:
+        return (self.base_url, kind, task_id)
+    
+    def _forget_lookups(self, task_id: str):
+        """Drop cached lookups for a task whose state we just changed"""
+        for kind in ('status', 'details'):
+            self._lookups.forget(self._lookup_key(kind, task_id))
     
     def create_task(self, instructions: str, options: Dict[str, Any] = None) -> str:
         """Create a new browser automation task
@@ -30,14 +159,26 @@ class BrowserUseService:
             payload = {'task': instructions}
             if options:
                 payload['options'] = options
-                
-            response = requests.post(
-                f'{self.base_url}/run-task', 
-                headers=self.headers, 
-                json=payload
-            )
-            response.raise_for_status()
-            return response.json()['id']
+            
+            # A key answering 429 or 401/403 is taken out of rotation, so retry on the next one
+            attempts = len(self.key_pool.keys)
+            for attempt in range(attempts):
+                key = self.key_pool.acquire()
+                try:
+                    response = self._request('POST', 'run-task', 'create_task', key=key, json=payload)
+                    task_id = response.json()['id']
+                except requests.HTTPError as e:
+                    self.key_pool.abandon(key)
+                    status_code = e.response.status_code if e.response is not None else None
+                    if status_code in (401, 403, 429) and attempt < attempts - 1:
+                        logger.warning(f"Browser Use key {key.label} rejected task creation ({status_code}); trying another key")
+                        continue
+                    raise
+                except Exception:
+                    self.key_pool.abandon(key)
+                    raise
+                self.key_pool.bind(key, task_id)
+                return task_id
         except Exception as e:
             logger.error(f"Error creating Browser Use task: {str(e)}")
             raise
@@ -45,6 +186,8 @@ class BrowserUseService:
     def get_task_status(self, task_id: str) -> Dict[str, Any]:
         """Get current task status
         
+        Concurrent calls for the same task share one upstream request.
+        
         Args:
             task_id: The ID of the task
             
@@ -52,19 +195,23 @@ class BrowserUseService:
             Dict: The task status
         """
         try:
-            response = requests.get(
-                f'{self.base_url}/task/{task_id}/status', 
-                headers=self.headers
+            return self._lookups.do(
+                self._lookup_key('status', task_id),
+                lambda: self._fetch_task_status(task_id)
             )
-            response.raise_for_status()
-            return response.json()
         except Exception as e:
             logger.error(f"Error getting Browser Use task status: {str(e)}")
             raise
     
+    def _fetch_task_status(self, task_id: str) -> Dict[str, Any]:
+        response = self._request('GET', f'task/{task_id}/status', 'get_task_status', task_id)
+        return response.json()
+    
     def get_task_details(self, task_id: str) -> Dict[str, Any]:
         """Get full task details including output
         
+        Concurrent calls for the same task share one upstream request.
+        
         Args:
             task_id: The ID of the task
             
@@ -72,29 +219,34 @@ class BrowserUseService:
             Dict: The task details
         """
         try:
-            response = requests.get(
-                f'{self.base_url}/task/{task_id}', 
-                headers=self.headers
+            return self._lookups.do(
+                self._lookup_key('details', task_id),
+                lambda: self._fetch_task_details(task_id)
             )
-            response.raise_for_status()
-            return response.json()
         except Exception as e:
             logger.error(f"Error getting Browser Use task details: {str(e)}")
             raise
     
-    def wait_for_completion(self, task_id: str, poll_interval: int = 2, callback=None) -> Dict[str, Any]:
+    def _fetch_task_details(self, task_id: str) -> Dict[str, Any]:
+        response = self._request('GET', f'task/{task_id}', 'get_task_details', task_id)
+        return response.json()
+    
+    def wait_for_completion(self, task_id: str, poll_interval: int = 2, callback=None, sleep: Callable[[float], None] = time.sleep) -> Dict[str, Any]:
         """Poll task status until completion
         
         Args:
             task_id: The ID of the task
             poll_interval: The interval in seconds to poll for updates
             callback: Optional callback function to execute on each status update
+            sleep: Function used to wait between polls; evaluations pass one that blocks while
+                paused and raises when the evaluation is stopped or times out
             
         Returns:
             Dict: The final task details
         """
         unique_steps = []
         while True:
+            metrics.BROWSER_USE_POLLS.inc()
             details = self.get_task_details(task_id)
             new_steps = details.get('steps', [])
             
@@ -111,9 +263,10 @@ class BrowserUseService:
             
             status = details.get('status')
             if status in ['finished', 'failed', 'stopped']:
+                self.key_pool.release(task_id)
                 return details
             
-            time.sleep(poll_interval)
+            sleep(poll_interval)
     
     def pause_task(self, task_id: str) -> bool:
         """Pause a running task
@@ -125,11 +278,8 @@ class BrowserUseService:
             bool: Success status
         """
         try:
-            response = requests.put(
-                f'{self.base_url}/pause-task?task_id={task_id}', 
-                headers=self.headers
-            )
-            response.raise_for_status()
+            self._request('PUT', 'pause-task', 'pause_task', task_id, params={'task_id': task_id})
+            self._forget_lookups(task_id)
             return True
         except Exception as e:
             logger.error(f"Error pausing Browser Use task: {str(e)}")
@@ -145,11 +295,8 @@ class BrowserUseService:
             bool: Success status
         """
         try:
-            response = requests.put(
-                f'{self.base_url}/resume-task?task_id={task_id}', 
-                headers=self.headers
-            )
-            response.raise_for_status()
+            self._request('PUT', 'resume-task', 'resume_task', task_id, params={'task_id': task_id})
+            self._forget_lookups(task_id)
             return True
         except Exception as e:
             logger.error(f"Error resuming Browser Use task: {str(e)}")
@@ -165,11 +312,9 @@ class BrowserUseService:
             bool: Success status
         """
         try:
-            response = requests.put(
-                f'{self.base_url}/stop-task?task_id={task_id}', 
-                headers=self.headers
-            )
-            response.raise_for_status()
+            self._request('PUT', 'stop-task', 'stop_task', task_id, params={'task_id': task_id})
+            self._forget_lookups(task_id)
+            self.key_pool.release(task_id)
             return True
         except Exception as e:
             logger.error(f"Error stopping Browser Use task: {str(e)}")
@@ -185,22 +330,19 @@ class BrowserUseService:
             Optional[str]: Base64 encoded screenshot or None if not available
         """
         try:
-            response = requests.get(
-                f'{self.base_url}/task/{task_id}/screenshot', 
-                headers=self.headers
-            )
-            response.raise_for_status()
+            response = self._request('GET', f'task/{task_id}/screenshot', 'get_screenshot', task_id)
             return response.json().get('screenshot')
         except Exception as e:
             logger.error(f"Error getting screenshot: {str(e)}")
             return None
     
-    def list_tasks(self, limit: int = 10, status: str = None) -> List[Dict[str, Any]]:
-        """List recent tasks
+    def list_tasks(self, limit: int = 10, status: str = None, page: int = None) -> List[Dict[str, Any]]:
+        """List recent tasks across all pooled keys
         
         Args:
             limit: Maximum number of tasks to return
             status: Filter by status (running, finished, failed, stopped)
+            page: 1-based page of results, newest first
             
         Returns:
             List[Dict]: List of tasks
@@ -209,23 +351,55 @@ class BrowserUseService:
             params = {'limit': limit}
             if status:
                 params['status'] = status
+            if page:
+                params['page'] = page
                 
-            response = requests.get(
-                f'{self.base_url}/tasks', 
-                headers=self.headers,
-                params=params
-            )
-            response.raise_for_status()
-            return response.json().get('tasks', [])
+            tasks = []
+            for key in self.key_pool.keys:
+                response = self._request('GET', 'tasks', 'list_tasks', key=key, params=params)
+                tasks.extend(response.json().get('tasks', []))
+            return sorted(tasks, key=lambda task: task.get('created_at') or '', reverse=True)[:limit]
         except Exception as e:
             logger.error(f"Error listing tasks: {str(e)}")
             return []
     
-    def execute_agent_task(self, submission: Submission) -> EvaluationResult:
+    def iter_tasks(self, status: str = None, page_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """Page through all tasks of every pooled key, newest first per key
+        
+        Unlike ``list_tasks`` errors are raised, so callers can tell an empty account from a failed listing.
+        
+        Args:
+            status: Filter by status (running, paused, finished, failed, stopped)
+            page_size: Tasks fetched per request
+            
+        Yields:
+            Dict: Each task
+        """
+        for key in self.key_pool.keys:
+            page = 1
+            while True:
+                params = {'limit': page_size, 'page': page}
+                if status:
+                    params['status'] = status
+                tasks = self._request('GET', 'tasks', 'list_tasks', key=key, params=params).json().get('tasks', [])
+                for task in tasks:
+                    # Later status and stop calls go to the key that owns the task
+                    self.key_pool.learn(task['id'], key)
+                    yield task
+                if len(tasks) < page_size:
+                    break
+                page += 1
+    
+    @tracing.traced('BrowserUseService.execute_agent_task')
+    def execute_agent_task(self, submission: Submission, evaluation=None, on_task_created: Callable[[str], None] = None) -> EvaluationResult:
         """Execute a task using an agent configuration
         
         Args:
             submission: The submission object containing agent and task details
+            evaluation: Optional in-flight evaluation; the created task is attached to it so the
+                watchdog and control actions can reach it, and polling follows its pause/stop state
+            on_task_created: Optional callback receiving the Browser Use task ID as soon as it exists,
+                used to persist it so the task can be reattached after a restart
             
         Returns:
             EvaluationResult: The evaluation result
@@ -241,51 +415,24 @@ class BrowserUseService:
             instructions = self._generate_instructions(agent_config, task_config)
             
             # Set task options
-            options = {
-                'max_time': task_config.get('maxTimeAllowed', 60),
-                'headless': task_config.get('headless', True),
-                'record_video': task_config.get('recordVideo', True),
-                'tags': [
-                    f"submission_{submission.id}",
-                    f"agent_{submission.agent.id}",
-                    f"task_{submission.task.id}"
-                ]
-            }
+            options = self._build_task_options(task_config, tags=[
+                f"submission_{submission.id}",
+                f"agent_{submission.agent.id}",
+                f"task_{submission.task.id}"
+            ])
             
             # Create and execute the task
             task_id = self.create_task(instructions, options)
             logger.info(f"Created Browser Use task with ID: {task_id} for submission {submission.id}")
+            tracing.set_attributes({'browser_use.task_id': task_id, 'submission.id': str(submission.id)})
+            if on_task_created:
+                on_task_created(task_id)
+            if evaluation is not None:
+                evaluation.attach_task(task_id)
             
-            # Wait for task completion
-            start_time = time.time()
-            task_result = self.wait_for_completion(task_id)
-            execution_time = time.time() - start_time
-            
-            # Process the results
-            status = EvaluationStatus.SUCCESS if task_result.get('status') == 'finished' else EvaluationStatus.FAILED
-            
-            # Calculate metrics based on task output
-            metrics = self._calculate_metrics(task_result, task_config)
-            
-            # Create evaluation result
-            evaluation = EvaluationResult(
-                submissionId=submission.id,
-                score=metrics.get('score', 0),
-                timeTaken=execution_time,
-                accuracy=metrics.get('accuracy', 0),
-                status=status,
-                completedAt=time.time(),
-                resultDetails={
-                    'browser_use_task_id': task_id,
-                    'steps': task_result.get('steps', []),
-                    'output': task_result.get('output', {}),
-                    'metrics': metrics,
-                    'video_url': task_result.get('video_url'),
-                    'screenshots': task_result.get('screenshots', [])
-                }
-            )
-            
-            return evaluation
+            # Wait for task completion and score it
+            result = self.collect_task_result(task_id, task_config, sleep=evaluation.sleep if evaluation is not None else time.sleep)
+            return EvaluationResult(submissionId=submission.id, completedAt=time.time(), **result)
             
         except Exception as e:
             logger.error(f"Error executing agent task: {str(e)}")
@@ -298,6 +445,68 @@ class BrowserUseService:
                 resultDetails={'error': str(e)}
             )
     
+    def collect_task_result(self, task_id: str, task_config: Dict[str, Any], sleep: Callable[[float], None] = time.sleep, reattached: bool = False) -> Dict[str, Any]:
+        """Wait for a Browser Use task to finish and score it
+        
+        Args:
+            task_id: The ID of the task
+            task_config: The task configuration used for scoring
+            sleep: Function used to wait between polls (see ``wait_for_completion``)
+            reattached: Whether we are resuming a wait started by an earlier process; the upstream
+                duration is used as the time taken since our own clock started late
+            
+        Returns:
+            Dict: score, timeTaken, accuracy, status and resultDetails
+        """
+        start_time = time.time()
+        task_result = self.wait_for_completion(task_id, sleep=sleep)
+        execution_time = time.time() - start_time
+        if reattached:
+            execution_time = task_result.get('duration', execution_time)
+        
+        # Process the results
+        status = EvaluationStatus.SUCCESS if task_result.get('status') == 'finished' else EvaluationStatus.FAILED
+        
+        # Calculate metrics based on task output
+        metrics = self._calculate_metrics(task_result, task_config)
+        
+        return {
+            'score': metrics.get('score', 0),
+            'timeTaken': execution_time,
+            'accuracy': metrics.get('accuracy', 0),
+            'status': status,
+            'resultDetails': {
+                'browser_use_task_id': task_id,
+                'steps': task_result.get('steps', []),
+                'output': task_result.get('output', {}),
+                'metrics': metrics,
+                'video_url': task_result.get('video_url'),
+                'screenshots': task_result.get('screenshots', [])
+            }
+        }
+    
+    def _build_task_options(self, task_config: Dict[str, Any], tags: List[str] = None, overrides: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Build the Browser Use task options for a task configuration
+        
+        Args:
+            task_config: The task configuration
+            tags: Optional tags identifying the submission, agent and task
+            overrides: Optional submission-level options taking precedence over the task defaults
+            
+        Returns:
+            Dict: The task options
+        """
+        options = {
+            'max_time': task_config.get('maxTimeAllowed', 60),
+            'headless': task_config.get('headless', True),
+            'record_video': task_config.get('recordVideo', True)
+        }
+        if overrides:
+            options.update(overrides)
+        if tags:
+            options['tags'] = tags
+        return options
+    
     def _generate_instructions(self, agent_config: Dict[str, Any], task_config: Dict[str, Any]) -> str:
         """Generate instructions for the Browser Use API based on agent and task configurations
         
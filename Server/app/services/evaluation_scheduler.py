@@ -0,0 +1,311 @@
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Any, Callable, Iterator, List, Optional, Set
+from loguru import logger
+from ..core import metrics
+from ..core.config import settings
+from ..db.database import get_db
+from .browser_use_service import BrowserUseService
+
+QUEUED = "queued"  # Waiting for a slot
+RUNNING = "running"
+PAUSED = "paused"  # Slot released until resumed
+RESUMING = "resuming"  # Resumed, waiting for a slot again
+COMPLETING = "completing"  # Result claimed by the worker
+TIMED_OUT = "timed_out"
+STOPPED = "stopped"
+
+
+class EvaluationCancelled(Exception):
+    """Raised in the worker when its evaluation was stopped or timed out"""
+
+
+class InFlightEvaluation:
+    """One evaluation registered with the scheduler, with the deadline the watchdog enforces"""
+
+    def __init__(
+        self,
+        scheduler: "EvaluationScheduler",
+        submission_id: str,
+        max_time: float,
+        on_timeout: Optional[Callable[["InFlightEvaluation"], None]] = None,
+        on_resume: Optional[Callable[["InFlightEvaluation"], None]] = None,
+        slots: int = 1
+    ):
+        self._scheduler = scheduler
+        self.submission_id = submission_id
+        self.max_time = max_time
+        # Concurrency slots held while running, one per parallel upstream run
+        self.slots = slots
+        self.on_timeout = on_timeout
+        self.on_resume = on_resume
+        self.state = QUEUED
+        self.holds_slot = False
+        self.started: Optional[float] = None
+        self.deadline: Optional[float] = None
+        # Running time left when paused; the deadline is pushed back by the time spent paused
+        self.remaining: Optional[float] = None
+        # Upstream tasks of the evaluation, one per trial
+        self.browser_task_ids: List[str] = []
+        # Wakes the worker from sleep() when the evaluation is paused, stopped or timed out
+        self.interrupt = threading.Event()
+
+    @property
+    def abandoned(self) -> bool:
+        return self.state in (TIMED_OUT, STOPPED)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started if self.started else 0.0
+
+    @property
+    def browser_task_id(self) -> Optional[str]:
+        return self.browser_task_ids[-1] if self.browser_task_ids else None
+
+    def attach_task(self, browser_task_id: str):
+        """Record an upstream task so the watchdog and control actions can reach it"""
+        if browser_task_id not in self.browser_task_ids:
+            self.browser_task_ids.append(browser_task_id)
+
+    def sleep(self, seconds: float):
+        """
+        Sleep for ``seconds`` of running time. Blocks without a slot while paused and raises
+        ``EvaluationCancelled`` if the evaluation is stopped or times out.
+        """
+        self._scheduler.sleep(self, seconds)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "submissionId": self.submission_id,
+            "state": self.state,
+            "slots": self.slots,
+            "browserUseTaskId": self.browser_task_id,
+            "browserUseTaskIds": list(self.browser_task_ids),
+            "maxTimeAllowed": self.max_time,
+            "elapsedSeconds": round(self.elapsed, 1),
+            "secondsUntilTimeout": round(self.deadline - time.monotonic(), 1) if self.state == RUNNING else None
+        }
+
+
+class EvaluationScheduler:
+    """
+    Bounds concurrent evaluations and enforces their wall-clock limit.
+
+    ``slot()`` blocks until one of ``EVALUATION_MAX_CONCURRENCY`` slots is free. A watchdog thread
+    expires evaluations running longer than ``maxTimeAllowed`` + ``EVALUATION_TIMEOUT_GRACE_SECONDS``:
+    it stops the upstream Browser Use task, runs the evaluation's ``on_timeout`` handler and frees
+    the slot, even if the worker thread is still blocked. Workers call ``claim()`` before writing
+    results so a late result never overwrites a timeout or a stop.
+
+    Paused evaluations give their slot back; the worker parks in ``sleep()`` until resumed, waits
+    for a slot again and then runs ``on_resume`` to re-attach to the upstream task.
+
+    An evaluation fanning out into parallel runs holds ``slots`` slots (capped at the concurrency
+    limit) and is only started once all of them are free.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self._available = max_concurrency
+        self._cond = threading.Condition()
+        self._evaluations: Dict[str, InFlightEvaluation] = {}
+        # Submissions handed to a worker thread that has not started them yet
+        self._pending: Set[str] = set()
+        self._watchdog: Optional[threading.Thread] = None
+
+    @contextmanager
+    def slot(
+        self,
+        submission_id: str,
+        max_time: float,
+        on_timeout: Optional[Callable[[InFlightEvaluation], None]] = None,
+        on_resume: Optional[Callable[[InFlightEvaluation], None]] = None,
+        slots: int = 1
+    ) -> Iterator[InFlightEvaluation]:
+        slots = max(1, min(slots, self.max_concurrency))
+        evaluation = InFlightEvaluation(self, submission_id, max_time, on_timeout, on_resume, slots)
+        with self._cond:
+            self._evaluations[submission_id] = evaluation
+            try:
+                self._acquire(evaluation, QUEUED, max_time + settings.EVALUATION_TIMEOUT_GRACE_SECONDS)
+            except EvaluationCancelled:
+                self._unregister(evaluation)
+                raise
+        self._ensure_watchdog()
+        try:
+            yield evaluation
+        finally:
+            with self._cond:
+                self._unregister(evaluation)
+
+    def sleep(self, evaluation: InFlightEvaluation, seconds: float):
+        wake_at = time.monotonic() + seconds
+        while True:
+            remaining = wake_at - time.monotonic()
+            if remaining <= 0:
+                return
+            if evaluation.interrupt.wait(remaining):
+                paused_at = time.monotonic()
+                self._park(evaluation)
+                wake_at += time.monotonic() - paused_at
+
+    def claim(self, evaluation: InFlightEvaluation) -> bool:
+        """Take ownership of the outcome; False if the evaluation was stopped or timed out"""
+        with self._cond:
+            if evaluation.state not in (RUNNING, PAUSED, RESUMING):
+                return False
+            evaluation.state = COMPLETING
+            return True
+
+    def get(self, submission_id: str) -> Optional[InFlightEvaluation]:
+        with self._cond:
+            return self._evaluations.get(submission_id)
+
+    def pause(self, submission_id: str) -> Optional[InFlightEvaluation]:
+        """Pause a running evaluation and free its slot; None if it is not running in this process"""
+        with self._cond:
+            evaluation = self._evaluations.get(submission_id)
+            if evaluation is None or evaluation.state != RUNNING:
+                return None
+            evaluation.state = PAUSED
+            evaluation.remaining = max(0.0, evaluation.deadline - time.monotonic())
+            evaluation.interrupt.set()
+            self._give_back(evaluation)
+            return evaluation
+
+    def resume(self, submission_id: str) -> Optional[InFlightEvaluation]:
+        """Let a paused evaluation compete for a slot again; None if it is not paused in this process"""
+        with self._cond:
+            evaluation = self._evaluations.get(submission_id)
+            if evaluation is None or evaluation.state != PAUSED:
+                return None
+            evaluation.state = RESUMING
+            self._cond.notify_all()
+            return evaluation
+
+    def stop(self, submission_id: str) -> Optional[InFlightEvaluation]:
+        """Stop a queued, running or paused evaluation; None if there is nothing left to stop"""
+        with self._cond:
+            evaluation = self._evaluations.get(submission_id)
+            if evaluation is None or evaluation.state not in (QUEUED, RUNNING, PAUSED, RESUMING):
+                return None
+            evaluation.state = STOPPED
+            evaluation.interrupt.set()
+            self._give_back(evaluation)
+            self._cond.notify_all()
+            return evaluation
+
+    def expect(self, submission_id: str):
+        """Heartbeat a submission queued for a worker in this process until ``forget``, so recovery leaves it alone"""
+        with self._cond:
+            self._pending.add(submission_id)
+        self._ensure_watchdog()
+
+    def forget(self, submission_id: str):
+        with self._cond:
+            self._pending.discard(submission_id)
+
+    def in_flight(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            return [evaluation.to_dict() for evaluation in self._evaluations.values()]
+
+    def _acquire(self, evaluation: InFlightEvaluation, waiting_state: str, run_for: float):
+        """Wait (holding the lock) until a slot is free, then start the clock; caller holds ``_cond``"""
+        while self._available < evaluation.slots and evaluation.state == waiting_state:
+            self._cond.wait()
+        if evaluation.state != waiting_state:
+            raise EvaluationCancelled(f"Evaluation of submission {evaluation.submission_id} was {evaluation.state}")
+        self._available -= evaluation.slots
+        evaluation.holds_slot = True
+        evaluation.state = RUNNING
+        evaluation.interrupt.clear()
+        now = time.monotonic()
+        evaluation.started = evaluation.started or now
+        evaluation.deadline = now + run_for
+        metrics.EVALUATIONS_IN_FLIGHT.set(self.max_concurrency - self._available)
+
+    def _park(self, evaluation: InFlightEvaluation):
+        """Block a paused worker until it is resumed and holds a slot again"""
+        with self._cond:
+            while evaluation.state == PAUSED:
+                self._cond.wait()
+            if evaluation.state in (RUNNING, COMPLETING):
+                # Another thread of this evaluation (a parallel trial) already took the slots back
+                return
+            if evaluation.state != RESUMING:
+                raise EvaluationCancelled(f"Evaluation of submission {evaluation.submission_id} was {evaluation.state}")
+            self._acquire(evaluation, RESUMING, evaluation.remaining)
+        logger.info(f"Resumed evaluation of submission {evaluation.submission_id}")
+        if evaluation.on_resume:
+            evaluation.on_resume(evaluation)
+
+    def _give_back(self, evaluation: InFlightEvaluation):
+        """Return the evaluation's slot, if it holds one; caller holds ``_cond``"""
+        if evaluation.holds_slot:
+            evaluation.holds_slot = False
+            self._available += evaluation.slots
+            metrics.EVALUATIONS_IN_FLIGHT.set(self.max_concurrency - self._available)
+            self._cond.notify_all()
+
+    def _unregister(self, evaluation: InFlightEvaluation):
+        """Caller holds ``_cond``"""
+        self._give_back(evaluation)
+        if self._evaluations.get(evaluation.submission_id) is evaluation:
+            del self._evaluations[evaluation.submission_id]
+
+    def _ensure_watchdog(self):
+        with self._cond:
+            if self._watchdog is None or not self._watchdog.is_alive():
+                self._watchdog = threading.Thread(target=self._watch, name="evaluation-watchdog", daemon=True)
+                self._watchdog.start()
+
+    def _watch(self):
+        last_heartbeat = 0.0
+        while True:
+            time.sleep(settings.EVALUATION_WATCHDOG_INTERVAL_SECONDS)
+            now = time.monotonic()
+            if now - last_heartbeat >= settings.RECOVERY_HEARTBEAT_SECONDS:
+                last_heartbeat = now
+                self._heartbeat()
+            with self._cond:
+                expired = []
+                for evaluation in self._evaluations.values():
+                    if evaluation.state == RUNNING and evaluation.deadline <= now:
+                        evaluation.state = TIMED_OUT
+                        evaluation.interrupt.set()
+                        self._give_back(evaluation)
+                        expired.append(evaluation)
+            for evaluation in expired:
+                try:
+                    self._expire(evaluation)
+                except Exception as e:
+                    logger.error(f"Watchdog failed to expire submission {evaluation.submission_id}: {str(e)}")
+
+    def _heartbeat(self):
+        """Mark this process's submissions as alive so the recovery pass leaves them alone"""
+        with self._cond:
+            submission_ids = sorted(self._pending.union(self._evaluations))
+        if not submission_ids:
+            return
+        try:
+            get_db().table("submissions").update({"heartbeatAt": datetime.now(timezone.utc).isoformat()}).in_("id", submission_ids).execute()
+        except Exception as e:
+            logger.warning(f"Failed to record heartbeat for {len(submission_ids)} submissions: {str(e)}")
+
+    def _expire(self, evaluation: InFlightEvaluation):
+        logger.warning(
+            f"Submission {evaluation.submission_id} exceeded maxTimeAllowed={evaluation.max_time}s "
+            f"(ran {evaluation.elapsed:.0f}s); stopping"
+        )
+        metrics.EVALUATION_TIMEOUTS.inc()
+        if evaluation.browser_task_ids:
+            browser_use_service = BrowserUseService()
+            for browser_task_id in list(evaluation.browser_task_ids):
+                browser_use_service.stop_task(browser_task_id)
+        if evaluation.on_timeout:
+            evaluation.on_timeout(evaluation)
+
+
+evaluation_scheduler = EvaluationScheduler(settings.EVALUATION_MAX_CONCURRENCY)
@@ -0,0 +1,286 @@
+"""
+Evaluation executors: what actually runs a submission against a task.
+
+``SubmissionService`` hands every evaluation to the executor selected by ``EVALUATION_EXECUTOR``:
+
+- ``simulated``: random scores after a short sleep, no upstream (the historical default)
+- ``browser_use``: a real Browser Use task, scored from its output
+- ``replay``: plays back step traces recorded from earlier Browser Use runs, at real or accelerated
+  speed, and scores them like live runs; deterministic and network-free, for regression tests and
+  capacity benchmarks
+
+Executors return a result dict with ``submissionId``, ``score``, ``timeTaken``, ``accuracy``,
+``status`` and ``resultDetails``. ``sleep`` is the evaluation's interruptible sleep, so executors
+must wait through it to honour pause, stop and timeouts.
+"""
+import glob
+import hashlib
+import json
+import os
+import random
+import time
+from typing import Dict, Any, Callable, List, Optional
+from loguru import logger
+from ..core.config import settings
+from ..models.enums import EvaluationStatus
+from .browser_use_service import BrowserUseService
+
+
+class EvaluationExecutor:
+    name = ""
+
+    def execute(
+        self,
+        submission: Dict[str, Any],
+        agent_config: Dict[str, Any],
+        task_config: Dict[str, Any],
+        options: Optional[Dict[str, Any]] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        on_task_created: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Evaluate a submission
+
+        Args:
+            submission: The submission row (id, agentId, taskId)
+            agent_config: The agent's configuration
+            task_config: The task's environment config
+            options: Submission-level overrides for the upstream task options
+            sleep: Function used for every wait
+            on_task_created: Called with the upstream task ID as soon as one exists
+        """
+        raise NotImplementedError
+
+    def reattach(
+        self,
+        submission: Dict[str, Any],
+        browser_task_id: str,
+        task_config: Dict[str, Any],
+        sleep: Callable[[float], None] = time.sleep
+    ) -> Optional[Dict[str, Any]]:
+        """Wait for an upstream task started by an earlier process; None if this executor has no upstream"""
+        return None
+
+
+class SimulatedExecutor(EvaluationExecutor):
+    name = "simulated"
+
+    def execute(self, submission, agent_config, task_config, options=None, sleep=time.sleep, on_task_created=None):
+        web_arena_config = task_config
+        # Simulate processing time
+        difficulty_multiplier = web_arena_config.get("difficultyMultiplier", 1.0)
+        time_factor = web_arena_config.get("timeFactor", 1.0)
+        processing_time = random.uniform(1, 3) * difficulty_multiplier * time_factor
+        sleep(processing_time)
+        
+        # Generate evaluation metrics
+        accuracy_boost = web_arena_config.get("accuracyBoost", 1.0)
+        base_score = random.uniform(60, 90)
+        score = min(100, base_score * accuracy_boost)            
+        time_taken = random.uniform(1, 8) * time_factor            
+        accuracy = random.uniform(0.7, 0.95) * accuracy_boost
+        max_steps = web_arena_config.get("maxSteps", 15)
+        
+        return {
+            "submissionId": str(submission["id"]),
+            "score": score,
+            "timeTaken": time_taken,
+            "accuracy": accuracy,
+            "status": EvaluationStatus.SUCCESS,
+            "resultDetails": self._generate_result_details(max_steps, web_arena_config)
+        }
+
+    def _generate_result_details(self, max_steps=15, web_arena_config=None):
+        if web_arena_config is None:
+            web_arena_config = {}
+            
+        web_arena_environment = web_arena_config.get("webArenaEnvironment", "Simulation")
+        
+        result = {
+            "task_completion": random.uniform(0.8, 1.0),
+            "navigation_efficiency": random.uniform(0.7, 1.0),
+            "error_rate": random.uniform(0, 0.2),
+            "steps_taken": random.randint(max(5, int(max_steps * 0.5)), max_steps),
+            "web_interactions": {
+                "clicks": random.randint(3, 10),
+                "form_fills": random.randint(1, 5),
+                "navigation_steps": random.randint(2, 8)
+            }
+        }
+        
+        if web_arena_environment == "Shopping":
+            result["environment_metrics"] = {
+                "product_comparison_score": random.uniform(0.7, 1.0),
+                "checkout_efficiency": random.uniform(0.6, 1.0),
+                "optimal_choice_accuracy": random.uniform(0.8, 1.0),
+                "budget_adherence": True if web_arena_config.get("budget", 0) > 0 else False
+            }
+        elif web_arena_environment == "Booking":
+            result["environment_metrics"] = {
+                "criteria_satisfaction": random.uniform(0.8, 1.0),
+                "filter_usage_efficiency": random.uniform(0.7, 0.95),
+                "value_optimization_score": random.uniform(0.6, 1.0),
+                "constraints_met": random.randint(2, 4) if web_arena_config.get("filterRequirements") else 2
+            }
+        elif web_arena_environment == "Banking":
+            result["environment_metrics"] = {
+                "security_navigation_score": random.uniform(0.7, 1.0),
+                "transaction_accuracy": random.uniform(0.9, 1.0),
+                "authentication_success": True,
+                "security_alerts_triggered": random.randint(0, 1) if web_arena_config.get("securityLevel") == "high" else 0
+            }
+        elif web_arena_environment == "Simulation":
+            if web_arena_config.get("platforms"):
+                result["environment_metrics"] = {
+                    "content_quality_score": random.uniform(0.7, 0.95),
+                    "platform_adherence": random.uniform(0.8, 1.0),
+                    "scheduling_optimization": random.uniform(0.6, 0.9),
+                    "platforms_utilized": len(web_arena_config.get("platforms", [])),
+                    "content_types_used": len(web_arena_config.get("contentTypes", []))
+                }
+            else:
+                result["environment_metrics"] = {
+                    "information_accuracy": random.uniform(0.8, 0.95),
+                    "source_diversity": random.uniform(0.7, 1.0),
+                    "summary_coherence": random.uniform(0.75, 0.95),
+                    "sources_utilized": random.randint(2, web_arena_config.get("informationSources", 4))
+                }
+        return result
+
+
+class BrowserUseExecutor(EvaluationExecutor):
+    name = "browser_use"
+
+    def __init__(self, browser_use_service: Optional[BrowserUseService] = None):
+        self.browser_use_service = browser_use_service or BrowserUseService()
+
+    def execute(self, submission, agent_config, task_config, options=None, sleep=time.sleep, on_task_created=None):
+        instructions = self.browser_use_service._generate_instructions(agent_config, task_config)
+        task_options = self.browser_use_service._build_task_options(task_config, tags=[
+            f"submission_{submission['id']}",
+            f"agent_{submission['agentId']}",
+            f"task_{submission['taskId']}"
+        ], overrides=options)
+
+        task_id = self.browser_use_service.create_task(instructions, task_options)
+        logger.info(f"Created Browser Use task {task_id} for submission {submission['id']}")
+        try:
+            if on_task_created:
+                on_task_created(task_id)
+            result = self._collect(submission, task_id, task_config, sleep)
+        except BaseException:
+            # Abandoned (stopped, timed out, superseded trial) or failed: don't leave the session running
+            self.browser_use_service.stop_task(task_id)
+            raise
+        return {"submissionId": str(submission["id"]), **result}
+
+    def reattach(self, submission, browser_task_id, task_config, sleep=time.sleep):
+        result = self._collect(submission, browser_task_id, task_config, sleep, reattached=True)
+        return {"submissionId": str(submission["id"]), **result}
+
+    def _collect(self, submission, task_id: str, task_config: Dict[str, Any], sleep: Callable[[float], None], reattached: bool = False) -> Dict[str, Any]:
+        result = self.browser_use_service.collect_task_result(task_id, task_config, sleep, reattached=reattached)
+        if settings.EVALUATION_TRACE_RECORD_DIR:
+            record_trace(str(submission["taskId"]), task_id, result)
+        return result
+
+
+class ReplayExecutor(EvaluationExecutor):
+    """
+    Replays recorded traces from ``EVALUATION_REPLAY_DIR``.
+
+    Traces for a task are the files ``<taskId>*.json`` (falling back to ``default*.json``); a
+    submission always gets the same one, picked by hashing its ID. Steps are played back with their
+    recorded spacing divided by ``EVALUATION_REPLAY_SPEED`` (0 replays instantly). Scores come from
+    the same metric calculation as live runs, using the recorded duration as the time taken.
+    """
+    name = "replay"
+
+    def __init__(self, trace_dir: Optional[str] = None, speed: Optional[float] = None):
+        self.trace_dir = trace_dir or settings.EVALUATION_REPLAY_DIR
+        self.speed = settings.EVALUATION_REPLAY_SPEED if speed is None else speed
+        self.browser_use_service = BrowserUseService()
+
+    def execute(self, submission, agent_config, task_config, options=None, sleep=time.sleep, on_task_created=None):
+        path = self._pick_trace(str(submission["taskId"]), str(submission["id"]))
+        with open(path) as trace_file:
+            trace = json.load(trace_file)
+
+        elapsed = 0.0
+        for step in trace.get("steps", []):
+            at = step.get("at", elapsed)
+            if self.speed and at > elapsed:
+                sleep((at - elapsed) / self.speed)
+            elapsed = max(elapsed, at)
+
+        task_result = {
+            "status": trace.get("status", "finished"),
+            "output": trace.get("output", {}),
+            "steps": trace.get("steps", []),
+            "duration": trace.get("duration", elapsed)
+        }
+        metrics = self.browser_use_service._calculate_metrics(task_result, task_config)
+        return {
+            "submissionId": str(submission["id"]),
+            "score": metrics.get("score", 0),
+            "timeTaken": task_result["duration"],
+            "accuracy": metrics.get("accuracy", 0),
+            "status": EvaluationStatus.SUCCESS if task_result["status"] == "finished" else EvaluationStatus.FAILED,
+            "resultDetails": {
+                "replayed_from": os.path.basename(path),
+                "browser_use_task_id": trace.get("browser_use_task_id"),
+                "steps": task_result["steps"],
+                "output": task_result["output"],
+                "metrics": metrics,
+                "video_url": trace.get("video_url"),
+                "screenshots": trace.get("screenshots", [])
+            }
+        }
+
+    def _pick_trace(self, task_id: str, submission_id: str) -> str:
+        paths = sorted(glob.glob(os.path.join(self.trace_dir, f"{task_id}*.json"))) \
+            or sorted(glob.glob(os.path.join(self.trace_dir, "default*.json")))
+        if not paths:
+            raise FileNotFoundError(f"No replay trace for task {task_id} in {self.trace_dir}")
+        index = int(hashlib.sha256(submission_id.encode()).hexdigest(), 16) % len(paths)
+        return paths[index]
+
+
+def record_trace(task_id: str, browser_task_id: str, result: Dict[str, Any]):
+    """
+    Save a finished Browser Use run as a replay trace, named ``<taskId>-<browserTaskId>.json``.
+
+    The API does not timestamp steps, so they are spread evenly over the run's duration.
+    """
+    details = result["resultDetails"]
+    steps: List[Dict[str, Any]] = details.get("steps") or []
+    duration = result["timeTaken"]
+    trace = {
+        "browser_use_task_id": browser_task_id,
+        "status": "finished" if result["status"] == EvaluationStatus.SUCCESS else "failed",
+        "duration": duration,
+        "output": details.get("output", {}),
+        "steps": [{**step, "at": duration * (i + 1) / len(steps)} for i, step in enumerate(steps)],
+        "video_url": details.get("video_url"),
+        "screenshots": details.get("screenshots", [])
+    }
+    try:
+        os.makedirs(settings.EVALUATION_TRACE_RECORD_DIR, exist_ok=True)
+        path = os.path.join(settings.EVALUATION_TRACE_RECORD_DIR, f"{task_id}-{browser_task_id}.json")
+        with open(path, "w") as trace_file:
+            json.dump(trace, trace_file, indent=2, default=str)
+    except OSError as e:
+        logger.warning(f"Could not record replay trace for Browser Use task {browser_task_id}: {str(e)}")
+
+
+_EXECUTORS = {
+    executor.name: executor
+    for executor in (SimulatedExecutor, BrowserUseExecutor, ReplayExecutor)
+}
+
+
+def get_executor(name: Optional[str] = None) -> EvaluationExecutor:
+    name = name or settings.EVALUATION_EXECUTOR
+    if name not in _EXECUTORS:
+        raise ValueError(f"Unknown EVALUATION_EXECUTOR {name!r}; expected one of {', '.join(_EXECUTORS)}")
+    return _EXECUTORS[name]()
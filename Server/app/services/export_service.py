@@ -0,0 +1,227 @@
+"""
+Streaming bulk export of submissions, evaluation results and leaderboard rows.
+
+Rows are read in chunks of ``EXPORT_CHUNK_SIZE`` submissions, walked in ID order with a keyset
+cursor, and each chunk is encoded and handed out before the next is read. Memory use therefore
+stays flat however many rows match. Evaluation and leaderboard rows are fetched per chunk of
+submissions, so every dataset takes the same task, agent, user and submission-date filters.
+"""
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Iterator
+from fastapi import HTTPException, status
+from ..core.config import settings
+from ..db.database import get_db
+
+DATASETS = {
+    "submissions": ["id", "userId", "agentId", "taskId", "status", "trials", "suiteRunId", "browserUseTaskId", "submittedAt"],
+    "evaluations": ["submissionId", "agentId", "taskId", "status", "score", "accuracy", "timeTaken", "cached", "completedAt"],
+    "leaderboard": ["submissionId", "agentId", "agentName", "taskId", "rank", "score", "accuracy", "timeTaken"]
+}
+
+# Typed Parquet columns; the rest are strings
+COLUMN_TYPES = {
+    "trials": "int64",
+    "rank": "int64",
+    "score": "float64",
+    "accuracy": "float64",
+    "timeTaken": "float64",
+    "cached": "bool_"
+}
+
+FORMATS = {
+    "jsonl": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet"
+}
+
+
+def naive_utc(value: datetime) -> str:
+    """Submission timestamps are stored as naive UTC ISO strings"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+
+class ExportService:
+    def __init__(self, chunk_size: Optional[int] = None):
+        self._db = get_db()
+        self.chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+
+    def validate(self, dataset: str, export_format: str, include_details: bool = False):
+        """Reject a bad export before any bytes are streamed"""
+        if dataset not in DATASETS:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"dataset must be one of: {', '.join(DATASETS)}")
+        if export_format not in FORMATS:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"format must be one of: {', '.join(FORMATS)}")
+        if include_details and dataset != "evaluations":
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="includeDetails only applies to the evaluations dataset")
+        if export_format == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Parquet export needs the pyarrow package on the server")
+
+    def columns(self, dataset: str, include_details: bool = False) -> List[str]:
+        return DATASETS[dataset] + (["resultDetails"] if include_details else [])
+
+    def iter_chunks(
+        self,
+        dataset: str,
+        task_id: Optional[uuid.UUID] = None,
+        agent_id: Optional[uuid.UUID] = None,
+        user_id: Optional[uuid.UUID] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        include_details: bool = False
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield the dataset's rows one chunk at a time
+
+        Args:
+            user_id: Only rows of this user's submissions; None exports every user's
+            since: Only submissions made at or after this time
+            until: Only submissions made before this time
+        """
+        cursor = None
+        while True:
+            query = self._db.table("submissions").select(",".join(DATASETS["submissions"]))
+            if task_id:
+                query = query.eq("taskId", str(task_id))
+            if agent_id:
+                query = query.eq("agentId", str(agent_id))
+            if user_id:
+                query = query.eq("userId", str(user_id))
+            if since:
+                query = query.gte("submittedAt", naive_utc(since))
+            if until:
+                query = query.lt("submittedAt", naive_utc(until))
+            if cursor:
+                query = query.gt("id", cursor)
+            submissions = query.order("id").limit(self.chunk_size).execute().data or []
+            if not submissions:
+                return
+
+            if dataset == "submissions":
+                rows = submissions
+            elif dataset == "evaluations":
+                rows = self._evaluation_rows(submissions, include_details)
+            else:
+                rows = self._leaderboard_rows(submissions)
+            if rows:
+                yield rows
+
+            if len(submissions) < self.chunk_size:
+                return
+            cursor = submissions[-1]["id"]
+
+    def _evaluation_rows(self, submissions: List[Dict[str, Any]], include_details: bool) -> List[Dict[str, Any]]:
+        by_id = {str(s["id"]): s for s in submissions}
+        response = self._db.table("evaluation_results") \
+            .select("submissionId,status,score,accuracy,timeTaken,completedAt,resultDetails") \
+            .in_("submissionId", list(by_id)) \
+            .execute()
+        rows = []
+        for evaluation in response.data or []:
+            submission = by_id[str(evaluation["submissionId"])]
+            details = evaluation.get("resultDetails") or {}
+            row = {
+                **evaluation,
+                "agentId": submission["agentId"],
+                "taskId": submission["taskId"],
+                "cached": bool(details.get("cached"))
+            }
+            if not include_details:
+                row.pop("resultDetails", None)
+            rows.append(row)
+        return rows
+
+    def _leaderboard_rows(self, submissions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        response = self._db.table("leaderboard") \
+            .select("submissionId,agentId,taskId,rank,score,accuracy,timeTaken") \
+            .in_("submissionId", [str(s["id"]) for s in submissions]) \
+            .execute()
+        rows = response.data or []
+        agent_ids = sorted({str(row["agentId"]) for row in rows})
+        names = {}
+        if agent_ids:
+            agents = self._db.table("agents").select("id,name").in_("id", agent_ids).execute()
+            names = {str(agent["id"]): agent["name"] for agent in agents.data or []}
+        return [{**row, "agentName": names.get(str(row["agentId"]))} for row in rows]
+
+    def stream(self, export_format: str, columns: List[str], chunks: Iterator[List[Dict[str, Any]]]) -> Iterator[bytes]:
+        """Encode chunks of rows, yielding the bytes of each chunk as soon as it is encoded"""
+        encode = {"jsonl": self._jsonl, "csv": self._csv, "parquet": self._parquet}[export_format]
+        return encode(columns, chunks)
+
+    def _jsonl(self, columns: List[str], chunks: Iterator[List[Dict[str, Any]]]) -> Iterator[bytes]:
+        for rows in chunks:
+            yield "".join(json.dumps({c: row.get(c) for c in columns}, default=str) + "\n" for row in rows).encode()
+
+    def _csv(self, columns: List[str], chunks: Iterator[List[Dict[str, Any]]]) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for rows in chunks:
+            for row in rows:
+                writer.writerow([self._cell(row.get(c)) for c in columns])
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    def _parquet(self, columns: List[str], chunks: Iterator[List[Dict[str, Any]]]) -> Iterator[bytes]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([(c, getattr(pa, COLUMN_TYPES.get(c, "string"))()) for c in columns])
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema)
+        for rows in chunks:
+            table = pa.Table.from_pydict({
+                c: [row.get(c) if c in COLUMN_TYPES else self._cell(row.get(c)) for row in rows]
+                for c in columns
+            }, schema=schema)
+            writer.write_table(table)
+            yield sink.drain()
+        writer.close()
+        yield sink.drain()
+
+    def _cell(self, value: Any) -> Optional[str]:
+        if value is None:
+            return None
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, default=str)
+        if isinstance(value, bool):
+            return str(value).lower()
+        return str(getattr(value, "value", value))
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands out what was written since the last ``drain``"""
+
+    def __init__(self):
+        super().__init__()
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
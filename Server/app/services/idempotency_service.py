@@ -0,0 +1,137 @@
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Any, Callable, Optional, Tuple
+from fastapi import HTTPException
+from loguru import logger
+from ..core import metrics
+from ..core.config import settings
+from ..db.database import get_db
+
+
+def request_fingerprint(agent_id: uuid.UUID, task_id: uuid.UUID, trials: int) -> str:
+    """What a submission request asks for; a key may only be reused for the same request"""
+    return f"{agent_id}:{task_id}:{trials}"
+
+
+class _Call:
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.event = threading.Event()
+        self.submission_id: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+
+class IdempotencyStore:
+    """
+    Maps ``Idempotency-Key`` headers to the submission they created, per user.
+
+    The first request with a key creates the submission. Repeats within
+    ``IDEMPOTENCY_TTL_SECONDS`` get that submission back instead of a new one. Concurrent duplicates
+    wait for the first request and share its outcome, errors included. Reusing a key for a different
+    agent, task or trial count is rejected with 422.
+
+    Keys are cached per process. They are also stored on the submission row, so a retry that lands on
+    another worker or arrives after a restart still finds the original submission.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], Tuple[float, str, str]] = {}
+        self._calls: Dict[Tuple[str, str], _Call] = {}
+
+    def run(self, user_id: uuid.UUID, key: str, fingerprint: str, create: Callable[[], Dict[str, Any]]) -> Tuple[str, bool]:
+        """
+        Create a submission once per key.
+
+        Args:
+            user_id: The submitting user; keys are scoped to them
+            key: The ``Idempotency-Key`` header
+            fingerprint: ``request_fingerprint`` of the request
+            create: Creates the submission and returns its row
+
+        Returns:
+            Tuple of the submission ID and whether it came from an earlier request
+        """
+        scope = (str(user_id), key)
+        with self._lock:
+            entry = self._entries.get(scope)
+            if entry and entry[0] >= time.monotonic():
+                self._check(entry[1], fingerprint)
+                metrics.IDEMPOTENT_SUBMISSIONS.inc(outcome="replayed")
+                return entry[2], True
+
+            call = self._calls.get(scope)
+            is_leader = call is None
+            if is_leader:
+                call = _Call(fingerprint)
+                self._calls[scope] = call
+
+        if not is_leader:
+            self._check(call.fingerprint, fingerprint)
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            metrics.IDEMPOTENT_SUBMISSIONS.inc(outcome="coalesced")
+            return call.submission_id, True
+
+        try:
+            existing = self._find_existing(user_id, key)
+            if existing is not None:
+                self._check(request_fingerprint(existing["agentId"], existing["taskId"], existing.get("trials") or 1), fingerprint)
+                call.submission_id, replayed = str(existing["id"]), True
+                metrics.IDEMPOTENT_SUBMISSIONS.inc(outcome="replayed")
+            else:
+                call.submission_id, replayed = str(create()["id"]), False
+                metrics.IDEMPOTENT_SUBMISSIONS.inc(outcome="created")
+            with self._lock:
+                self._entries[scope] = (time.monotonic() + self.ttl_seconds, fingerprint, call.submission_id)
+                self._evict_expired()
+            return call.submission_id, replayed
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(scope, None)
+            call.event.set()
+
+    def _check(self, stored: str, fingerprint: str):
+        if stored != fingerprint:
+            metrics.IDEMPOTENT_SUBMISSIONS.inc(outcome="conflict")
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used for a different submission request"
+            )
+
+    def _find_existing(self, user_id: uuid.UUID, key: str) -> Optional[Dict[str, Any]]:
+        """A submission created with this key by any worker within the TTL"""
+        try:
+            response = get_db().table("submissions") \
+                .select("id,agentId,taskId,trials,submittedAt") \
+                .eq("userId", str(user_id)) \
+                .eq("idempotencyKey", key) \
+                .execute()
+        except Exception as e:
+            # Fall back to the per-process cache rather than failing the submission
+            logger.warning(f"Could not look up Idempotency-Key: {str(e)}")
+            return None
+        now = datetime.now(timezone.utc)
+        for row in response.data or []:
+            submitted_at = datetime.fromisoformat(str(row["submittedAt"]).replace("Z", "+00:00"))
+            if submitted_at.tzinfo is None:
+                submitted_at = submitted_at.replace(tzinfo=timezone.utc)
+            if (now - submitted_at).total_seconds() <= self.ttl_seconds:
+                return row
+        return None
+
+    def _evict_expired(self):
+        """Caller holds ``_lock``"""
+        now = time.monotonic()
+        for scope in [s for s, (expires_at, _, _) in self._entries.items() if expires_at < now]:
+            del self._entries[scope]
+
+
+idempotency_store = IdempotencyStore(settings.IDEMPOTENCY_TTL_SECONDS)
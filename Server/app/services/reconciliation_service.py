@@ -0,0 +1,185 @@
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+from loguru import logger
+from ..core import metrics
+from ..core.config import settings
+from ..db.database import get_db
+from ..models.enums import SubmissionStatus
+from .browser_use_service import BrowserUseService
+from .submission_service import persisted_task_ids
+
+# Upstream statuses that still hold a browser session
+_LIVE_STATUSES = ("created", "running", "paused")
+_FINISHED_STATUSES = {SubmissionStatus.COMPLETED.value, SubmissionStatus.FAILED.value}
+_ACTIVE_STATUSES = [SubmissionStatus.QUEUED.value, SubmissionStatus.PENDING.value, SubmissionStatus.PROCESSING.value]
+
+# Submission ids looked up per database request
+_LOOKUP_BATCH = 200
+
+
+def _created_at(task: Dict[str, Any]) -> Optional[datetime]:
+    """Upstream creation time of a task, None when the listing doesn't say"""
+    if not task.get("created_at"):
+        return None
+    parsed = datetime.fromisoformat(str(task["created_at"]).replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _parse_tags(tags: List[str]) -> Dict[str, str]:
+    """Map the ``submission_``/``agent_``/``task_`` tags set by ``execute_agent_task`` to their ids"""
+    parsed = {}
+    for tag in tags or []:
+        kind, _, value = str(tag).partition("_")
+        if kind in ("submission", "agent", "task") and value:
+            parsed[kind] = value
+    return parsed
+
+
+class UpstreamTaskReconciler:
+    """
+    Reconciles live Browser Use tasks with the submissions table.
+
+    An upstream task tagged ``submission_<id>`` is an orphan when that submission no longer exists,
+    has already finished, or has moved on to different Browser Use tasks. A task the submission
+    doesn't record yet is only superseded once it is older than a task it does record, or older
+    than ``RECONCILER_ORPHAN_GRACE_SECONDS``: until then it may be a trial whose id hasn't been
+    persisted yet, and is counted as ``unrecorded``. With ``RECONCILER_STOP_ORPHANS`` on, orphans
+    older than the grace age are stopped so leaked sessions stop eating the concurrency quota;
+    it is off by default because another environment sharing the API key tags its tasks the same
+    way. Untagged tasks were not started by us and are left alone.
+
+    Drift is reported in the other direction too: active submissions none of whose recorded tasks
+    (``browserUseTaskId``, or ``browserUseTaskIds`` for multi-trial submissions) is live upstream.
+    """
+
+    def __init__(self, browser_use_service: Optional[BrowserUseService] = None):
+        self._db = get_db()
+        self.browser_use_service = browser_use_service or BrowserUseService()
+
+    def reconcile(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            # Keyed by id: a task changing status between listings may show up twice
+            live = list({
+                task["id"]: task
+                for status in _LIVE_STATUSES
+                for task in self.browser_use_service.iter_tasks(status=status, page_size=settings.RECONCILER_PAGE_SIZE)
+            }.values())
+            submissions = self._load_submissions({
+                _parse_tags(task.get("tags")).get("submission") for task in live
+            } - {None})
+            created = {task["id"]: _created_at(task) for task in live}
+
+            counts = Counter()
+            orphans = []
+            for task in live:
+                state = self._classify(task, submissions, created)
+                counts[state] += 1
+                if state.startswith("orphaned:"):
+                    orphans.append((task, state.split(":", 1)[1]))
+
+            stopped = 0
+            for task, reason in orphans:
+                tags = _parse_tags(task.get("tags"))
+                logger.warning(f"Orphaned Browser Use task {task['id']} for submission {tags['submission']} ({reason})")
+                if not settings.RECONCILER_STOP_ORPHANS or not self._past_grace(created[task["id"]]):
+                    continue
+                if self.browser_use_service.stop_task(task["id"]):
+                    stopped += 1
+                    metrics.BROWSER_USE_ORPHANS_STOPPED.inc(reason=reason)
+
+            missing_upstream = self._count_missing_upstream({task["id"] for task in live})
+        except Exception as e:
+            metrics.RECONCILIATION_RUNS.inc(outcome="error")
+            logger.error(f"Upstream task reconciliation failed: {str(e)}")
+            raise
+
+        orphaned = sum(count for state, count in counts.items() if state.startswith("orphaned:"))
+        for kind, value in (
+            ("orphaned", orphaned),
+            ("untagged", counts["untagged"]),
+            ("mismatched", counts["mismatched"]),
+            ("missing_upstream", missing_upstream)
+        ):
+            metrics.BROWSER_USE_TASK_DRIFT.set(value, kind=kind)
+        metrics.RECONCILIATION_RUNS.inc(outcome="ok")
+
+        report = {
+            "liveTasks": len(live),
+            "tracked": counts["tracked"],
+            "untagged": counts["untagged"],
+            "mismatched": counts["mismatched"],
+            "unrecorded": counts["unrecorded"],
+            "orphaned": {state.split(":", 1)[1]: count for state, count in counts.items() if state.startswith("orphaned:")},
+            "stopped": stopped,
+            "missingUpstream": missing_upstream,
+            "durationSeconds": round(time.perf_counter() - started, 3)
+        }
+        if orphaned or missing_upstream:
+            logger.info(f"Reconciliation found drift: {report}")
+        return report
+
+    def _classify(self, task: Dict[str, Any], submissions: Dict[str, Dict[str, Any]], created: Dict[str, Optional[datetime]] = None) -> str:
+        created = created or {}
+        tags = _parse_tags(task.get("tags"))
+        submission_id = tags.get("submission")
+        if not submission_id:
+            return "untagged"
+        submission = submissions.get(submission_id)
+        if submission is None:
+            return "orphaned:deleted"
+        if submission["status"] in _FINISHED_STATUSES:
+            return "orphaned:finished"
+        known_task_ids = persisted_task_ids(submission)
+        if known_task_ids and task["id"] not in known_task_ids:
+            task_created = created.get(task["id"], _created_at(task))
+            newest_known = max((created[t] for t in known_task_ids if created.get(t)), default=None)
+            if (task_created and newest_known and task_created < newest_known) or self._past_grace(task_created):
+                return "orphaned:superseded"
+            # Probably a trial created since the submission was last written
+            return "unrecorded"
+        if tags.get("agent", submission["agentId"]) != submission["agentId"] or tags.get("task", submission["taskId"]) != submission["taskId"]:
+            # The tags point at this submission but disagree about what it runs; report, don't stop
+            return "mismatched"
+        return "tracked"
+
+    @staticmethod
+    def _past_grace(created_at: Optional[datetime]) -> bool:
+        if created_at is None:
+            return False
+        return (datetime.now(timezone.utc) - created_at).total_seconds() >= settings.RECONCILER_ORPHAN_GRACE_SECONDS
+
+    def _load_submissions(self, submission_ids: set) -> Dict[str, Dict[str, Any]]:
+        ids = sorted(submission_ids)
+        submissions = {}
+        for start in range(0, len(ids), _LOOKUP_BATCH):
+            response = self._db.table("submissions") \
+                .select("id,status,agentId,taskId,browserUseTaskId,browserUseTaskIds") \
+                .in_("id", ids[start:start + _LOOKUP_BATCH]) \
+                .execute()
+            submissions.update({str(row["id"]): row for row in response.data or []})
+        return submissions
+
+    def _count_missing_upstream(self, live_task_ids: set) -> int:
+        response = self._db.table("submissions") \
+            .select("browserUseTaskId,browserUseTaskIds") \
+            .in_("status", _ACTIVE_STATUSES) \
+            .execute()
+        return sum(1 for row in response.data or [] if persisted_task_ids(row) and live_task_ids.isdisjoint(persisted_task_ids(row)))
+
+
+def start_reconciliation_loop():
+    """Reconcile every ``RECONCILER_INTERVAL_SECONDS`` on a daemon thread"""
+    def loop():
+        while True:
+            time.sleep(settings.RECONCILER_INTERVAL_SECONDS)
+            try:
+                UpstreamTaskReconciler().reconcile()
+            except Exception:
+                # Already logged and counted; try again next interval
+                pass
+
+    threading.Thread(target=loop, name="upstream-reconciler", daemon=True).start()
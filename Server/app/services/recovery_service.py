@@ -0,0 +1,103 @@
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Any, List
+from loguru import logger
+from ..core.config import settings
+from ..db.database import get_db
+from ..models.enums import SubmissionStatus
+from .submission_service import SubmissionService
+
+_STRANDED_STATUSES = [SubmissionStatus.QUEUED.value, SubmissionStatus.PROCESSING.value]
+
+
+def _age_seconds(timestamp: str, now: datetime) -> float:
+    parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return (now - parsed).total_seconds()
+
+
+class SubmissionRecoveryService:
+    """
+    Picks up submissions whose worker died: QUEUED or PROCESSING submissions with no heartbeat
+    for ``RECOVERY_STALE_SECONDS``. Live workers heartbeat every submission they hold or have
+    queued (see ``EvaluationScheduler``), so only submissions left behind by a crashed or restarted
+    process qualify.
+
+    Every run of a submission first claims it by setting ``claimedBy``. The first worker claims it
+    from NULL, and recovery claims it from the owner it saw go stale. A queued worker that starts
+    after recovery took its submission therefore backs off instead of evaluating it twice.
+
+    Recovered submissions are processed again. Those with a persisted ``browserUseTaskId`` (or
+    ``browserUseTaskIds`` for multi-trial submissions) reattach to their upstream tasks instead of
+    starting new browser sessions, and finalize immediately if those finished while we were down.
+
+    Paused (PENDING) submissions are not recovered on their own; resuming one whose worker is gone
+    adopts it the same way (see ``SubmissionService.control_submission``).
+    """
+
+    def __init__(self):
+        self._db = get_db()
+
+    def find_stranded(self) -> List[Dict[str, Any]]:
+        response = self._db.table("submissions") \
+            .select("id,status,browserUseTaskId,browserUseTaskIds,heartbeatAt,claimedBy,submittedAt") \
+            .in_("status", _STRANDED_STATUSES) \
+            .execute()
+        return [row for row in response.data or [] if self.is_stale(row)]
+
+    def is_stale(self, row: Dict[str, Any]) -> bool:
+        """Whether no worker has heartbeated the submission for ``RECOVERY_STALE_SECONDS``"""
+        return _age_seconds(row.get("heartbeatAt") or row["submittedAt"], datetime.now(timezone.utc)) >= settings.RECOVERY_STALE_SECONDS
+
+    def claim(self, row: Dict[str, Any]) -> bool:
+        """Take over a stranded submission; False if another process claimed it first"""
+        query = self._db.table("submissions") \
+            .update({"claimedBy": str(uuid.uuid4()), "heartbeatAt": datetime.now(timezone.utc).isoformat()}) \
+            .eq("id", row["id"])
+        for column in ("heartbeatAt", "claimedBy"):
+            if row.get(column):
+                query = query.eq(column, row[column])
+            else:
+                query = query.is_(column, "null")
+        return bool(query.execute().data)
+
+    def recover(self) -> Dict[str, int]:
+        counts = {"reattached": 0, "restarted": 0}
+        for row in self.find_stranded():
+            if not self.claim(row):
+                continue
+            kind = "reattached" if row.get("browserUseTaskId") or row.get("browserUseTaskIds") else "restarted"
+            counts[kind] += 1
+            logger.info(f"Recovering {row['status']} submission {row['id']} ({kind})")
+            self.start(row["id"])
+        if any(counts.values()):
+            logger.info(f"Recovery pass: {counts['reattached']} reattached, {counts['restarted']} restarted")
+        return counts
+
+    def start(self, submission_id: str):
+        """Process a claimed submission on a new thread"""
+        threading.Thread(target=self._process, args=(submission_id,), name=f"recover-{submission_id[:8]}", daemon=True).start()
+
+    def _process(self, submission_id: str):
+        try:
+            SubmissionService().process_submission(submission_id, claimed=True)
+        except Exception as e:
+            logger.error(f"Recovered submission {submission_id} failed: {str(e)}")
+
+
+def start_recovery_loop():
+    """Run a recovery pass now and then every ``RECOVERY_INTERVAL_SECONDS`` on a daemon thread"""
+    def loop():
+        while True:
+            try:
+                SubmissionRecoveryService().recover()
+            except Exception as e:
+                logger.error(f"Submission recovery pass failed: {str(e)}")
+            if not settings.RECOVERY_INTERVAL_SECONDS:
+                return
+            time.sleep(settings.RECOVERY_INTERVAL_SECONDS)
+
+    threading.Thread(target=loop, name="submission-recovery", daemon=True).start()
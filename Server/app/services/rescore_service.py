@@ -0,0 +1,244 @@
+import uuid
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable
+from fastapi import HTTPException, status
+from loguru import logger
+from ..db.database import get_db
+from ..models.enums import EvaluationStatus
+from .browser_use_service import BrowserUseService
+from .submission_service import SubmissionService
+from .task_service import TaskService
+from . import trial_stats
+
+# Rescore jobs are tracked per process so progress can be polled while the job runs. Jobs are only
+# visible to the worker that started them and are lost on restart; with several workers, poll with
+# sticky sessions, or resume an interrupted job from its last cursor with ``resumeFrom``.
+_jobs: Dict[str, Dict[str, Any]] = {}
+_jobs_lock = threading.Lock()
+
+
+class RescoreService:
+    """Recomputes stored evaluation scores for a task after its scoring configuration changes"""
+
+    def __init__(self):
+        self._db = get_db()
+        self.browser_use_service = BrowserUseService()
+        self.submission_service = SubmissionService()
+        self.task_service = TaskService()
+
+    def start_job(self, task_id: uuid.UUID, batch_size: int = 100, resume_from: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Register a new rescore job for a task
+
+        Args:
+            task_id: The task whose evaluations should be rescored
+            batch_size: Number of submissions processed per batch
+            resume_from: Submission ID cursor from an interrupted job to continue after
+        """
+        job = {
+            "id": str(uuid.uuid4()),
+            "taskId": str(task_id),
+            "status": "PENDING",
+            "batchSize": batch_size,
+            "cursor": resume_from,
+            "processed": 0,
+            "updated": 0,
+            "skipped": 0,
+            "startedAt": datetime.utcnow().isoformat(),
+            "finishedAt": None,
+            "error": None
+        }
+        with _jobs_lock:
+            _jobs[job["id"]] = job
+        return dict(job)
+
+    def get_job(self, job_id: str) -> Dict[str, Any]:
+        with _jobs_lock:
+            job = _jobs.get(job_id)
+            if not job:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Rescore job with ID {job_id} not found"
+                )
+            return dict(job)
+
+    def run_job(self, job_id: str) -> Dict[str, Any]:
+        """Run a registered rescore job to completion, updating its progress after every batch"""
+        job = self.get_job(job_id)
+        self._update_job(job_id, status="RUNNING")
+
+        def on_batch(progress: Dict[str, Any]):
+            self._update_job(job_id, **progress)
+
+        try:
+            result = self.rescore_task(
+                uuid.UUID(job["taskId"]),
+                batch_size=job["batchSize"],
+                resume_from=job["cursor"],
+                progress_callback=on_batch
+            )
+            self._update_job(job_id, status="COMPLETED", finishedAt=datetime.utcnow().isoformat(), **result)
+        except Exception as e:
+            logger.error(f"Rescore job {job_id} failed: {str(e)}")
+            self._update_job(job_id, status="FAILED", finishedAt=datetime.utcnow().isoformat(), error=str(e))
+        return self.get_job(job_id)
+
+    def rescore_task(
+        self,
+        task_id: uuid.UUID,
+        batch_size: int = 100,
+        resume_from: Optional[str] = None,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Stream every stored evaluation for a task, recompute its metrics with the current task
+        configuration and write the new scores back in bulk. Ranks are recomputed once at the end.
+
+        Submissions are walked in ID order, so the cursor reported after each batch can be passed
+        back as ``resume_from`` to continue an interrupted run without redoing finished batches.
+
+        Args:
+            task_id: The task whose evaluations should be rescored
+            batch_size: Number of submissions processed per batch
+            resume_from: Submission ID to continue after
+            progress_callback: Optional callable receiving progress after each batch
+        """
+        task_config = self.task_service.get_task(task_id).get("environmentConfig") or {}
+
+        cursor = resume_from
+        progress = {"processed": 0, "updated": 0, "skipped": 0, "cursor": cursor}
+
+        while True:
+            submission_ids = self._next_submission_batch(task_id, cursor, batch_size)
+            if not submission_ids:
+                break
+
+            updated = self._rescore_batch(submission_ids, task_config)
+
+            cursor = submission_ids[-1]
+            progress["processed"] += len(submission_ids)
+            progress["updated"] += updated
+            progress["skipped"] += len(submission_ids) - updated
+            progress["cursor"] = cursor
+
+            logger.info(
+                f"Rescored {progress['processed']} submissions for task {task_id} "
+                f"({progress['updated']} updated), cursor={cursor}"
+            )
+            if progress_callback:
+                progress_callback(dict(progress))
+
+            if len(submission_ids) < batch_size:
+                break
+
+        if progress["updated"]:
+            self.submission_service._update_ranks(str(task_id))
+
+        return progress
+
+    def _next_submission_batch(self, task_id: uuid.UUID, cursor: Optional[str], batch_size: int) -> List[str]:
+        query = self._db.table("submissions").select("id").eq("taskId", str(task_id))
+        if cursor:
+            query = query.gt("id", cursor)
+        response = query.order("id").limit(batch_size).execute()
+        return [row["id"] for row in response.data or []]
+
+    def _rescore_batch(self, submission_ids: List[str], task_config: Dict[str, Any]) -> int:
+        eval_response = self._db.table("evaluation_results").select("*").in_("submissionId", submission_ids).execute()
+        evaluations = eval_response.data or []
+        if not evaluations:
+            return 0
+
+        leaderboard_response = self._db.table("leaderboard").select("*").in_("submissionId", submission_ids).execute()
+        leaderboard_by_submission = {entry["submissionId"]: entry for entry in leaderboard_response.data or []}
+
+        updated_evaluations = []
+        updated_entries = []
+        for evaluation in evaluations:
+            if (evaluation.get("resultDetails") or {}).get("trials"):
+                updated = self._rescore_trials(evaluation, task_config)
+            else:
+                updated = self._rescore_run(evaluation, task_config)
+            updated_evaluations.append(updated)
+
+            entry = leaderboard_by_submission.get(evaluation["submissionId"])
+            if entry:
+                updated_entries.append({
+                    **entry,
+                    "score": updated["score"],
+                    "accuracy": updated["accuracy"]
+                })
+
+        self._db.table("evaluation_results").upsert(updated_evaluations).execute()
+        if updated_entries:
+            self._db.table("leaderboard").upsert(updated_entries).execute()
+        # Keep the copy used by submission search in step. Only the score column is written, so a
+        # status change or heartbeat landing meanwhile isn't reverted; submissions sharing a score
+        # are updated together.
+        ids_by_score: Dict[float, List[str]] = {}
+        for evaluation in updated_evaluations:
+            ids_by_score.setdefault(evaluation["score"], []).append(str(evaluation["submissionId"]))
+        for score, ids in ids_by_score.items():
+            self._db.table("submissions").update({"score": score}).in_("id", ids).execute()
+
+        return len(updated_evaluations)
+
+    def _rescore_run(self, evaluation: Dict[str, Any], task_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Recompute one run's score and accuracy; takes and returns an evaluation row or a trial run"""
+        metrics = self.browser_use_service._calculate_metrics(
+            self._task_result_from_evaluation(evaluation),
+            task_config
+        )
+        result_details = dict(evaluation.get("resultDetails") or {})
+        result_details["metrics"] = metrics
+        result_details["rescoredAt"] = datetime.utcnow().isoformat()
+        return {
+            **evaluation,
+            "score": metrics.get("score", 0),
+            "accuracy": metrics.get("accuracy", 0),
+            "resultDetails": result_details
+        }
+
+    def _rescore_trials(self, evaluation: Dict[str, Any], task_config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Rescore every run of a multi-trial evaluation and aggregate them again. The steps and output
+        live on the runs; the top level of a trial result only holds the aggregate.
+        """
+        result_details = dict(evaluation["resultDetails"])
+        trials = dict(result_details["trials"])
+        runs = [self._rescore_run(run, task_config) for run in trials.get("runs") or []]
+        if not runs:
+            return evaluation
+        stats = trial_stats.aggregate(runs)
+        trials.update(stats)
+        trials["runs"] = runs
+        result_details["trials"] = trials
+        result_details["rescoredAt"] = datetime.utcnow().isoformat()
+        return {
+            **evaluation,
+            "score": stats["score"]["mean"],
+            "accuracy": stats["accuracy"]["mean"],
+            "resultDetails": result_details
+        }
+
+    def _task_result_from_evaluation(self, evaluation: Dict[str, Any]) -> Dict[str, Any]:
+        """Rebuild the Browser Use task result shape that ``_calculate_metrics`` expects from a stored evaluation"""
+        details = evaluation.get("resultDetails") or {}
+        steps = details.get("steps")
+        if steps is None:
+            steps = [{}] * int(details.get("steps_taken", 0))
+
+        task_result = {
+            "status": "finished" if evaluation.get("status") == EvaluationStatus.SUCCESS else "failed",
+            "output": details.get("output", {}),
+            "steps": steps
+        }
+        if evaluation.get("timeTaken") is not None:
+            task_result["duration"] = evaluation["timeTaken"]
+        return task_result
+
+    def _update_job(self, job_id: str, **fields):
+        with _jobs_lock:
+            if job_id in _jobs:
+                _jobs[job_id].update(fields)
@@ -0,0 +1,136 @@
+import copy
+import hashlib
+import json
+import threading
+import time
+from typing import Dict, Any, Callable, Optional, Tuple
+from loguru import logger
+from ..core.config import settings
+
+# Options that differ between otherwise identical runs and must not affect the cache key
+_VOLATILE_OPTION_KEYS = {"tags"}
+# Task config that only controls caching itself
+_VOLATILE_CONFIG_KEYS = {"cacheResults"}
+# How long a coalesced caller sleeps between checks on the run it waits for
+_WAIT_STEP_SECONDS = 0.5
+
+
+def make_cache_key(
+    task_id: str,
+    instructions: str,
+    options: Optional[Dict[str, Any]] = None,
+    task_config: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Content hash of everything that decides an evaluation's result.
+
+    That is the task, the generated Browser Use instructions, the task options that shape the run
+    and the task's environment config, which also holds the scoring settings (expectedResults,
+    expectedSteps, maxTimeAllowed, timeWeight, accuracyWeight). Changing how a task is scored
+    therefore never serves a result scored the old way.
+    """
+    stable_options = {k: v for k, v in (options or {}).items() if k not in _VOLATILE_OPTION_KEYS}
+    stable_config = {k: v for k, v in (task_config or {}).items() if k not in _VOLATILE_CONFIG_KEYS}
+    payload = json.dumps(
+        {"taskId": str(task_id), "task": instructions, "options": stable_options, "config": stable_config},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _InFlight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Optional[Dict[str, Any]] = None
+
+
+class EvaluationResultCache:
+    """
+    Process-wide cache of recent evaluation results keyed by ``make_cache_key``.
+
+    Identical runs submitted while one is already executing wait for that run and share its
+    result instead of starting their own Browser Use session.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._in_flight: Dict[str, _InFlight] = {}
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return None
+            expires_at, result = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return copy.deepcopy(result)
+
+    def set(self, key: str, result: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(result))
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Dict[str, Any]],
+        is_cacheable: Callable[[Dict[str, Any]], bool] = lambda result: True,
+        sleep: Optional[Callable[[float], None]] = None
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Return a cached result for ``key`` or compute it, coalescing concurrent callers.
+
+        Callers waiting on another caller's run sleep through ``sleep`` in short steps, so an
+        evaluation's sleep can pause them or raise ``EvaluationCancelled`` while they wait.
+        Without one they block until the run finishes.
+
+        Returns:
+            Tuple of the result and whether it was served from the cache or another caller's run
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and entry[0] >= time.monotonic():
+                    return copy.deepcopy(entry[1]), True
+
+                in_flight = self._in_flight.get(key)
+                if in_flight is None:
+                    in_flight = _InFlight()
+                    self._in_flight[key] = in_flight
+                    is_leader = True
+                else:
+                    is_leader = False
+
+            if is_leader:
+                break
+
+            if sleep is None:
+                in_flight.event.wait()
+            while not in_flight.event.is_set():
+                sleep(_WAIT_STEP_SECONDS)
+            if in_flight.result is not None:
+                return copy.deepcopy(in_flight.result), True
+            # The run we waited on failed or was not cacheable; try again ourselves
+            logger.debug(f"Coalesced evaluation {key[:12]} produced no reusable result, retrying")
+
+        try:
+            result = compute()
+            if is_cacheable(result):
+                self.set(key, result)
+                in_flight.result = result
+            return result, False
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            in_flight.event.set()
+
+
+result_cache = EvaluationResultCache(ttl_seconds=settings.RESULT_CACHE_TTL_SECONDS)
@@ -0,0 +1,180 @@
+import math
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Dict, Any, List, Optional
+from fastapi import HTTPException, status
+from loguru import logger
+from ..db.database import get_db
+from ..models.enums import SubmissionStatus
+
+TERMINAL_STATUSES = {SubmissionStatus.COMPLETED.value, SubmissionStatus.FAILED.value}
+
+# Rows fetched per request when scanning the event log
+_PAGE_SIZE = 1000
+
+_BUCKET_FORMATS = {
+    "hour": "%Y-%m-%dT%H:00:00+00:00",
+    "day": "%Y-%m-%dT00:00:00+00:00"
+}
+
+
+def _status_value(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, Enum):
+        return value.value
+    # Enum members may have been stored via str(), e.g. "SubmissionStatus.QUEUED"
+    return str(value).split(".")[-1]
+
+
+def _utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _parse_timestamp(value: str) -> datetime:
+    return _utc(datetime.fromisoformat(value.replace("Z", "+00:00")))
+
+
+def _latency_stats(durations: List[float]) -> Dict[str, Any]:
+    ordered = sorted(durations)
+
+    def nearest_rank(p: float) -> float:
+        index = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+        return round(ordered[index], 3)
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 3),
+        "p50": nearest_rank(50),
+        "p90": nearest_rank(90),
+        "p95": nearest_rank(95),
+        "p99": nearest_rank(99),
+        "max": round(ordered[-1], 3)
+    }
+
+
+class SubmissionEventService:
+    """Append-only log of submission status transitions and the stage timings derived from it"""
+
+    def __init__(self):
+        self._db = get_db()
+
+    def record(self, submission: Dict[str, Any], from_status: Any, to_status: Any, details: Optional[Dict[str, Any]] = None):
+        """
+        Append a status transition for a submission.
+
+        Failures are logged rather than raised: losing an analytics event must not fail the submission.
+        """
+        self.record_many([submission], from_status, to_status, details)
+
+    def record_many(self, submissions: List[Dict[str, Any]], from_status: Any, to_status: Any, details: Optional[Dict[str, Any]] = None):
+        """Append the same status transition for several submissions in one insert"""
+        occurred_at = datetime.now(timezone.utc).isoformat()
+        events = [
+            {
+                "id": str(uuid.uuid4()),
+                "submissionId": str(submission["id"]),
+                "taskId": submission.get("taskId"),
+                "agentId": submission.get("agentId"),
+                "fromStatus": _status_value(from_status),
+                "toStatus": _status_value(to_status),
+                "occurredAt": occurred_at,
+                "details": details
+            }
+            for submission in submissions
+        ]
+        if not events:
+            return
+        try:
+            self._db.table("submission_events").insert(events).execute()
+        except Exception as e:
+            logger.warning(f"Failed to record {_status_value(to_status)} events for {len(events)} submissions: {str(e)}")
+
+    def get_stage_latency(
+        self,
+        task_id: Optional[uuid.UUID] = None,
+        agent_id: Optional[uuid.UUID] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        group_by: str = "task",
+        bucket: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Compute per-stage latency percentiles from the event log.
+
+        A stage is the time a submission spent in one status: from the event that entered it to the
+        next event. ``total`` is first event to terminal status. Only events inside [since, until)
+        are read, so stages that straddle the window edges are not counted.
+
+        Args:
+            group_by: "task", "agent" or "none"
+            bucket: Optionally split each group into "hour" or "day" windows by stage start time
+        """
+        if group_by not in ("task", "agent", "none"):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="groupBy must be one of: task, agent, none")
+        if bucket is not None and bucket not in _BUCKET_FORMATS:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="bucket must be one of: hour, day")
+
+        try:
+            events_by_submission: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+            for event in self._scan_events(task_id, agent_id, since, until):
+                events_by_submission[event["submissionId"]].append(event)
+
+            durations: Dict[tuple, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+            for events in events_by_submission.values():
+                events.sort(key=lambda e: e["occurredAt"])
+                first = events[0]
+                key = {"task": first.get("taskId"), "agent": first.get("agentId"), "none": None}[group_by]
+
+                for current, following in zip(events, events[1:]):
+                    started = _parse_timestamp(current["occurredAt"])
+                    elapsed = (_parse_timestamp(following["occurredAt"]) - started).total_seconds()
+                    window = started.strftime(_BUCKET_FORMATS[bucket]) if bucket else None
+                    durations[(key, window)][current["toStatus"]].append(elapsed)
+
+                if events[-1]["toStatus"] in TERMINAL_STATUSES and len(events) > 1:
+                    started = _parse_timestamp(first["occurredAt"])
+                    window = started.strftime(_BUCKET_FORMATS[bucket]) if bucket else None
+                    durations[(key, window)]["total"].append((_parse_timestamp(events[-1]["occurredAt"]) - started).total_seconds())
+
+            groups = [
+                {
+                    "key": key,
+                    "window": window,
+                    "stages": {stage: _latency_stats(values) for stage, values in stages.items()}
+                }
+                for (key, window), stages in sorted(durations.items(), key=lambda item: (str(item[0][0]), item[0][1] or ""))
+            ]
+            return {
+                "groupBy": group_by,
+                "bucket": bucket,
+                "since": since,
+                "until": until,
+                "submissions": len(events_by_submission),
+                "groups": groups
+            }
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error computing stage latency: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    def _scan_events(self, task_id, agent_id, since, until):
+        offset = 0
+        while True:
+            query = self._db.table("submission_events").select("submissionId,taskId,agentId,toStatus,occurredAt")
+            if task_id:
+                query = query.eq("taskId", str(task_id))
+            if agent_id:
+                query = query.eq("agentId", str(agent_id))
+            if since:
+                query = query.gte("occurredAt", _utc(since).isoformat())
+            if until:
+                query = query.lt("occurredAt", _utc(until).isoformat())
+            page = query.order("occurredAt").order("id").range(offset, offset + _PAGE_SIZE - 1).execute().data or []
+            yield from page
+            if len(page) < _PAGE_SIZE:
+                return
+            offset += _PAGE_SIZE
@@ -1,39 +1,134 @@
 from fastapi import HTTPException
 from ..models.enums import SubmissionStatus, EvaluationStatus
-import random
+import base64
+import json
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from uuid import UUID
 from ..schemas.submission_schema import LeaderboardResponse
-from datetime import datetime
+from datetime import datetime, timezone
 import time
+from typing import Callable, Dict, Any, List, Optional
 from ..db.database import get_db
+from ..core.config import settings
+from ..core import metrics, tracing
+from .browser_use_service import BrowserUseService
+from .executors import get_executor
+from .submission_event_service import SubmissionEventService
+from .webhook_service import webhook_dispatcher
+from .evaluation_scheduler import evaluation_scheduler, EvaluationCancelled, PAUSED
+from .task_service import TaskService
+from .result_cache import result_cache, make_cache_key
+from .export_service import naive_utc
+from . import trial_stats
 from loguru import logger
 
+SEARCH_SORTS = ("submittedAt", "score")
+
+
+class _TrialAborted(Exception):
+    """Raised in a trial that is no longer needed because the others already converged"""
+
+
+def _encode_cursor(sort_by: str, order: str, value: Any, submission_id: str) -> str:
+    raw = json.dumps([sort_by, order, value, submission_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort_by: str, order: str):
+    """The sort value and ID of the last submission on the previous page"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, cursor_order, value, submission_id = json.loads(raw)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if (cursor_sort, cursor_order) != (sort_by, order):
+        raise HTTPException(status_code=400, detail="Cursor belongs to a search with a different sort order")
+    return value, submission_id
+
+
+def persisted_task_ids(submission: Dict[str, Any]) -> List[str]:
+    """Upstream tasks recorded for a submission: one per trial for multi-trial submissions"""
+    return list(submission.get("browserUseTaskIds") or []) or [t for t in [submission.get("browserUseTaskId")] if t]
+
+
 class SubmissionService:
+    # Serializes writes of a multi-trial submission's browserUseTaskIds
+    _task_ids_lock = threading.Lock()
+
     def __init__(self):
         self._db = get_db()
+        self.browser_use_service = BrowserUseService()
+        self.executor = get_executor()
+        self.event_service = SubmissionEventService()
+        self.task_service = TaskService()
 
-    def create_submission(self, user_id: uuid.UUID, agent_id: uuid.UUID, task_id: uuid.UUID) -> dict:
+    def create_submission(self, user_id: uuid.UUID, agent_id: uuid.UUID, task_id: uuid.UUID, trials: int = 1, suite_run_id: str = None, idempotency_key: str = None) -> dict:
         try:
             submission_data = {
                 "id": str(uuid.uuid4()),
                 "userId": str(user_id),
                 "agentId": str(agent_id),
                 "taskId": str(task_id),
+                "trials": trials,
                 "status": SubmissionStatus.QUEUED,
                 "submittedAt": datetime.utcnow().isoformat()
             }
+            if suite_run_id:
+                submission_data["suiteRunId"] = suite_run_id
+            if idempotency_key:
+                submission_data["idempotencyKey"] = idempotency_key
             
             response = self._db.table("submissions").insert(submission_data).execute()
             
             if response.data:
+                metrics.SUBMISSIONS_CREATED.inc()
+                self.event_service.record(response.data[0], None, SubmissionStatus.QUEUED)
                 return response.data[0]
             raise HTTPException(status_code=500, detail="Failed to create submission")
         except Exception as e:
             logger.error(f"Error creating submission: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
 
-    def process_submission(self, submission_id: uuid.UUID, options=None):
+    def create_submissions(self, user_id: uuid.UUID, agent_id: uuid.UUID, task_ids: List[str], trials: int = 1, suite_run_id: str = None) -> List[dict]:
+        """Create a queued submission per task with one insert, e.g. for a suite run"""
+        submitted_at = datetime.utcnow().isoformat()
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "userId": str(user_id),
+                "agentId": str(agent_id),
+                "taskId": str(task_id),
+                "trials": trials,
+                "status": SubmissionStatus.QUEUED,
+                "submittedAt": submitted_at,
+                "suiteRunId": suite_run_id
+            }
+            for task_id in task_ids
+        ]
+        try:
+            response = self._db.table("submissions").insert(rows).execute()
+        except Exception as e:
+            logger.error(f"Error creating submissions: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+        if len(response.data or []) != len(rows):
+            raise HTTPException(status_code=500, detail="Failed to create submissions")
+        metrics.SUBMISSIONS_CREATED.inc(len(rows))
+        self.event_service.record_many(response.data, None, SubmissionStatus.QUEUED)
+        return response.data
+
+    @tracing.traced("SubmissionService.process_submission")
+    def process_submission(self, submission_id: uuid.UUID, options=None, claimed: bool = False):
+        """
+        Evaluate a queued submission
+        
+        Args:
+            claimed: The caller already holds the claim (see ``SubmissionRecoveryService.claim``)
+        """
+        started = time.perf_counter()
+        submission = {"id": str(submission_id)}
+        evaluation = None
         try:
             # Get submission
             submission_response = self._db.table("submissions").select("*").eq("id", str(submission_id)).execute()
@@ -42,167 +137,552 @@ class SubmissionService:
                 raise HTTPException(status_code=404, detail="Submission not found")
             
             submission = submission_response.data[0]
-            
-            # Get task
-            task_response = self._db.table("tasks").select("*").eq("id", submission["taskId"]).execute()
-            
-            if not task_response.data or len(task_response.data) == 0:
-                raise HTTPException(status_code=404, detail="Task not found")
-            
-            task = task_response.data[0]
-            
-            # Update submission status to PROCESSING
-            self._db.table("submissions").update({"status": SubmissionStatus.PROCESSING}).eq("id", str(submission_id)).execute()
+            if submission["status"] in (SubmissionStatus.COMPLETED, SubmissionStatus.FAILED):
+                # Stopped before processing began
+                logger.info(f"Skipping submission {submission_id} in status {submission['status']}")
+                return None
+            if not claimed and not self._claim(submission):
+                # Recovery gave it to another worker while this one was waiting to start
+                logger.info(f"Skipping submission {submission_id} claimed by another worker")
+                return None
+            tracing.set_attributes({
+                "submission.id": str(submission_id),
+                "task.id": submission["taskId"],
+                "agent.id": submission["agentId"]
+            })
+            
+            # Get task, with its environment config parsed
+            task = self.task_service.get_task(submission["taskId"])
+            
+            # Get agent configuration
+            agent_response = self._db.table("agents").select("*").eq("id", submission["agentId"]).execute()
+            agent_config = agent_response.data[0].get("configuration", {}) if agent_response.data else {}
             
             # Extract configuration from task
-            web_arena_config = task.get("environmentConfig", {})
-            
-            # Simulate processing time
-            difficulty_multiplier = web_arena_config.get("difficultyMultiplier", 1.0)
-            time_factor = web_arena_config.get("timeFactor", 1.0)
-            processing_time = random.uniform(1, 3) * difficulty_multiplier * time_factor
-            time.sleep(processing_time)
-            
-            # Generate evaluation metrics
-            accuracy_boost = web_arena_config.get("accuracyBoost", 1.0)
-            base_score = random.uniform(60, 90)
-            score = min(100, base_score * accuracy_boost)            
-            time_taken = random.uniform(1, 8) * time_factor            
-            accuracy = random.uniform(0.7, 0.95) * accuracy_boost
-            max_steps = web_arena_config.get("maxSteps", 15)
-            
-            # Create evaluation result
-            evaluation_data = {
-                "id": str(uuid.uuid4()),
-                "submissionId": str(submission_id),
-                "score": score,
-                "timeTaken": time_taken,
-                "accuracy": accuracy,
-                "completedAt": datetime.utcnow().isoformat(),
-                "status": EvaluationStatus.SUCCESS,
-                "resultDetails": self._generate_result_details(max_steps, web_arena_config)
-            }
-            
-            evaluation_response = self._db.table("evaluation_results").insert(evaluation_data).execute()
+            web_arena_config = task.get("environmentConfig") or {}
+            max_time = self.browser_use_service._build_task_options(web_arena_config, overrides=options)["max_time"]
+            trials = submission.get("trials") or 1
+            
+            # Wait for free evaluation slots (one per parallel trial); the watchdog fails the submission if it overruns max_time
+            on_timeout = lambda timed_out: self._fail_timed_out(submission, timed_out, started)
+            on_resume = lambda resumed: self._reattach(submission, resumed)
+            with evaluation_scheduler.slot(str(submission_id), max_time, on_timeout, on_resume, slots=trials) as evaluation:
+                # Update submission status to PROCESSING
+                self._set_status(submission, SubmissionStatus.PROCESSING)
+            
+                browser_task_id = submission.get("browserUseTaskId")
+                result = None
+                if trials > 1:
+                    result = self._run_trials(submission, evaluation, agent_config, web_arena_config, trials, options)
+                elif browser_task_id:
+                    # A previous process started this upstream task; wait for it rather than starting another
+                    logger.info(f"Reattaching submission {submission_id} to Browser Use task {browser_task_id}")
+                    evaluation.attach_task(browser_task_id)
+                    result = self.executor.reattach(submission, browser_task_id, web_arena_config, evaluation.sleep)
+                if result is None:
+                    result = self._evaluate(submission, evaluation, agent_config, web_arena_config, options)
+                if not evaluation_scheduler.claim(evaluation):
+                    # Stopped or timed out while finishing; discard the late result
+                    return None
+                if not self._still_claimed(submission):
+                    # Stopped through another worker, or recovered elsewhere
+                    logger.info(f"Discarding result of submission {submission_id}, no longer claimed by this worker")
+                    return None
+                score = result["score"]
+                time_taken = result["timeTaken"]
+                accuracy = result["accuracy"]
+            
+                # Create evaluation result
+                evaluation_data = {
+                    "id": str(uuid.uuid4()),
+                    "submissionId": str(submission_id),
+                    "score": score,
+                    "timeTaken": time_taken,
+                    "accuracy": accuracy,
+                    "completedAt": datetime.utcnow().isoformat(),
+                    "status": result["status"],
+                    "resultDetails": result["resultDetails"]
+                }
             
-            # Create leaderboard entry
-            leaderboard_data = {
-                "id": str(uuid.uuid4()),
-                "taskId": submission["taskId"],
-                "agentId": submission["agentId"],
-                "submissionId": str(submission_id),
-                "score": score,
-                "timeTaken": time_taken,
-                "accuracy": accuracy,
-                "rank": 0
-            }
+                evaluation_response = self._db.table("evaluation_results").insert(evaluation_data).execute()
+            
+                # Create leaderboard entry
+                leaderboard_data = {
+                    "id": str(uuid.uuid4()),
+                    "taskId": submission["taskId"],
+                    "agentId": submission["agentId"],
+                    "submissionId": str(submission_id),
+                    "score": score,
+                    "timeTaken": time_taken,
+                    "accuracy": accuracy,
+                    "rank": 0
+                }
             
-            leaderboard_response = self._db.table("leaderboard").insert(leaderboard_data).execute()
+                leaderboard_response = self._db.table("leaderboard").insert(leaderboard_data).execute()
+                self._db.table("submissions").update({"score": score}).eq("id", str(submission_id)).execute()
             
-            # Update ranks
-            self._update_ranks(submission["taskId"])
+                # Update ranks
+                self._update_ranks(submission["taskId"])
             
-            # Update submission status to COMPLETED
-            self._db.table("submissions").update({"status": SubmissionStatus.COMPLETED}).eq("id", str(submission_id)).execute()
+                # Update submission status to COMPLETED
+                self._set_status(submission, SubmissionStatus.COMPLETED, {"cached": bool(result["resultDetails"].get("cached"))})
+                metrics.SUBMISSIONS_PROCESSED.inc(status=SubmissionStatus.COMPLETED.value, cached=str(bool(result["resultDetails"].get("cached"))).lower())
+                metrics.SUBMISSION_PROCESSING_DURATION.observe(time.perf_counter() - started, status=SubmissionStatus.COMPLETED.value)
             
             # Return full submission data
             return self._get_full_submission(submission_id)
         except Exception as e:
+            if isinstance(e, EvaluationCancelled) or (evaluation is not None and evaluation.abandoned):
+                # Already marked FAILED by the watchdog or the stop action
+                logger.info(f"Evaluation of submission {submission_id} ended early: {str(e)}")
+                return None
+            if evaluation is not None and not self._still_claimed(submission):
+                logger.info(f"Submission {submission_id} was stopped elsewhere: {str(e)}")
+                return None
             logger.error(f"Error processing submission: {str(e)}")
             # Update submission status to FAILED
-            self._db.table("submissions").update({"status": SubmissionStatus.FAILED}).eq("id", str(submission_id)).execute()
+            self._set_status(submission, SubmissionStatus.FAILED, {"error": str(e)})
+            metrics.SUBMISSIONS_PROCESSED.inc(status=SubmissionStatus.FAILED.value, cached="false")
+            metrics.SUBMISSION_PROCESSING_DURATION.observe(time.perf_counter() - started, status=SubmissionStatus.FAILED.value)
             raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
+        finally:
+            evaluation_scheduler.forget(str(submission_id))
 
-    def _generate_result_details(self, max_steps=15, web_arena_config=None):
-        if web_arena_config is None:
-            web_arena_config = {}
-            
-        web_arena_environment = web_arena_config.get("webArenaEnvironment", "Simulation")
+    def _claim(self, submission: dict) -> bool:
+        """Become the submission's worker; False if recovery already handed it to another one"""
+        if submission.get("claimedBy"):
+            return False
+        claim = str(uuid.uuid4())
+        response = self._db.table("submissions") \
+            .update({"claimedBy": claim, "heartbeatAt": datetime.now(timezone.utc).isoformat()}) \
+            .eq("id", submission["id"]) \
+            .is_("claimedBy", "null") \
+            .execute()
+        if not response.data:
+            return False
+        submission["claimedBy"] = claim
+        return True
+
+    def _still_claimed(self, submission: dict) -> bool:
+        """
+        Whether this worker's claim still stands. Stopping a submission clears ``claimedBy`` and
+        recovery replaces it, so a worker that lost its submission doesn't write a late result.
+        """
+        try:
+            response = self._db.table("submissions").select("claimedBy").eq("id", submission["id"]).execute()
+        except Exception as e:
+            logger.warning(f"Could not check the claim on submission {submission['id']}: {str(e)}")
+            return True
+        return bool(response.data) and response.data[0].get("claimedBy") == submission.get("claimedBy")
+
+    def _set_status(self, submission: dict, status: SubmissionStatus, details: dict = None):
+        """Update a submission's status and append the transition to the event log"""
+        self._db.table("submissions").update({"status": status}).eq("id", submission["id"]).execute()
+        self.event_service.record(submission, submission.get("status"), status, details)
+        submission["status"] = status
+        webhook_dispatcher.notify(submission, status, details)
+
+    def _fail_timed_out(self, submission: dict, evaluation, started: float):
+        """Called by the evaluation watchdog when a submission overruns its time limit"""
+        self._set_status(submission, SubmissionStatus.FAILED, {
+            "reason": "timeout",
+            "error": f"Evaluation exceeded maxTimeAllowed of {evaluation.max_time}s",
+            "browserUseTaskIds": list(evaluation.browser_task_ids),
+            "elapsedSeconds": round(evaluation.elapsed, 1)
+        })
+        metrics.SUBMISSIONS_PROCESSED.inc(status=SubmissionStatus.FAILED.value, cached="false")
+        metrics.SUBMISSION_PROCESSING_DURATION.observe(time.perf_counter() - started, status=SubmissionStatus.FAILED.value)
+
+    def _attach_browser_task(self, submission: dict, evaluation, browser_task_id: str):
+        """
+        Persist an upstream task ID as soon as it exists so a restarted process can reattach to it.
+        Multi-trial submissions keep every trial's task in ``browserUseTaskIds``.
+        """
+        if (submission.get("trials") or 1) > 1:
+            with self._task_ids_lock:
+                evaluation.attach_task(browser_task_id)
+                browser_task_ids = list(evaluation.browser_task_ids)
+                self._db.table("submissions").update({"browserUseTaskIds": browser_task_ids}).eq("id", submission["id"]).execute()
+            submission["browserUseTaskIds"] = browser_task_ids
+            return
+        self._db.table("submissions").update({"browserUseTaskId": browser_task_id}).eq("id", submission["id"]).execute()
+        submission["browserUseTaskId"] = browser_task_id
+        evaluation.attach_task(browser_task_id)
+
+    def _control_tasks(self, submission_id: str, browser_task_ids: List[str], action: str):
+        """Pause, resume or stop every upstream task of a submission"""
+        control = {
+            "pause": self.browser_use_service.pause_task,
+            "resume": self.browser_use_service.resume_task,
+            "stop": self.browser_use_service.stop_task
+        }[action]
+        for browser_task_id in browser_task_ids:
+            if not control(browser_task_id):
+                logger.warning(f"Could not {action} Browser Use task {browser_task_id} for submission {submission_id}")
+
+    def _reattach(self, submission: dict, evaluation):
+        """Called in the worker once a resumed evaluation holds a slot again"""
+        self._control_tasks(str(submission["id"]), list(evaluation.browser_task_ids), "resume")
+        self._set_status(submission, SubmissionStatus.PROCESSING, {"action": "resume"})
+
+    def control_submission(self, submission: dict, action: str) -> dict:
+        """
+        Pause, resume or stop a submission's evaluation.
         
-        result = {
-            "task_completion": random.uniform(0.8, 1.0),
-            "navigation_efficiency": random.uniform(0.7, 1.0),
-            "error_rate": random.uniform(0, 0.2),
-            "steps_taken": random.randint(max(5, int(max_steps * 0.5)), max_steps),
-            "web_interactions": {
-                "clicks": random.randint(3, 10),
-                "form_fills": random.randint(1, 5),
-                "navigation_steps": random.randint(2, 8)
-            }
-        }
+        Pausing pauses the upstream task and frees the evaluation's concurrency slot; the
+        submission is PENDING until resumed. Resuming queues it for a slot (QUEUED) and the worker
+        resumes the upstream task once it has one (PROCESSING). Stopping fails the submission.
         
-        if web_arena_environment == "Shopping":
-            result["environment_metrics"] = {
-                "product_comparison_score": random.uniform(0.7, 1.0),
-                "checkout_efficiency": random.uniform(0.6, 1.0),
-                "optimal_choice_accuracy": random.uniform(0.8, 1.0),
-                "budget_adherence": True if web_arena_config.get("budget", 0) > 0 else False
-            }
-        elif web_arena_environment == "Booking":
-            result["environment_metrics"] = {
-                "criteria_satisfaction": random.uniform(0.8, 1.0),
-                "filter_usage_efficiency": random.uniform(0.7, 0.95),
-                "value_optimization_score": random.uniform(0.6, 1.0),
-                "constraints_met": random.randint(2, 4) if web_arena_config.get("filterRequirements") else 2
-            }
-        elif web_arena_environment == "Banking":
-            result["environment_metrics"] = {
-                "security_navigation_score": random.uniform(0.7, 1.0),
-                "transaction_accuracy": random.uniform(0.9, 1.0),
-                "authentication_success": True,
-                "security_alerts_triggered": random.randint(0, 1) if web_arena_config.get("securityLevel") == "high" else 0
-            }
-        elif web_arena_environment == "Simulation":
-            if web_arena_config.get("platforms"):
-                result["environment_metrics"] = {
-                    "content_quality_score": random.uniform(0.7, 0.95),
-                    "platform_adherence": random.uniform(0.8, 1.0),
-                    "scheduling_optimization": random.uniform(0.6, 0.9),
-                    "platforms_utilized": len(web_arena_config.get("platforms", [])),
-                    "content_types_used": len(web_arena_config.get("contentTypes", []))
-                }
+        Pause only reaches evaluations running in this process. Resume and stop also work when
+        the evaluation belongs to another worker or a process that is gone, through the upstream
+        task ids persisted on the submission: stop stops those tasks and clears ``claimedBy`` so
+        the owning worker discards its result, and resume adopts a paused submission whose worker
+        stopped heartbeating, the way recovery adopts stranded ones.
+        
+        Returns:
+            dict with ``success`` and ``message``
+        """
+        submission_id = str(submission["id"])
+        status = submission["status"]
+        
+        if action == "pause":
+            if status != SubmissionStatus.PROCESSING:
+                return {"success": False, "message": "Can only pause submissions that are in PROCESSING state"}
+            evaluation = evaluation_scheduler.pause(submission_id)
+            if evaluation is None:
+                return {"success": False, "message": "Submission is not running on this server"}
+            self._control_tasks(submission_id, list(evaluation.browser_task_ids), "pause")
+            self._set_status(submission, SubmissionStatus.PENDING, {"action": "pause"})
+            return {"success": True, "message": "Submission paused successfully"}
+        
+        if action == "resume":
+            if status != SubmissionStatus.PENDING:
+                return {"success": False, "message": "Can only resume submissions that are in PENDING state"}
+            evaluation = evaluation_scheduler.get(submission_id)
+            if evaluation is None:
+                return self._adopt_paused(submission)
+            if evaluation.state != PAUSED:
+                return {"success": False, "message": "Submission is not paused"}
+            # Set before waking the worker, which moves the submission to PROCESSING once it has a slot
+            self._set_status(submission, SubmissionStatus.QUEUED, {"action": "resume"})
+            evaluation_scheduler.resume(submission_id)
+            return {"success": True, "message": "Submission resumed successfully"}
+        
+        if action == "stop":
+            if status not in (SubmissionStatus.PROCESSING, SubmissionStatus.PENDING, SubmissionStatus.QUEUED):
+                return {"success": False, "message": "Can only stop submissions that are not already completed or failed"}
+            evaluation = evaluation_scheduler.stop(submission_id)
+            if evaluation is None and evaluation_scheduler.get(submission_id) is not None:
+                return {"success": False, "message": "Submission is already finishing"}
+            if evaluation is not None:
+                browser_task_ids = list(evaluation.browser_task_ids)
             else:
-                result["environment_metrics"] = {
-                    "information_accuracy": random.uniform(0.8, 0.95),
-                    "source_diversity": random.uniform(0.7, 1.0),
-                    "summary_coherence": random.uniform(0.75, 0.95),
-                    "sources_utilized": random.randint(2, web_arena_config.get("informationSources", 4))
-                }
+                # Running in another worker, or its process is gone: stop the tasks it recorded
+                browser_task_ids = persisted_task_ids(submission)
+            self._control_tasks(submission_id, browser_task_ids, "stop")
+            self._db.table("submissions").update({"claimedBy": None}).eq("id", submission_id).execute()
+            self._set_status(submission, SubmissionStatus.FAILED, {"reason": "stopped", "browserUseTaskIds": browser_task_ids})
+            metrics.SUBMISSIONS_PROCESSED.inc(status=SubmissionStatus.FAILED.value, cached="false")
+            return {"success": True, "message": "Submission stopped successfully"}
+        
+        raise HTTPException(status_code=400, detail=f"Invalid action: {action}")
+
+    def _adopt_paused(self, submission: dict) -> dict:
+        """Resume a submission paused by a worker that no longer heartbeats it"""
+        # Imported here: the recovery service builds on this one
+        from .recovery_service import SubmissionRecoveryService
+        submission_id = str(submission["id"])
+        recovery = SubmissionRecoveryService()
+        if not recovery.is_stale(submission):
+            return {"success": False, "message": "Submission is paused on another server"}
+        if not recovery.claim(submission):
+            return {"success": False, "message": "Submission is being resumed by another server"}
+        self._control_tasks(submission_id, persisted_task_ids(submission), "resume")
+        self._set_status(submission, SubmissionStatus.QUEUED, {"action": "resume", "adopted": True})
+        recovery.start(submission_id)
+        return {"success": True, "message": "Submission resumed successfully"}
+
+    def _evaluate(self, submission: dict, evaluation, agent_config: dict, web_arena_config: dict, options=None) -> dict:
+        """
+        Evaluate a submission, reusing a recent identical evaluation when the result cache is enabled.
+        
+        Runs are identical when they are for the same task and its instructions, task options and
+        environment config (including the scoring settings) hash the same.
+        Tasks can opt out of caching with ``"cacheResults": false`` in their environment config.
+        """
+        submission_id = str(submission["id"])
+        run = lambda: self.executor.execute(
+            submission, agent_config, web_arena_config, options,
+            sleep=evaluation.sleep,
+            on_task_created=lambda browser_task_id: self._attach_browser_task(submission, evaluation, browser_task_id)
+        )
+        
+        if not settings.RESULT_CACHE_ENABLED or web_arena_config.get("cacheResults") is False:
+            return run()
+        
+        instructions = self.browser_use_service._generate_instructions(agent_config, web_arena_config)
+        task_options = self.browser_use_service._build_task_options(web_arena_config, overrides=options)
+        cache_key = make_cache_key(submission["taskId"], instructions, task_options, web_arena_config)
+        
+        result, cached = result_cache.get_or_compute(
+            cache_key,
+            run,
+            is_cacheable=lambda r: r["status"] == EvaluationStatus.SUCCESS,
+            sleep=evaluation.sleep
+        )
+        if cached:
+            logger.info(f"Reusing evaluation of submission {result['submissionId']} for submission {submission_id}")
+            result["resultDetails"] = {
+                **result["resultDetails"],
+                "cached": True,
+                "cacheKey": cache_key,
+                "cachedFromSubmissionId": result["submissionId"]
+            }
         return result
+
+    def _run_trials(
+        self,
+        submission: dict,
+        evaluation,
+        agent_config: dict,
+        web_arena_config: dict,
+        trials: int,
+        options=None
+    ) -> dict:
+        """
+        Evaluate a submission ``trials`` times, one run per slot of the evaluation, and aggregate the runs.
+        
+        Score, accuracy and time taken are reported as the mean over completed runs, with variance and
+        a 95% confidence interval in ``resultDetails["trials"]``; the leaderboard ranks on the mean score.
+        Once ``SUBMISSION_TRIALS_EARLY_STOP_MIN`` runs have completed and the score interval is within
+        ±``SUBMISSION_TRIALS_EARLY_STOP_HALF_WIDTH``, the remaining runs are abandoned.
+        
+        Trials bypass the result cache, which would otherwise return the same run N times.
         
+        Every trial's upstream task is attached to the evaluation, so pause, resume, stop and the
+        watchdog reach all of them, and persisted in ``browserUseTaskIds``. A recovered submission
+        reattaches to those tasks and only starts the trials that never got one.
+        """
+        submission_id = str(submission["id"])
+        parallelism = evaluation.slots
+        sleep = evaluation.sleep
+        abort = threading.Event()
+        
+        def trial_sleep(seconds: float):
+            # Sleep in short steps so a trial can be abandoned once the others have converged
+            remaining = seconds
+            while remaining > 0:
+                if abort.is_set():
+                    raise _TrialAborted()
+                step = min(remaining, 0.5)
+                sleep(step)
+                remaining -= step
+        
+        runs, failed, early_stopped = [], 0, False
+        min_runs = max(2, settings.SUBMISSION_TRIALS_EARLY_STOP_MIN)
+        max_half_width = settings.SUBMISSION_TRIALS_EARLY_STOP_HALF_WIDTH
+        on_task_created = lambda browser_task_id: self._attach_browser_task(submission, evaluation, browser_task_id)
+        
+        def run(browser_task_id: Optional[str] = None):
+            if browser_task_id:
+                # Started by a previous process: wait for it rather than starting another
+                evaluation.attach_task(browser_task_id)
+                try:
+                    result = self.executor.reattach(submission, browser_task_id, web_arena_config, sleep=trial_sleep)
+                except _TrialAborted:
+                    self.browser_use_service.stop_task(browser_task_id)
+                    raise
+                if result is not None:
+                    return result
+            return self.executor.execute(
+                submission, agent_config, web_arena_config, options,
+                sleep=trial_sleep,
+                on_task_created=on_task_created
+            )
+        
+        started_tasks = list(submission.get("browserUseTaskIds") or [])[:trials]
+        if started_tasks:
+            logger.info(f"Reattaching {len(started_tasks)} trials of submission {submission_id} to their Browser Use tasks")
+        run = tracing.propagate(run)
+        
+        with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix=f"trial-{submission_id[:8]}") as executor:
+            futures = [executor.submit(run, browser_task_id) for browser_task_id in started_tasks]
+            futures += [executor.submit(run) for _ in range(trials - len(started_tasks))]
+            try:
+                for future in as_completed(futures):
+                    if future.cancelled():
+                        continue
+                    try:
+                        runs.append(future.result())
+                        metrics.SUBMISSION_TRIALS.inc(outcome="completed")
+                    except _TrialAborted:
+                        metrics.SUBMISSION_TRIALS.inc(outcome="abandoned")
+                        continue
+                    except EvaluationCancelled:
+                        raise
+                    except Exception as e:
+                        failed += 1
+                        metrics.SUBMISSION_TRIALS.inc(outcome="failed")
+                        logger.warning(f"Trial of submission {submission_id} failed: {str(e)}")
+                        continue
+                    
+                    half_width = trial_stats.score_half_width(runs)
+                    if not early_stopped and max_half_width and len(runs) >= min_runs and len(runs) < trials and half_width <= max_half_width:
+                        logger.info(f"Stopping trials of submission {submission_id} after {len(runs)} runs (score ±{half_width:.2f})")
+                        early_stopped = True
+                        abort.set()
+                        for pending in futures:
+                            if pending.cancel():
+                                metrics.SUBMISSION_TRIALS.inc(outcome="abandoned")
+            finally:
+                # Stopped, timed out or converged: don't wait for the remaining runs to finish on their own
+                abort.set()
+        
+        if not runs:
+            raise RuntimeError(f"All {trials} trials failed")
+        
+        stats = trial_stats.aggregate(runs)
+        return {
+            "submissionId": submission_id,
+            "score": stats["score"]["mean"],
+            "timeTaken": stats["timeTaken"]["mean"],
+            "accuracy": stats["accuracy"]["mean"],
+            "status": EvaluationStatus.SUCCESS if any(r["status"] == EvaluationStatus.SUCCESS for r in runs) else EvaluationStatus.FAILED,
+            "resultDetails": {
+                "trials": {
+                    "requested": trials,
+                    "completed": len(runs),
+                    "failed": failed,
+                    "earlyStopped": early_stopped,
+                    "confidenceLevel": 0.95,
+                    **stats,
+                    "runs": [
+                        {
+                            "score": r["score"],
+                            "timeTaken": r["timeTaken"],
+                            "accuracy": r["accuracy"],
+                            "status": r["status"],
+                            "resultDetails": r["resultDetails"]
+                        }
+                        for r in runs
+                    ]
+                }
+            }
+        }
+
     def get_user_submissions(self, user_id: uuid.UUID, skip: int = 0, limit: int = 20) -> dict:
         try:
-            # Get all submissions for the user
-            response = self._db.table("submissions").select("*").eq("userId", str(user_id)).execute()
-            
-            if not response.data:
-                return {"items": [], "total": 0}
-            
-            # Sort by submittedAt in descending order (in memory)
-            sorted_submissions = sorted(
-                response.data, 
-                key=lambda x: x.get("submittedAt", ""), 
-                reverse=True
-            )
-            
-            # Apply pagination in memory
-            paginated_submissions = sorted_submissions[skip:skip + limit]
-            
-            # Get evaluation results and leaderboard entries for each submission
-            for submission in paginated_submissions:
-                # Get evaluation result
-                eval_response = self._db.table("evaluation_results").select("*").eq("submissionId", submission["id"]).execute()
-                submission["evaluation"] = eval_response.data[0] if eval_response.data else None
-                
-                # Get leaderboard entry
-                leaderboard_response = self._db.table("leaderboard").select("*").eq("submissionId", submission["id"]).execute()
-                submission["leaderboard_entry"] = leaderboard_response.data[0] if leaderboard_response.data else None
-            
-            return {"items": paginated_submissions, "total": len(response.data)}
+            response = self._db.table("submissions") \
+                .select("*", count="exact") \
+                .eq("userId", str(user_id)) \
+                .order("submittedAt", desc=True) \
+                .order("id", desc=True) \
+                .range(skip, skip + limit - 1) \
+                .execute()
+            return {"items": self._attach_results(response.data or []), "total": response.count or 0}
         except Exception as e:
             logger.error(f"Error getting user submissions: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
 
+    def search_submissions(
+        self,
+        user_id: uuid.UUID,
+        statuses: Optional[List[SubmissionStatus]] = None,
+        task_id: Optional[uuid.UUID] = None,
+        agent_id: Optional[uuid.UUID] = None,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        sort_by: str = "submittedAt",
+        order: str = "desc",
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> dict:
+        """
+        Filter a user's submissions a page at a time
+        
+        Pages are keyset-paginated on (sort column, id): each page continues after the last row of
+        the previous one, so deep pages cost the same as the first and rows inserted meanwhile do
+        not shift later pages. Sorting by score only returns submissions that have been scored.
+        
+        Args:
+            since: Only submissions made at or after this time
+            until: Only submissions made before this time
+            cursor: ``nextCursor`` of the previous page
+        
+        Returns:
+            Dict with the page's ``items`` and the ``nextCursor`` (None on the last page)
+        """
+        if sort_by not in SEARCH_SORTS:
+            raise HTTPException(status_code=400, detail=f"sortBy must be one of: {', '.join(SEARCH_SORTS)}")
+        if order not in ("asc", "desc"):
+            raise HTTPException(status_code=400, detail="order must be asc or desc")
+        if sort_by == "score" and min_score is None:
+            # Scores are never negative; this drops the unscored rows
+            min_score = 0
+        desc = order == "desc"
+
+        def query():
+            q = self._db.table("submissions").select("*").eq("userId", str(user_id))
+            if statuses:
+                q = q.in_("status", [getattr(s, "value", s) for s in statuses])
+            if task_id:
+                q = q.eq("taskId", str(task_id))
+            if agent_id:
+                q = q.eq("agentId", str(agent_id))
+            if min_score is not None:
+                q = q.gte("score", min_score)
+            if max_score is not None:
+                q = q.lte("score", max_score)
+            if since:
+                q = q.gte("submittedAt", naive_utc(since))
+            if until:
+                q = q.lt("submittedAt", naive_utc(until))
+            return q
+
+        try:
+            # One extra row tells whether another page follows
+            wanted = limit + 1
+            rows = []
+            after = lambda q, column, value: q.lt(column, value) if desc else q.gt(column, value)
+            if cursor:
+                value, last_id = _decode_cursor(cursor, sort_by, order)
+                # Rest of the rows tied with the cursor on the sort column, then the rows past it.
+                # Two range scans of the same index instead of an OR the planner can't seek on.
+                rows = after(query().eq(sort_by, value), "id", last_id).order("id", desc=desc).limit(wanted).execute().data or []
+                if len(rows) < wanted:
+                    rest = after(query(), sort_by, value).order(sort_by, desc=desc).order("id", desc=desc)
+                    rows += rest.limit(wanted - len(rows)).execute().data or []
+            else:
+                rows = query().order(sort_by, desc=desc).order("id", desc=desc).limit(wanted).execute().data or []
+
+            page = rows[:limit]
+            next_cursor = None
+            if len(rows) > limit:
+                last = page[-1]
+                next_cursor = _encode_cursor(sort_by, order, last[sort_by], str(last["id"]))
+            return {"items": self._attach_results(page), "nextCursor": next_cursor}
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error searching submissions: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    def _attach_results(self, submissions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add each submission's evaluation and leaderboard entry, fetched for the whole page at once"""
+        if not submissions:
+            return submissions
+        submission_ids = [str(s["id"]) for s in submissions]
+        evaluations = self._db.table("evaluation_results").select("*").in_("submissionId", submission_ids).execute()
+        entries = self._db.table("leaderboard").select("*").in_("submissionId", submission_ids).execute()
+        evaluation_by_submission = {str(e["submissionId"]): e for e in evaluations.data or []}
+        entry_by_submission = {str(e["submissionId"]): e for e in entries.data or []}
+        for submission in submissions:
+            submission["evaluation"] = evaluation_by_submission.get(str(submission["id"]))
+            submission["leaderboard_entry"] = entry_by_submission.get(str(submission["id"]))
+        return submissions
+
     def _get_full_submission(self, submission_id: uuid.UUID):
         try:
             # Get submission
@@ -285,35 +765,15 @@ class SubmissionService:
     
     def get_user_submissions_by_task(self, user_id: uuid.UUID, task_id: uuid.UUID, skip: int = 0, limit: int = 20):
         try:
-            # Get all submissions for the user and task
-            response = self._db.table("submissions").select("*").eq("userId", str(user_id)).eq("taskId", str(task_id)).execute()
-            
-            if not response.data:
-                return {"items": [], "total": 0}
-            
-            # Sort by submittedAt in descending order (in memory)
-            sorted_submissions = sorted(
-                response.data, 
-                key=lambda x: x.get("submittedAt", ""), 
-                reverse=True
-            )
-            
-            total = len(sorted_submissions)
-            
-            # Apply pagination in memory
-            paginated_submissions = sorted_submissions[skip:skip + limit]
-            
-            # Get evaluation results and leaderboard entries for each submission
-            for submission in paginated_submissions:
-                # Get evaluation result
-                eval_response = self._db.table("evaluation_results").select("*").eq("submissionId", submission["id"]).execute()
-                submission["evaluation"] = eval_response.data[0] if eval_response.data else None
-                
-                # Get leaderboard entry
-                leaderboard_response = self._db.table("leaderboard").select("*").eq("submissionId", submission["id"]).execute()
-                submission["leaderboard_entry"] = leaderboard_response.data[0] if leaderboard_response.data else None
-            
-            return {"items": paginated_submissions, "total": total}
+            response = self._db.table("submissions") \
+                .select("*", count="exact") \
+                .eq("userId", str(user_id)) \
+                .eq("taskId", str(task_id)) \
+                .order("submittedAt", desc=True) \
+                .order("id", desc=True) \
+                .range(skip, skip + limit - 1) \
+                .execute()
+            return {"items": self._attach_results(response.data or []), "total": response.count or 0}
         except Exception as e:
             logger.error(f"Error getting user submissions by task: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
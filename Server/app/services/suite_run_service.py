@@ -0,0 +1,185 @@
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+from fastapi import HTTPException, status
+from loguru import logger
+from ..core import tracing
+from ..core.config import settings
+from ..db.database import get_db
+from ..models.enums import SubmissionStatus
+from .evaluation_scheduler import evaluation_scheduler
+from .submission_service import SubmissionService
+from .task_service import TaskService
+
+_TERMINAL_STATUSES = {SubmissionStatus.COMPLETED.value, SubmissionStatus.FAILED.value}
+
+RUNNING = "RUNNING"
+COMPLETED = "COMPLETED"
+
+# Shared by every suite run in the process. More workers than evaluation slots would only block.
+_workers: Optional[ThreadPoolExecutor] = None
+_workers_lock = threading.Lock()
+
+
+def _suite_workers() -> ThreadPoolExecutor:
+    global _workers
+    with _workers_lock:
+        if _workers is None:
+            _workers = ThreadPoolExecutor(max_workers=settings.EVALUATION_MAX_CONCURRENCY, thread_name_prefix="suite")
+        return _workers
+
+
+class SuiteRunService:
+    """
+    Runs one agent against every task matching a filter.
+
+    A suite run is a ``suite_runs`` row plus one submission per task, tagged with ``suiteRunId``.
+    The whole suite passes admission control at intake, one slot in the backlog per task. Its
+    submissions then run on a worker pool bounded by the evaluation concurrency and compete for the
+    global evaluation scheduler like any other submission. Progress and the composite score are
+    derived from the submissions on read, so any worker can report on a run started by another.
+    """
+
+    def __init__(self):
+        self._db = get_db()
+        self.submission_service = SubmissionService()
+        self.task_service = TaskService()
+
+    def select_tasks(self, difficulty: Optional[str] = None, web_arena_environment: Optional[str] = None) -> List[Dict[str, Any]]:
+        tasks = self.task_service.find_tasks(difficulty, web_arena_environment)
+        if not tasks:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No tasks match the suite filter")
+        if len(tasks) > settings.SUITE_RUN_MAX_TASKS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Suite filter matches {len(tasks)} tasks; at most {settings.SUITE_RUN_MAX_TASKS} can run at once"
+            )
+        return tasks
+
+    def create_suite_run(
+        self,
+        user_id: uuid.UUID,
+        agent_id: uuid.UUID,
+        tasks: List[Dict[str, Any]],
+        difficulty: Optional[str] = None,
+        web_arena_environment: Optional[str] = None,
+        trials: int = 1
+    ) -> Dict[str, Any]:
+        """Record a suite run and create a queued submission for each task"""
+        agent_response = self._db.table("agents").select("id").eq("id", str(agent_id)).execute()
+        if not agent_response.data:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Agent with ID {agent_id} not found")
+
+        try:
+            suite_run = {
+                "id": str(uuid.uuid4()),
+                "userId": str(user_id),
+                "agentId": str(agent_id),
+                "difficulty": difficulty,
+                "webArenaEnvironment": web_arena_environment,
+                "trials": trials,
+                "taskCount": len(tasks),
+                "status": RUNNING,
+                "createdAt": datetime.now(timezone.utc).isoformat()
+            }
+            self._db.table("suite_runs").insert(suite_run).execute()
+
+            submissions = self.submission_service.create_submissions(
+                user_id, agent_id, [task["id"] for task in tasks], trials, suite_run_id=suite_run["id"]
+            )
+            # Heartbeat them from now on, so recovery doesn't claim them before dispatch gets to them
+            for submission in submissions:
+                evaluation_scheduler.expect(submission["id"])
+            logger.info(f"Created suite run {suite_run['id']} for agent {agent_id} with {len(submissions)} tasks")
+            return {**suite_run, "submissionIds": [submission["id"] for submission in submissions]}
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error creating suite run: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    def dispatch(self, submission_ids: List[str]):
+        """
+        Queue every submission of a suite run on the suite worker pool.
+
+        The submissions stay registered with the evaluation scheduler while they wait for a worker,
+        so they keep being heartbeated and recovery leaves them alone.
+        """
+        workers = _suite_workers()
+        for submission_id in submission_ids:
+            evaluation_scheduler.expect(submission_id)
+            workers.submit(tracing.propagate(self._process), submission_id)
+
+    def _process(self, submission_id: str):
+        try:
+            self.submission_service.process_submission(submission_id)
+        except Exception as e:
+            logger.error(f"Suite submission {submission_id} failed: {str(e)}")
+
+    def get_suite_run(self, suite_run_id: uuid.UUID) -> Dict[str, Any]:
+        """The suite run with per-task results and the composite score of the tasks finished so far"""
+        try:
+            response = self._db.table("suite_runs").select("*").eq("id", str(suite_run_id)).execute()
+            if not response.data:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Suite run with ID {suite_run_id} not found")
+            suite_run = response.data[0]
+
+            submissions = self._db.table("submissions") \
+                .select("id,taskId,status") \
+                .eq("suiteRunId", suite_run["id"]) \
+                .execute().data or []
+            evaluations = {}
+            finished_ids = [s["id"] for s in submissions if s["status"] in _TERMINAL_STATUSES]
+            if finished_ids:
+                eval_response = self._db.table("evaluation_results") \
+                    .select("submissionId,score,accuracy,timeTaken") \
+                    .in_("submissionId", finished_ids) \
+                    .execute()
+                evaluations = {e["submissionId"]: e for e in eval_response.data or []}
+
+            results = []
+            for submission in sorted(submissions, key=lambda s: s["taskId"]):
+                evaluation = evaluations.get(submission["id"]) if submission["status"] == SubmissionStatus.COMPLETED.value else None
+                results.append({
+                    "taskId": submission["taskId"],
+                    "submissionId": submission["id"],
+                    "status": submission["status"],
+                    "score": evaluation["score"] if evaluation else None,
+                    "accuracy": evaluation["accuracy"] if evaluation else None,
+                    "timeTaken": evaluation["timeTaken"] if evaluation else None
+                })
+
+            summary = self._summarize(results)
+            if suite_run["status"] == RUNNING and len(finished_ids) == len(submissions):
+                suite_run.update(status=COMPLETED, finishedAt=datetime.now(timezone.utc).isoformat(), compositeScore=summary["compositeScore"])
+                self._db.table("suite_runs").update({
+                    "status": COMPLETED,
+                    "finishedAt": suite_run["finishedAt"],
+                    "compositeScore": summary["compositeScore"]
+                }).eq("id", suite_run["id"]).execute()
+
+            return {
+                **suite_run,
+                **summary,
+                "total": len(submissions),
+                "results": results
+            }
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting suite run {suite_run_id}: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    def _summarize(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        finished = [r for r in results if r["status"] in _TERMINAL_STATUSES]
+        scored = [r for r in finished if r["score"] is not None]
+        return {
+            "completed": len(scored),
+            "failed": len(finished) - len(scored),
+            # Failed tasks count as 0 so an agent can't raise its composite by failing hard tasks
+            "compositeScore": sum(r["score"] for r in scored) / len(finished) if finished else None,
+            "meanAccuracy": sum(r["accuracy"] for r in scored) / len(scored) if scored else None,
+            "meanTimeTaken": sum(r["timeTaken"] for r in scored) / len(scored) if scored else None
+        }
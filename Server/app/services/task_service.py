@@ -1,8 +1,21 @@
+import json
 import uuid
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from fastapi import HTTPException, status
 from loguru import logger
+from pydantic import ValidationError
+from ..core.config import settings
 from ..db.database import get_db
+from ..schemas.task_schema import TaskCreate, BrowserTaskEnvironment
+
+def decode_import(body: bytes) -> str:
+    """Decode an uploaded task import, accepting UTF-16 files with a byte order mark (e.g. task.json)"""
+    encoding = "utf-16" if body[:2] in (b"\xff\xfe", b"\xfe\xff") else "utf-8-sig"
+    try:
+        return body.decode(encoding)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Import must be UTF-8 or UTF-16 text")
+
 
 class TaskService:
     def __init__(self):
@@ -23,34 +36,7 @@ class TaskService:
             paginated_data = result.data[skip:skip + limit] if result.data else []
             
             # Convert the database records to the expected format
-            formatted_tasks = []
-            for db_task in paginated_data:
-                # Try to parse environment as JSON if it's a string
-                environment_config = {}
-                environment_type = "default"
-                if db_task.get("environment"):
-                    try:
-                        import json
-                        env_data = json.loads(db_task.get("environment"))
-                        if isinstance(env_data, dict):
-                            environment_type = env_data.get("type", "default")
-                            environment_config = env_data.get("config", {})
-                    except:
-                        # If parsing fails, use the raw value
-                        environment_type = db_task.get("environment")
-                
-                formatted_tasks.append({
-                    "id": db_task.get("id"),
-                    "title": db_task.get("name"),
-                    "description": db_task.get("description"),
-                    "instructions": db_task.get("instructions"),
-                    "webArenaEnvironment": environment_type,
-                    "environmentConfig": environment_config,
-                    "createdAt": db_task.get("created_at"),
-                    "updatedAt": db_task.get("updated_at")
-                })
-            
-            return formatted_tasks
+            return [self._format_task(db_task) for db_task in paginated_data]
         except Exception as e:
             logger.error(f"Error getting tasks: {str(e)}")
             raise HTTPException(
@@ -72,32 +58,7 @@ class TaskService:
                 )
             
             # Convert the database record to the expected format
-            db_task = result.data[0]
-            
-            # Try to parse environment as JSON if it's a string
-            environment_config = {}
-            environment_type = "default"
-            if db_task.get("environment"):
-                try:
-                    import json
-                    env_data = json.loads(db_task.get("environment"))
-                    if isinstance(env_data, dict):
-                        environment_type = env_data.get("type", "default")
-                        environment_config = env_data.get("config", {})
-                except:
-                    # If parsing fails, use the raw value
-                    environment_type = db_task.get("environment")
-            
-            return {
-                "id": db_task.get("id"),
-                "title": db_task.get("name"),
-                "description": db_task.get("description"),
-                "instructions": db_task.get("instructions"),
-                "webArenaEnvironment": environment_type,
-                "environmentConfig": environment_config,
-                "createdAt": db_task.get("created_at"),
-                "updatedAt": db_task.get("updated_at")
-            }
+            return self._format_task(result.data[0])
         except HTTPException:
             raise
         except Exception as e:
@@ -107,30 +68,66 @@ class TaskService:
                 detail=f"Error retrieving task: {str(e)}"
             )
 
+    def find_tasks(self, difficulty: Optional[str] = None, web_arena_environment: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get every task matching the given difficulty and/or environment
+        
+        Tasks without a recorded difficulty never match a difficulty filter.
+        
+        Args:
+            difficulty: Only tasks of this difficulty (EASY, MEDIUM, HARD)
+            web_arena_environment: Only tasks in this environment
+        """
+        try:
+            query = self._db.table("tasks").select("*")
+            if difficulty is not None:
+                query = query.eq("difficulty", difficulty)
+            if web_arena_environment is not None:
+                query = query.eq("webArenaEnvironment", web_arena_environment)
+            result = query.execute()
+            return [self._format_task(db_task) for db_task in result.data or []]
+        except Exception as e:
+            logger.error(f"Error finding tasks: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error retrieving tasks: {str(e)}"
+            )
+
+    def _format_task(self, db_task: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a tasks row to the API shape, unpacking the environment JSON; difficulty is None if never set"""
+        # Try to parse environment as JSON if it's a string
+        environment_config = {}
+        environment_type = db_task.get("webArenaEnvironment") or "default"
+        difficulty = db_task.get("difficulty")
+        if db_task.get("environment"):
+            try:
+                env_data = json.loads(db_task.get("environment"))
+                if isinstance(env_data, dict):
+                    environment_type = env_data.get("type", environment_type)
+                    environment_config = env_data.get("config", {})
+                    difficulty = difficulty or env_data.get("difficulty")
+            except:
+                # If parsing fails, use the raw value
+                environment_type = db_task.get("webArenaEnvironment") or db_task.get("environment")
+        
+        return {
+            "id": db_task.get("id"),
+            "title": db_task.get("name"),
+            "description": db_task.get("description"),
+            "instructions": db_task.get("instructions"),
+            "difficulty": difficulty,
+            "webArenaEnvironment": environment_type,
+            "environmentConfig": environment_config,
+            "createdAt": db_task.get("created_at"),
+            "updatedAt": db_task.get("updated_at")
+        }
+
     def create_task(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Create a new task
         """
         try:
-            # Map the task data to the actual database schema
-            new_task = {
-                "id": str(uuid.uuid4()),
-                "name": task_data.get("title", "Untitled Task"),
-                "description": task_data.get("description", ""),
-                "instructions": task_data.get("instructions", ""),
-                "environment": task_data.get("webArenaEnvironment", "default"),
-                # Let the database set created_at and updated_at
-            }
-            
-            # Store the full task data as JSON in the environment field if needed
-            if "environmentConfig" in task_data:
-                import json
-                new_task["environment"] = json.dumps({
-                    "type": task_data.get("webArenaEnvironment", "default"),
-                    "config": task_data.get("environmentConfig", {})
-                })
-                
-            result = self._db.table("tasks").insert(new_task).execute()
+            result = self._db.table("tasks").insert(self._task_row(task_data)).execute()
             
             if not result.data or len(result.data) == 0:
                 raise HTTPException(
@@ -156,6 +153,149 @@ class TaskService:
                 detail=f"Error creating task: {str(e)}"
             )
 
+    def _task_row(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map task data to the tasks table schema"""
+        row = {
+            "id": str(uuid.uuid4()),
+            "name": task_data.get("title", "Untitled Task"),
+            "description": task_data.get("description", ""),
+            "instructions": task_data.get("instructions", ""),
+            "environment": task_data.get("webArenaEnvironment", "default"),
+            # Columns of their own so tasks can be filtered on them
+            "difficulty": task_data.get("difficulty"),
+            "webArenaEnvironment": task_data.get("webArenaEnvironment", "default"),
+            # Let the database set created_at and updated_at
+        }
+        
+        # Store the full task data as JSON in the environment field if needed
+        if "environmentConfig" in task_data:
+            row["environment"] = json.dumps({
+                "type": task_data.get("webArenaEnvironment", "default"),
+                "difficulty": task_data.get("difficulty"),
+                "config": task_data.get("environmentConfig", {})
+            }, default=str)
+        return row
+
+    def import_tasks(self, content: str, dry_run: bool = False, chunk_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Create many tasks from a JSON array or JSONL document of task definitions
+        
+        Every definition is validated against ``TaskCreate`` and its environmentConfig against
+        ``BrowserTaskEnvironment`` before anything is written, and all problems are reported in one
+        422 response. Valid imports are inserted in bulk writes of ``TASK_IMPORT_CHUNK_SIZE`` rows.
+        Each write is atomic, and if one fails the chunks already written are deleted, so an import
+        is applied completely or not at all. If that cleanup fails too, the 500 lists the ids of the
+        tasks that were left behind under ``remainingTaskIds``.
+        
+        Args:
+            content: JSON array of task objects, or one task object per line
+            dry_run: Only validate
+            chunk_size: Rows per insert, defaults to ``TASK_IMPORT_CHUNK_SIZE``
+        """
+        items, errors = self._parse_import(content)
+        if len(items) > settings.TASK_IMPORT_MAX_TASKS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Import has {len(items)} tasks; at most {settings.TASK_IMPORT_MAX_TASKS} can be imported at once"
+            )
+        
+        rows = []
+        for location, item in items:
+            item_errors = self._validate_import_item(item)
+            errors.extend({"location": location, **error} for error in item_errors)
+            if not item_errors:
+                rows.append(self._task_row(TaskCreate(**item).model_dump(mode="json")))
+        if errors:
+            raise HTTPException(
+                status_code=422,
+                detail={
+                    "message": f"{len({e['location'] for e in errors})} of {len(items)} task definitions are invalid; nothing was imported",
+                    "errors": errors
+                }
+            )
+        if not rows:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Import contains no tasks")
+        if dry_run:
+            return {"created": 0, "taskIds": [], "dryRun": True, "valid": len(rows)}
+        
+        chunk_size = chunk_size or settings.TASK_IMPORT_CHUNK_SIZE
+        inserted: List[str] = []
+        try:
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start:start + chunk_size]
+                self._db.table("tasks").insert(chunk).execute()
+                inserted.extend(row["id"] for row in chunk)
+        except Exception as e:
+            logger.error(f"Task import failed after {len(inserted)} of {len(rows)} tasks, rolling back: {str(e)}")
+            remaining = self._delete_imported(inserted, chunk_size)
+            if remaining:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail={
+                        "message": f"Error importing tasks, and {len(remaining)} imported tasks could not be removed: {str(e)}",
+                        "errors": [],
+                        "remainingTaskIds": remaining
+                    }
+                )
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error importing tasks, nothing was imported: {str(e)}"
+            )
+        
+        logger.info(f"Imported {len(inserted)} tasks in {-(-len(inserted) // chunk_size)} writes")
+        return {"created": len(inserted), "taskIds": inserted, "dryRun": False, "valid": len(rows)}
+
+    def _delete_imported(self, task_ids: List[str], chunk_size: int) -> List[str]:
+        """Delete the tasks of a failed import, returning the ids that could not be deleted"""
+        remaining = []
+        for start in range(0, len(task_ids), chunk_size):
+            chunk = task_ids[start:start + chunk_size]
+            try:
+                self._db.table("tasks").delete().in_("id", chunk).execute()
+            except Exception as e:
+                logger.error(f"Could not roll back {len(chunk)} imported tasks: {str(e)}")
+                remaining.extend(chunk)
+        return remaining
+
+    def _parse_import(self, content: str) -> Tuple[List[Tuple[str, Any]], List[Dict[str, Any]]]:
+        """Split an import into (location, definition) pairs plus errors for unparseable lines"""
+        stripped = content.strip()
+        if stripped.startswith("["):
+            try:
+                definitions = json.loads(stripped)
+            except json.JSONDecodeError as e:
+                return [], [{"location": f"line {e.lineno}", "field": None, "message": f"Invalid JSON: {e.msg}"}]
+            return [(f"item {index}", item) for index, item in enumerate(definitions)], []
+        
+        items, errors = [], []
+        for number, line in enumerate(content.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                items.append((f"line {number}", json.loads(line)))
+            except json.JSONDecodeError as e:
+                errors.append({"location": f"line {number}", "field": None, "message": f"Invalid JSON: {e.msg}"})
+        return items, errors
+
+    def _validate_import_item(self, item: Any) -> List[Dict[str, Any]]:
+        if not isinstance(item, dict):
+            return [{"field": None, "message": "Task definition must be a JSON object"}]
+        errors = []
+        try:
+            TaskCreate(**item)
+        except ValidationError as e:
+            errors.extend({"field": ".".join(str(part) for part in error["loc"]), "message": error["msg"]} for error in e.errors())
+        config = item.get("environmentConfig")
+        if isinstance(config, dict):
+            try:
+                BrowserTaskEnvironment(**config)
+            except ValidationError as e:
+                errors.extend(
+                    {"field": ".".join(["environmentConfig", *(str(part) for part in error["loc"])]), "message": error["msg"]}
+                    for error in e.errors()
+                )
+        return errors
+
     def update_task(self, task_id: uuid.UUID, task_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Update an existing task
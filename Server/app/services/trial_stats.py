@@ -0,0 +1,51 @@
+"""
+Aggregation of repeated evaluation runs (trials) of one submission.
+
+Each metric is summarized by its mean, sample variance and a two-sided 95% confidence interval
+for the mean using Student's t distribution, which matters at the small trial counts we run.
+"""
+import math
+from typing import Dict, Any, List, Optional
+
+# Two-sided 95% critical values of Student's t for 1..30 degrees of freedom
+_T_95 = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042
+)
+_Z_95 = 1.960
+
+METRICS = ("score", "accuracy", "timeTaken")
+
+
+def t_critical(degrees_of_freedom: int) -> float:
+    if degrees_of_freedom < 1:
+        return math.inf
+    if degrees_of_freedom <= len(_T_95):
+        return _T_95[degrees_of_freedom - 1]
+    return _Z_95
+
+
+def summarize(values: List[float]) -> Dict[str, Any]:
+    """Mean, sample variance and 95% confidence interval of ``values``"""
+    n = len(values)
+    mean = sum(values) / n
+    variance = sum((value - mean) ** 2 for value in values) / (n - 1) if n > 1 else None
+    half_width = t_critical(n - 1) * math.sqrt(variance / n) if variance is not None else None
+    return {
+        "mean": mean,
+        "variance": variance,
+        "stdDev": math.sqrt(variance) if variance is not None else None,
+        "ciLow": mean - half_width if half_width is not None else None,
+        "ciHigh": mean + half_width if half_width is not None else None,
+        "ciHalfWidth": half_width
+    }
+
+
+def score_half_width(runs: List[Dict[str, Any]]) -> Optional[float]:
+    """Half-width of the score's confidence interval, or None with fewer than two runs"""
+    return summarize([run["score"] for run in runs])["ciHalfWidth"] if len(runs) > 1 else None
+
+
+def aggregate(runs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    return {metric: summarize([run[metric] for run in runs]) for metric in METRICS}
@@ -0,0 +1,362 @@
+"""
+Outgoing webhooks for finished submissions.
+
+Users register URLs for all of their submissions or a single one. When a submission reaches
+COMPLETED or FAILED, a ``submission.completed`` or ``submission.failed`` event is queued for every
+matching webhook. Events for the same webhook that arrive within ``WEBHOOK_BATCH_WINDOW_SECONDS``
+(up to ``WEBHOOK_BATCH_MAX_EVENTS``) are sent in a single POST.
+
+Each POST is signed with the webhook's secret:
+
+    X-RealEvals-Signature: t=<unix time>,v1=<hex HMAC-SHA256 of "<t>.<raw body>">
+
+Non-2xx answers and connection errors are retried with exponential backoff and jitter, up to
+``WEBHOOK_MAX_ATTEMPTS``. A retry keeps the same ``X-RealEvals-Delivery`` ID, so receivers can
+drop duplicates. Every attempt is written to ``webhook_deliveries``.
+
+Webhook URLs must be https and resolve only to public addresses. They are checked when registered
+and again before every attempt, so a host later pointed at loopback, private, link-local (cloud
+metadata) or other internal addresses is not called.
+
+Pending deliveries live in memory, so events not yet delivered are lost if the process exits.
+"""
+import hashlib
+import heapq
+import hmac
+import ipaddress
+import itertools
+import json
+import random
+import secrets
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit
+import requests
+from fastapi import HTTPException, status
+from loguru import logger
+from ..core import metrics
+from ..core.config import settings
+from ..db.database import get_db
+from ..models.enums import SubmissionStatus
+
+SIGNATURE_HEADER = "X-RealEvals-Signature"
+DELIVERY_HEADER = "X-RealEvals-Delivery"
+
+EVENT_TYPES = {
+    SubmissionStatus.COMPLETED.value: "submission.completed",
+    SubmissionStatus.FAILED.value: "submission.failed"
+}
+
+DELIVERED = "delivered"
+RETRYING = "retrying"
+FAILED = "failed"
+
+
+def sign(secret: str, timestamp: int, body: bytes) -> str:
+    """The signature header value for a webhook body"""
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+def check_url(url: str):
+    """Raise ValueError unless ``url`` is an https URL whose host resolves only to public addresses"""
+    parsed = urlsplit(url)
+    if parsed.scheme != "https" and not (settings.WEBHOOK_ALLOW_PRIVATE_URLS and parsed.scheme == "http"):
+        raise ValueError("Webhook URLs must use https")
+    if not parsed.hostname:
+        raise ValueError("Webhook URL has no host")
+    if settings.WEBHOOK_ALLOW_PRIVATE_URLS:
+        return
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(parsed.hostname, parsed.port or 443, type=socket.SOCK_STREAM)}
+    except (socket.gaierror, UnicodeError):
+        raise ValueError(f"Could not resolve {parsed.hostname}")
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split("%", 1)[0])
+        if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+            ip = ip.ipv4_mapped
+        if not ip.is_global or ip.is_multicast:
+            raise ValueError(f"{parsed.hostname} resolves to {ip}, which is not a public address")
+
+
+class WebhookService:
+    def __init__(self):
+        self._db = get_db()
+
+    def create_webhook(self, user_id: uuid.UUID, url: str, submission_id: Optional[uuid.UUID] = None) -> Dict[str, Any]:
+        """Register a webhook; the returned row includes the signing secret"""
+        existing = self._db.table("webhooks").select("id").eq("userId", str(user_id)).eq("active", True).execute()
+        if len(existing.data or []) >= settings.WEBHOOK_MAX_PER_USER:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {settings.WEBHOOK_MAX_PER_USER} webhooks can be registered per user"
+            )
+
+        try:
+            check_url(url)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        submission = None
+        if submission_id is not None:
+            response = self._db.table("submissions").select("*").eq("id", str(submission_id)).execute()
+            if not response.data:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Submission with ID {submission_id} not found")
+            submission = response.data[0]
+            if str(submission["userId"]) != str(user_id):
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to access this submission")
+
+        webhook = {
+            "id": str(uuid.uuid4()),
+            "userId": str(user_id),
+            "url": url,
+            "submissionId": str(submission_id) if submission_id else None,
+            "secret": f"whsec_{secrets.token_hex(24)}",
+            "active": True,
+            "createdAt": datetime.now(timezone.utc).isoformat()
+        }
+        try:
+            self._db.table("webhooks").insert(webhook).execute()
+        except Exception as e:
+            logger.error(f"Error creating webhook: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+        if submission is not None and submission["status"] in EVENT_TYPES:
+            # Finished before the webhook existed; notify right away instead of never
+            webhook_dispatcher.notify(submission, submission["status"], webhook_ids=[webhook["id"]])
+        return webhook
+
+    def list_webhooks(self, user_id: uuid.UUID) -> List[Dict[str, Any]]:
+        response = self._db.table("webhooks").select("*").eq("userId", str(user_id)).eq("active", True).execute()
+        return [{k: v for k, v in row.items() if k != "secret"} for row in response.data or []]
+
+    def delete_webhook(self, webhook_id: uuid.UUID, user_id: uuid.UUID):
+        self._get_owned(webhook_id, user_id)
+        # Deactivate rather than delete so the delivery log keeps its webhook
+        self._db.table("webhooks").update({"active": False}).eq("id", str(webhook_id)).execute()
+
+    def list_deliveries(self, webhook_id: uuid.UUID, user_id: uuid.UUID, skip: int = 0, limit: int = 50) -> Dict[str, Any]:
+        self._get_owned(webhook_id, user_id)
+        response = self._db.table("webhook_deliveries") \
+            .select("*", count="exact") \
+            .eq("webhookId", str(webhook_id)) \
+            .order("attemptedAt", desc=True) \
+            .range(skip, skip + limit - 1) \
+            .execute()
+        return {"items": response.data or [], "total": response.count or 0}
+
+    def _get_owned(self, webhook_id: uuid.UUID, user_id: uuid.UUID) -> Dict[str, Any]:
+        response = self._db.table("webhooks").select("*").eq("id", str(webhook_id)).eq("active", True).execute()
+        if not response.data:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Webhook with ID {webhook_id} not found")
+        webhook = response.data[0]
+        if str(webhook["userId"]) != str(user_id):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to access this webhook")
+        return webhook
+
+
+class _Batch:
+    def __init__(self, webhook: Dict[str, Any]):
+        self.webhook = webhook
+        self.delivery_id = str(uuid.uuid4())
+        self.events: List[Dict[str, Any]] = []
+        self.attempt = 0
+
+
+class WebhookDispatcher:
+    """
+    Batches and delivers webhook events from a background thread.
+
+    Batching and retry state is kept per process. The thread starts with the first event.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending: deque = deque()
+        self._open: Dict[str, _Batch] = {}
+        self._due: List[tuple] = []
+        self._seq = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self._senders: Optional[ThreadPoolExecutor] = None
+
+    def notify(self, submission: Dict[str, Any], submission_status: Any, details: Optional[Dict[str, Any]] = None, webhook_ids: Optional[List[str]] = None):
+        """
+        Queue an event for a submission status change; only COMPLETED and FAILED are sent.
+
+        Args:
+            webhook_ids: Only notify these webhooks instead of every matching one
+        """
+        if not settings.WEBHOOKS_ENABLED:
+            return
+        status_value = SubmissionStatus(submission_status).value
+        if status_value not in EVENT_TYPES:
+            return
+        with self._cond:
+            self._pending.append((dict(submission), status_value, details, webhook_ids))
+            if self._thread is None:
+                self._senders = ThreadPoolExecutor(settings.WEBHOOK_DELIVERY_WORKERS, thread_name_prefix="webhook-send")
+                self._thread = threading.Thread(target=self._run, name="webhook-dispatcher", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not (self._due and self._due[0][0] <= time.monotonic()):
+                    self._cond.wait(self._due[0][0] - time.monotonic() if self._due else None)
+                pending = list(self._pending)
+                self._pending.clear()
+            try:
+                if pending:
+                    self._route(pending)
+            except Exception as e:
+                logger.error(f"Error routing webhook events: {str(e)}")
+
+            ready = []
+            with self._cond:
+                now = time.monotonic()
+                while self._due and self._due[0][0] <= now:
+                    batch = heapq.heappop(self._due)[2]
+                    if self._open.get(batch.webhook["id"]) is batch:
+                        # The batch window closed; later events start a new batch
+                        del self._open[batch.webhook["id"]]
+                    ready.append(batch)
+            for batch in ready:
+                self._senders.submit(self._deliver, batch)
+
+    def _route(self, pending: List[tuple]):
+        """Turn queued status changes into events on the batches of the webhooks they match"""
+        db = get_db()
+        user_ids = {str(submission["userId"]) for submission, _, _, _ in pending if submission.get("userId")}
+        webhooks = db.table("webhooks").select("*").in_("userId", sorted(user_ids)).eq("active", True).execute().data or [] \
+            if user_ids else []
+
+        completed_ids = [str(submission["id"]) for submission, status_value, _, _ in pending if status_value == SubmissionStatus.COMPLETED.value]
+        evaluations = {}
+        if completed_ids:
+            response = db.table("evaluation_results") \
+                .select("submissionId,score,accuracy,timeTaken,status") \
+                .in_("submissionId", completed_ids) \
+                .execute()
+            evaluations = {str(e["submissionId"]): e for e in response.data or []}
+
+        for submission, status_value, details, webhook_ids in pending:
+            submission_id = str(submission["id"])
+            targets = [
+                webhook for webhook in webhooks
+                if str(webhook["userId"]) == str(submission.get("userId"))
+                and (webhook["id"] in webhook_ids if webhook_ids else webhook.get("submissionId") in (None, submission_id))
+            ]
+            if not targets:
+                continue
+            evaluation = evaluations.get(submission_id) or {}
+            event = {
+                "id": str(uuid.uuid4()),
+                "type": EVENT_TYPES[status_value],
+                "createdAt": datetime.now(timezone.utc).isoformat(),
+                "data": {
+                    "submissionId": submission_id,
+                    "agentId": submission.get("agentId"),
+                    "taskId": submission.get("taskId"),
+                    "suiteRunId": submission.get("suiteRunId"),
+                    "status": status_value,
+                    "score": evaluation.get("score"),
+                    "accuracy": evaluation.get("accuracy"),
+                    "timeTaken": evaluation.get("timeTaken"),
+                    "details": details
+                }
+            }
+            metrics.WEBHOOK_EVENTS.inc(type=event["type"])
+            for webhook in targets:
+                self._add(webhook, event)
+
+    def _add(self, webhook: Dict[str, Any], event: Dict[str, Any]):
+        with self._cond:
+            batch = self._open.get(webhook["id"])
+            if batch is None:
+                batch = self._open[webhook["id"]] = _Batch(webhook)
+                self._schedule(batch, settings.WEBHOOK_BATCH_WINDOW_SECONDS)
+            batch.events.append(event)
+            if len(batch.events) >= settings.WEBHOOK_BATCH_MAX_EVENTS:
+                # Full: send now rather than waiting for the window
+                del self._open[webhook["id"]]
+                self._schedule(batch, 0)
+
+    def _schedule(self, batch: _Batch, delay: float):
+        """Caller holds ``_cond``"""
+        heapq.heappush(self._due, (time.monotonic() + delay, next(self._seq), batch))
+        self._cond.notify()
+
+    def _deliver(self, batch: _Batch):
+        webhook = batch.webhook
+        batch.attempt += 1
+        body = json.dumps({
+            "deliveryId": batch.delivery_id,
+            "webhookId": webhook["id"],
+            "events": batch.events
+        }, default=str).encode()
+        timestamp = int(time.time())
+        headers = {
+            "Content-Type": "application/json",
+            "User-Agent": f"{settings.APP_NAME} webhooks",
+            SIGNATURE_HEADER: sign(webhook["secret"], timestamp, body),
+            DELIVERY_HEADER: batch.delivery_id
+        }
+
+        started = time.perf_counter()
+        status_code, error, blocked = None, None, False
+        try:
+            # Checked on every attempt: DNS may have changed since the webhook was registered
+            check_url(webhook["url"])
+            response = requests.post(webhook["url"], data=body, headers=headers, timeout=settings.WEBHOOK_TIMEOUT_SECONDS, allow_redirects=False)
+            status_code = response.status_code
+            if not 200 <= status_code < 300:
+                error = f"Endpoint answered {status_code}"
+        except requests.RequestException as e:
+            error = str(e)
+        except ValueError as e:
+            error, blocked = f"Blocked: {str(e)}", True
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        next_attempt_at = None
+        if error is None:
+            outcome = DELIVERED
+        elif batch.attempt < settings.WEBHOOK_MAX_ATTEMPTS and not blocked:
+            outcome = RETRYING
+            delay = min(settings.WEBHOOK_RETRY_MAX_SECONDS, settings.WEBHOOK_RETRY_BASE_SECONDS * 2 ** (batch.attempt - 1))
+            delay *= random.uniform(0.8, 1.2)
+            next_attempt_at = (datetime.now(timezone.utc) + timedelta(seconds=delay)).isoformat()
+            with self._cond:
+                self._schedule(batch, delay)
+        else:
+            outcome = FAILED
+            logger.warning(f"Giving up on webhook delivery {batch.delivery_id} to {webhook['url']} after {batch.attempt} attempts: {error}")
+        metrics.WEBHOOK_DELIVERIES.inc(outcome=outcome)
+
+        try:
+            get_db().table("webhook_deliveries").insert({
+                "id": str(uuid.uuid4()),
+                "webhookId": webhook["id"],
+                "userId": webhook["userId"],
+                "deliveryId": batch.delivery_id,
+                "eventIds": [event["id"] for event in batch.events],
+                "submissionIds": [event["data"]["submissionId"] for event in batch.events],
+                "attempt": batch.attempt,
+                "status": outcome,
+                "statusCode": status_code,
+                "error": error,
+                "durationMs": round(duration_ms, 1),
+                "attemptedAt": datetime.now(timezone.utc).isoformat(),
+                "nextAttemptAt": next_attempt_at
+            }).execute()
+        except Exception as e:
+            logger.warning(f"Failed to log webhook delivery {batch.delivery_id}: {str(e)}")
+
+
+webhook_dispatcher = WebhookDispatcher()
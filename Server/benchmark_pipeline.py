@@ -0,0 +1,330 @@
+"""
+End-to-end throughput benchmark for the evaluation pipeline.
+
+Runs the real FastAPI app (``create_application``) under uvicorn with the in-memory database
+backend and the local Browser Use simulator as upstream, then drives it over HTTP at one or
+more client concurrency levels. Each simulated client submits an evaluation and polls its
+status until it completes, so the concurrency level is the number of evaluations in flight.
+
+Measured per concurrency level:
+    - submissions/sec (completed evaluations per second of wall time)
+    - p50/p95/p99 latency of POST /submissions and GET /submissions/{id}/status
+    - queue wait (submit -> first PROCESSING status) and completion latency (submit -> terminal status),
+      both observed by polling, so their resolution is --poll-interval
+    - peak evaluations in flight and resident memory growth per in-flight evaluation
+
+Usage:
+    python benchmark_pipeline.py --concurrency 1,10,50 --submissions 100 --output bench.json
+    python benchmark_pipeline.py --compare baseline.json bench.json --threshold 0.1
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+TERMINAL_STATUSES = {"COMPLETED", "FAILED"}
+
+# Metrics where a higher value is a regression; everything else compared is higher-is-better
+_LOWER_IS_BETTER = ("latency", "wait", "memory")
+
+
+def _percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "max": None, "count": 0}
+    ordered = sorted(values)
+
+    def nearest_rank(p: float) -> float:
+        index = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+        return round(ordered[index], 3)
+
+    return {
+        "p50": nearest_rank(50),
+        "p95": nearest_rank(95),
+        "p99": nearest_rank(99),
+        "max": round(ordered[-1], 3),
+        "count": len(ordered)
+    }
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _serve_in_thread(app, port: int):
+    """Run an ASGI app under uvicorn on a daemon thread and wait until it accepts connections"""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class PipelineBenchmark:
+    def __init__(self, args):
+        self.args = args
+        self.base_url = None
+        self.headers = None
+        self.agent_id = None
+        self.task_id = None
+
+    def start(self):
+        from browser_use_simulator import create_simulator, SimulatorConfig, Distribution
+
+        simulator_port = _free_port()
+        simulator = create_simulator(SimulatorConfig(
+            task_duration=Distribution(kind="lognormal", mean=self.args.task_duration, spread=0.3),
+            steps_per_second=2.0,
+            seed=self.args.seed
+        ))
+        _serve_in_thread(simulator, simulator_port)
+
+        # Settings are read at import time, so configure the app before importing it
+        os.environ["DATABASE_BACKEND"] = "memory"
+        os.environ["BROWSER_USE_BASE_URL"] = f"http://127.0.0.1:{simulator_port}/api/v1"
+        # Drive evaluations through the simulator rather than the in-process random results
+        os.environ.setdefault("EVALUATION_EXECUTOR", "browser_use")
+        # Measure raw pipeline capacity; per-user rate limits would throttle the single benchmark user
+        os.environ.setdefault("SUBMISSION_RATE_LIMIT_PER_MINUTE", "0")
+
+        from main import create_application
+        app_port = _free_port()
+        _serve_in_thread(create_application(), app_port)
+        self.base_url = f"http://127.0.0.1:{app_port}/api/v1"
+
+        self._seed()
+
+    def _seed(self):
+        """Create a benchmark admin, agent and task directly in the in-memory store"""
+        from app.db.database import get_db
+        from app.services.auth_service import AuthService
+
+        db = get_db()
+        user_id = str(uuid.uuid4())
+        db.table("users").insert({
+            "id": user_id,
+            "email": "benchmark@realevals.local",
+            "firstName": "Benchmark",
+            "password": "",
+            "role": "ADMIN",
+            "isActive": True,
+            "isEmailVerified": True,
+            "loginCount": 0
+        }).execute()
+        self.headers = {"Authorization": f"Bearer {AuthService(db)._create_access_token(user_id)}"}
+
+        self.agent_id = db.table("agents").insert({
+            "name": "Benchmark Agent",
+            "description": "Agent used by benchmark_pipeline.py",
+            "configuration": {"actions": [{"type": "click", "target": "search_button"}]},
+            "user_id": user_id,
+            "is_active": True
+        }).execute().data[0]["id"]
+
+        self.task_id = db.table("tasks").insert({
+            "name": "Benchmark Task",
+            "description": "Task used by benchmark_pipeline.py",
+            "instructions": "",
+            "environment": json.dumps({
+                "type": "benchmark",
+                "config": {"startUrl": "https://example.com", "objective": "Benchmark", "maxTimeAllowed": 300}
+            })
+        }).execute().data[0]["id"]
+
+    async def run_level(self, concurrency: int) -> Dict[str, Any]:
+        import httpx
+
+        submit_latencies: List[float] = []
+        status_latencies: List[float] = []
+        queue_waits: List[float] = []
+        completion_latencies: List[float] = []
+        outcomes = {"COMPLETED": 0, "FAILED": 0, "REJECTED": 0, "ERROR": 0}
+        in_flight = 0
+        peak_in_flight = 0
+        peak_rss = baseline_rss = _rss_bytes()
+        remaining = self.args.submissions
+
+        async def sample_memory():
+            nonlocal peak_rss
+            while True:
+                peak_rss = max(peak_rss, _rss_bytes())
+                await asyncio.sleep(0.1)
+
+        async def client(http: httpx.AsyncClient):
+            nonlocal remaining, in_flight, peak_in_flight
+            while remaining > 0:
+                remaining -= 1
+
+                started = time.perf_counter()
+                response = await http.post(
+                    f"{self.base_url}/submissions",
+                    json={"agentId": self.agent_id, "taskId": self.task_id},
+                    headers=self.headers
+                )
+                submit_latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code == 429:
+                    outcomes["REJECTED"] += 1
+                    continue
+                if response.status_code != 200:
+                    outcomes["ERROR"] += 1
+                    continue
+
+                submission_id = response.json()["id"]
+                in_flight += 1
+                peak_in_flight = max(peak_in_flight, in_flight)
+                seen_processing = False
+                try:
+                    while True:
+                        await asyncio.sleep(self.args.poll_interval)
+                        poll_started = time.perf_counter()
+                        status_response = await http.get(
+                            f"{self.base_url}/submissions/{submission_id}/status",
+                            headers=self.headers
+                        )
+                        now = time.perf_counter()
+                        status_latencies.append((now - poll_started) * 1000)
+                        if status_response.status_code != 200:
+                            outcomes["ERROR"] += 1
+                            break
+
+                        current = status_response.json()["status"].split(".")[-1]
+                        if current != "QUEUED" and current != "PENDING" and not seen_processing:
+                            seen_processing = True
+                            queue_waits.append((now - started) * 1000)
+                        if current in TERMINAL_STATUSES:
+                            completion_latencies.append((now - started) * 1000)
+                            outcomes[current] += 1
+                            break
+                        if now - started > self.args.timeout:
+                            outcomes["ERROR"] += 1
+                            break
+                finally:
+                    in_flight -= 1
+
+        limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency * 2)
+        async with httpx.AsyncClient(timeout=self.args.timeout, limits=limits) as http:
+            sampler = asyncio.create_task(sample_memory())
+            started = time.perf_counter()
+            await asyncio.gather(*(client(http) for _ in range(concurrency)))
+            duration = time.perf_counter() - started
+            sampler.cancel()
+
+        memory_growth = max(0, peak_rss - baseline_rss)
+        return {
+            "concurrency": concurrency,
+            "submissions": self.args.submissions,
+            "duration_s": round(duration, 3),
+            "submissions_per_sec": round(outcomes["COMPLETED"] / duration, 3) if duration else 0,
+            "outcomes": outcomes,
+            "submit_latency_ms": _percentiles(submit_latencies),
+            "status_latency_ms": _percentiles(status_latencies),
+            "queue_wait_ms": _percentiles(queue_waits),
+            "completion_latency_ms": _percentiles(completion_latencies),
+            "peak_in_flight": peak_in_flight,
+            "memory_per_in_flight_kb": round(memory_growth / 1024 / peak_in_flight, 1) if peak_in_flight else None
+        }
+
+
+def compare(baseline_path: str, current_path: str, threshold: float) -> int:
+    """Print per-metric changes between two result files; return 1 if any metric regressed beyond threshold"""
+    with open(baseline_path) as f:
+        baseline = {r["concurrency"]: r for r in json.load(f)["results"]}
+    with open(current_path) as f:
+        current = {r["concurrency"]: r for r in json.load(f)["results"]}
+
+    regressions = 0
+    for concurrency in sorted(set(baseline) & set(current)):
+        print(f"concurrency={concurrency}")
+        old, new = baseline[concurrency], current[concurrency]
+        metrics = [("submissions_per_sec", old["submissions_per_sec"], new["submissions_per_sec"])]
+        for key in ("submit_latency_ms", "status_latency_ms", "queue_wait_ms", "completion_latency_ms"):
+            for p in ("p50", "p95", "p99"):
+                metrics.append((f"{key}.{p}", old[key][p], new[key][p]))
+        metrics.append(("memory_per_in_flight_kb", old["memory_per_in_flight_kb"], new["memory_per_in_flight_kb"]))
+
+        for name, before, after in metrics:
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = change > threshold if any(k in name for k in _LOWER_IS_BETTER) else change < -threshold
+            regressions += worse
+            print(f"  {name:32} {before:>12} -> {after:>12} ({change:+.1%}){'  REGRESSION' if worse else ''}")
+
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the evaluation pipeline end to end")
+    parser.add_argument("--concurrency", default="1,10,50", help="Comma-separated client concurrency levels")
+    parser.add_argument("--submissions", type=int, default=100, help="Submissions per concurrency level")
+    parser.add_argument("--task-duration", type=float, default=2.0, help="Median simulated upstream task duration in seconds")
+    parser.add_argument("--poll-interval", type=float, default=0.1, help="Seconds between status polls per client")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Give up on a submission after this many seconds")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", default=None, help="Write JSON results to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="Compare two result files")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative change counted as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare(args.compare[0], args.compare[1], args.threshold))
+
+    benchmark = PipelineBenchmark(args)
+    benchmark.start()
+
+    results = []
+    for concurrency in [int(level) for level in args.concurrency.split(",")]:
+        result = asyncio.run(benchmark.run_level(concurrency))
+        results.append(result)
+        print(
+            f"concurrency={concurrency:<4} {result['submissions_per_sec']:>8} subs/s  "
+            f"submit p95={result['submit_latency_ms']['p95']}ms  "
+            f"completion p95={result['completion_latency_ms']['p95']}ms  "
+            f"outcomes={result['outcomes']}"
+        )
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": sys.version.split()[0],
+        "config": {k: v for k, v in vars(args).items() if k not in ("compare", "output")},
+        "results": results
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
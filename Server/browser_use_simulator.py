@@ -0,0 +1,312 @@
+"""
+Local simulator of the Browser Use API for load and latency testing.
+
+Implements the endpoints BrowserUseService talks to (run-task, task/{id}, task/{id}/status,
+task/{id}/screenshot, pause-task, resume-task, stop-task, tasks) with configurable response
+latency, task duration, step emission rate, failure/429 injection and a concurrency cap.
+Task progress is derived from the clock on every read, so thousands of simulated tasks cost
+no background work.
+
+Usage:
+    python browser_use_simulator.py --port 9000 --max-concurrent-tasks 1000 --throttle-rate 0.01
+
+Then point the API at it with:
+    BROWSER_USE_BASE_URL=http://localhost:9000/api/v1
+"""
+import argparse
+import asyncio
+import math
+import random
+import threading
+import time
+import uuid
+from typing import Dict, Any, List, Optional
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+
+TERMINAL_STATUSES = {"finished", "failed", "stopped"}
+
+# 1x1 PNG served as every screenshot
+_SCREENSHOT = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+
+
+class Distribution(BaseModel):
+    """A latency or duration distribution in seconds"""
+    kind: str = Field("lognormal", description="fixed, uniform, exponential or lognormal")
+    mean: float = Field(..., ge=0, description="Mean (median for lognormal) in seconds")
+    spread: float = Field(0.0, ge=0, description="Half-width for uniform, sigma for lognormal")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.mean == 0 or self.kind == "fixed":
+            return self.mean
+        if self.kind == "uniform":
+            return max(0.0, rng.uniform(self.mean - self.spread, self.mean + self.spread))
+        if self.kind == "exponential":
+            return rng.expovariate(1 / self.mean)
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(self.mean), self.spread)
+        raise ValueError(f"Unknown distribution kind: {self.kind}")
+
+
+class SimulatorConfig(BaseModel):
+    """Behaviour of the simulated upstream"""
+    response_latency: Distribution = Distribution(kind="lognormal", mean=0.05, spread=0.5)
+    task_duration: Distribution = Distribution(kind="lognormal", mean=20.0, spread=0.5)
+    steps_per_second: float = Field(0.5, gt=0, description="Rate at which running tasks emit steps")
+    failure_rate: float = Field(0.0, ge=0, le=1, description="Fraction of tasks ending in 'failed'")
+    hang_rate: float = Field(0.0, ge=0, le=1, description="Fraction of tasks that never reach a terminal state")
+    error_rate: float = Field(0.0, ge=0, le=1, description="Fraction of requests answered with HTTP 500")
+    throttle_rate: float = Field(0.0, ge=0, le=1, description="Fraction of requests answered with HTTP 429")
+    max_concurrent_tasks: Optional[int] = Field(None, ge=1, description="Active tasks allowed before run-task returns 429")
+    retry_after_seconds: int = Field(1, ge=0)
+    seed: Optional[int] = None
+
+
+class _SimulatedTask:
+    def __init__(self, instructions: str, options: Dict[str, Any], config: SimulatorConfig, rng: random.Random):
+        self.id = str(uuid.uuid4())
+        self.instructions = instructions
+        self.options = options or {}
+        self.created_at = time.time()
+        self.duration = config.task_duration.sample(rng)
+        self.step_interval = 1 / config.steps_per_second
+        self.hangs = rng.random() < config.hang_rate
+        self.outcome = "failed" if rng.random() < config.failure_rate else "finished"
+        self.paused_at: Optional[float] = None
+        self.paused_total = 0.0
+        self.stopped_at: Optional[float] = None
+
+    def _active_seconds(self, now: float) -> float:
+        end = self.stopped_at or self.paused_at or now
+        return max(0.0, end - self.created_at - self.paused_total)
+
+    def status(self, now: float) -> str:
+        if self.stopped_at is not None:
+            return "stopped"
+        if self.paused_at is not None:
+            return "paused"
+        if not self.hangs and self._active_seconds(now) >= self.duration:
+            return self.outcome
+        return "running"
+
+    def finished_at(self, now: float) -> Optional[float]:
+        if self.stopped_at is not None:
+            return self.stopped_at
+        if self.status(now) in TERMINAL_STATUSES:
+            return self.created_at + self.paused_total + self.duration
+        return None
+
+    def steps(self, now: float) -> List[Dict[str, Any]]:
+        active = self._active_seconds(now)
+        if not self.hangs:
+            active = min(active, self.duration)
+        return [
+            {
+                "id": str(i + 1),
+                "step": i + 1,
+                "evaluation_previous_goal": "Success" if i else "Unknown",
+                "next_goal": f"Simulated step {i + 1}",
+                "url": self.options.get("start_url", "about:blank")
+            }
+            for i in range(int(active // self.step_interval))
+        ]
+
+    def to_details(self, now: float) -> Dict[str, Any]:
+        status = self.status(now)
+        finished_at = self.finished_at(now)
+        output = None
+        if status == "finished":
+            output = self.options.get("simulated_output", {"result": "Simulated task completed"})
+        return {
+            "id": self.id,
+            "task": self.instructions,
+            "status": status,
+            "steps": self.steps(now),
+            "output": output,
+            "created_at": _iso(self.created_at),
+            "finished_at": _iso(finished_at) if finished_at else None,
+            "duration": (finished_at - self.created_at - self.paused_total) if finished_at else None,
+            "live_url": None,
+            "video_url": None,
+            "tags": self.options.get("tags", [])
+        }
+
+
+def _iso(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(timestamp)) + f".{int(timestamp % 1 * 1e6):06d}Z"
+
+
+def create_simulator(config: SimulatorConfig = None) -> FastAPI:
+    """Build a simulator app; ``app.state.simulator_tasks`` exposes the simulated tasks for inspection"""
+    config = config or SimulatorConfig()
+    rng = random.Random(config.seed)
+    tasks: Dict[str, _SimulatedTask] = {}
+    lock = threading.Lock()
+
+    app = FastAPI(title="Browser Use API Simulator", version="1.0.0")
+    app.state.simulator_config = config
+    app.state.simulator_tasks = tasks
+
+    @app.middleware("http")
+    async def inject_latency_and_faults(request: Request, call_next):
+        await asyncio.sleep(config.response_latency.sample(rng))
+        roll = rng.random()
+        if roll < config.throttle_rate:
+            return JSONResponse(
+                status_code=429,
+                content={"detail": "Rate limit exceeded (injected)"},
+                headers={"Retry-After": str(config.retry_after_seconds)}
+            )
+        if roll < config.throttle_rate + config.error_rate:
+            return JSONResponse(status_code=500, content={"detail": "Internal server error (injected)"})
+        return await call_next(request)
+
+    router = APIRouter(prefix="/api/v1")
+
+    def get_task_or_404(task_id: str) -> _SimulatedTask:
+        task = tasks.get(task_id)
+        if not task:
+            raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+        return task
+
+    @router.post("/run-task")
+    async def run_task(payload: Dict[str, Any]):
+        if not payload.get("task"):
+            raise HTTPException(status_code=422, detail="Field 'task' is required")
+
+        now = time.time()
+        with lock:
+            if config.max_concurrent_tasks is not None:
+                active = sum(1 for t in tasks.values() if t.status(now) not in TERMINAL_STATUSES)
+                if active >= config.max_concurrent_tasks:
+                    return JSONResponse(
+                        status_code=429,
+                        content={"detail": f"Concurrent task limit of {config.max_concurrent_tasks} reached"},
+                        headers={"Retry-After": str(config.retry_after_seconds)}
+                    )
+            task = _SimulatedTask(payload["task"], payload.get("options"), config, rng)
+            tasks[task.id] = task
+        return {"id": task.id}
+
+    @router.get("/task/{task_id}")
+    async def get_task(task_id: str):
+        return get_task_or_404(task_id).to_details(time.time())
+
+    @router.get("/task/{task_id}/status")
+    async def get_task_status(task_id: str):
+        return get_task_or_404(task_id).status(time.time())
+
+    @router.get("/task/{task_id}/screenshot")
+    async def get_screenshot(task_id: str):
+        get_task_or_404(task_id)
+        return {"screenshot": _SCREENSHOT}
+
+    @router.put("/pause-task")
+    async def pause_task(task_id: str):
+        task = get_task_or_404(task_id)
+        now = time.time()
+        with lock:
+            if task.status(now) != "running":
+                raise HTTPException(status_code=400, detail="Only running tasks can be paused")
+            task.paused_at = now
+        return {}
+
+    @router.put("/resume-task")
+    async def resume_task(task_id: str):
+        task = get_task_or_404(task_id)
+        now = time.time()
+        with lock:
+            if task.paused_at is None or task.stopped_at is not None:
+                raise HTTPException(status_code=400, detail="Only paused tasks can be resumed")
+            task.paused_total += now - task.paused_at
+            task.paused_at = None
+        return {}
+
+    @router.put("/stop-task")
+    async def stop_task(task_id: str):
+        task = get_task_or_404(task_id)
+        now = time.time()
+        with lock:
+            if task.status(now) in TERMINAL_STATUSES:
+                raise HTTPException(status_code=400, detail="Task already finished")
+            if task.paused_at is not None:
+                task.paused_total += now - task.paused_at
+                task.paused_at = None
+            task.stopped_at = now
+        return {}
+
+    @router.get("/tasks")
+    async def list_tasks(
+        limit: int = Query(10, ge=1, le=1000),
+        page: int = Query(1, ge=1),
+        status: Optional[str] = None
+    ):
+        now = time.time()
+        with lock:
+            snapshot = sorted(tasks.values(), key=lambda t: t.created_at, reverse=True)
+        if status:
+            snapshot = [t for t in snapshot if t.status(now) == status]
+        start = (page - 1) * limit
+        return {
+            "tasks": [t.to_details(now) for t in snapshot[start:start + limit]],
+            "total_count": len(snapshot),
+            "page": page,
+            "limit": limit
+        }
+
+    app.include_router(router)
+
+    @app.get("/health", tags=["Health"])
+    async def health_check():
+        now = time.time()
+        return {
+            "status": "healthy",
+            "tasks": len(tasks),
+            "active_tasks": sum(1 for t in tasks.values() if t.status(now) not in TERMINAL_STATUSES)
+        }
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local Browser Use API simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", default="lognormal:0.05:0.5", help="Response latency as kind:mean[:spread] seconds")
+    parser.add_argument("--duration", default="lognormal:20:0.5", help="Task duration as kind:mean[:spread] seconds")
+    parser.add_argument("--steps-per-second", type=float, default=0.5)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--max-concurrent-tasks", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    def parse_distribution(value: str) -> Distribution:
+        parts = value.split(":")
+        return Distribution(
+            kind=parts[0],
+            mean=float(parts[1]),
+            spread=float(parts[2]) if len(parts) > 2 else 0.0
+        )
+
+    config = SimulatorConfig(
+        response_latency=parse_distribution(args.latency),
+        task_duration=parse_distribution(args.duration),
+        steps_per_second=args.steps_per_second,
+        failure_rate=args.failure_rate,
+        hang_rate=args.hang_rate,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        max_concurrent_tasks=args.max_concurrent_tasks,
+        seed=args.seed
+    )
+
+    import uvicorn
+    uvicorn.run(create_simulator(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
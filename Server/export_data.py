@@ -0,0 +1,57 @@
+"""
+Export submissions, evaluation results or leaderboard rows straight from the database.
+
+Usage:
+    python export_data.py <submissions|evaluations|leaderboard> [--format jsonl|csv|parquet]
+        [--task-id <id>] [--agent-id <id>] [--user-id <id>] [--since <iso>] [--until <iso>]
+        [--include-details] [--chunk-size 500] [--output <path>]
+
+Rows are read and written in chunks, so memory stays flat for exports of any size. Without
+--output the export is written to stdout.
+"""
+import argparse
+import sys
+import uuid
+from datetime import datetime
+from fastapi import HTTPException
+from app.services.export_service import ExportService, DATASETS, FORMATS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a bulk export of evaluation data")
+    parser.add_argument("dataset", choices=list(DATASETS))
+    parser.add_argument("--format", dest="export_format", choices=list(FORMATS), default="jsonl")
+    parser.add_argument("--task-id", type=uuid.UUID, default=None)
+    parser.add_argument("--agent-id", type=uuid.UUID, default=None)
+    parser.add_argument("--user-id", type=uuid.UUID, default=None, help="Only this user's submissions")
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None, help="Submitted at or after (ISO 8601)")
+    parser.add_argument("--until", type=datetime.fromisoformat, default=None, help="Submitted before (ISO 8601)")
+    parser.add_argument("--include-details", action="store_true", help="Add resultDetails to evaluation rows")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Submissions read per query")
+    parser.add_argument("--output", default=None, help="File to write; stdout if omitted")
+    args = parser.parse_args()
+
+    service = ExportService(args.chunk_size)
+    try:
+        service.validate(args.dataset, args.export_format, args.include_details)
+    except HTTPException as e:
+        parser.error(e.detail)
+
+    chunks = service.iter_chunks(
+        args.dataset, args.task_id, args.agent_id, args.user_id, args.since, args.until, args.include_details
+    )
+    body = service.stream(args.export_format, service.columns(args.dataset, args.include_details), chunks)
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    written = 0
+    try:
+        for data in body:
+            out.write(data)
+            written += len(data)
+    finally:
+        if args.output:
+            out.close()
+    print(f"Wrote {written} bytes of {args.dataset} as {args.export_format}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Bulk-create tasks from a JSON array or JSONL file of task definitions.
+
+Usage:
+    python import_tasks.py <path> [--dry-run] [--chunk-size 200]
+
+Definitions use the same shape as POST /tasks. The whole file is validated first, and every
+problem is printed; nothing is imported unless all definitions are valid.
+"""
+import argparse
+import sys
+from fastapi import HTTPException
+from app.services.task_service import TaskService, decode_import
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import task definitions")
+    parser.add_argument("path", help="JSON array or JSONL file of task definitions")
+    parser.add_argument("--dry-run", action="store_true", help="Validate without creating anything")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Tasks inserted per write")
+    args = parser.parse_args()
+
+    with open(args.path, "rb") as import_file:
+        body = import_file.read()
+
+    try:
+        result = TaskService().import_tasks(decode_import(body), dry_run=args.dry_run, chunk_size=args.chunk_size)
+    except HTTPException as e:
+        if isinstance(e.detail, dict):
+            print(e.detail["message"], file=sys.stderr)
+            for error in e.detail["errors"]:
+                field = f" {error['field']}:" if error["field"] else ""
+                print(f"  {error['location']}:{field} {error['message']}", file=sys.stderr)
+            for task_id in e.detail.get("remainingTaskIds", []):
+                print(f"  left behind: {task_id}", file=sys.stderr)
+        else:
+            print(e.detail, file=sys.stderr)
+        sys.exit(1)
+
+    if result["dryRun"]:
+        print(f"All {result['valid']} task definitions are valid")
+    else:
+        print(f"Imported {result['created']} tasks")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,16 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.metrics import metrics_middleware, render_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from app.core.tracing import tracing_middleware
+from app.core.profiling import profile_request_middleware
 from app.db.database import init_db
+from app.db.instrumentation import query_stats_middleware
+from app.services.recovery_service import start_recovery_loop
+from app.services.reconciliation_service import start_reconciliation_loop
 from loguru import logger
 from app.api.v1.auth import router as auth_router
-from app.api.v1 import tasks , agents , submission
+from app.api.v1 import tasks , agents , submission, suite_runs, webhooks, exports, debug
 
 
 def create_application() -> FastAPI:
@@ -23,16 +29,30 @@ def create_application() -> FastAPI:
         allow_headers=["*"],
     )
 
+    app.middleware("http")(profile_request_middleware)
+    app.middleware("http")(query_stats_middleware)
+    if settings.METRICS_ENABLED:
+        app.middleware("http")(metrics_middleware)
+    app.middleware("http")(tracing_middleware)
+
     app.include_router(auth_router, prefix="/api/v1")
     app.include_router(tasks.router, prefix="/api/v1")
     app.include_router(agents.router, prefix="/api/v1")
     app.include_router(submission.router, prefix="/api/v1")
+    app.include_router(suite_runs.router, prefix="/api/v1")
+    app.include_router(webhooks.router, prefix="/api/v1")
+    app.include_router(exports.router, prefix="/api/v1")
+    app.include_router(debug.router, prefix="/api/v1")
 
 
     @app.on_event("startup")
     async def startup():
         try:
             init_db(force_recreate=False)
+            if settings.RECOVERY_ENABLED:
+                start_recovery_loop()
+            if settings.RECONCILER_ENABLED:
+                start_reconciliation_loop()
             logger.info(f"Starting {settings.APP_NAME} in {settings.ENVIRONMENT} environment")
         except Exception as e:
             logger.error(f"Failed to start application: {str(e)}")
@@ -46,6 +66,11 @@ def create_application() -> FastAPI:
             "environment": settings.ENVIRONMENT
         }
 
+    if settings.METRICS_ENABLED:
+        @app.get("/metrics", tags=["Health"], include_in_schema=False)
+        async def metrics():
+            return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
     return app
 
 app = create_application()
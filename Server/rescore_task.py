@@ -0,0 +1,38 @@
+"""
+Recompute stored evaluation scores for a task after its scoring configuration changed.
+
+Usage:
+    python rescore_task.py <task_id> [--batch-size 100] [--resume-from <submission_id>]
+
+Progress is printed after every batch; if the run is interrupted, pass the last printed
+cursor as --resume-from to continue where it stopped.
+"""
+import argparse
+import uuid
+from app.services.rescore_service import RescoreService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rescore all stored evaluations for a task")
+    parser.add_argument("task_id", help="ID of the task to rescore")
+    parser.add_argument("--batch-size", type=int, default=100, help="Submissions rescored per batch")
+    parser.add_argument("--resume-from", default=None, help="Submission ID cursor to resume after")
+    args = parser.parse_args()
+
+    def print_progress(progress):
+        print(
+            f"processed={progress['processed']} updated={progress['updated']} "
+            f"skipped={progress['skipped']} cursor={progress['cursor']}"
+        )
+
+    result = RescoreService().rescore_task(
+        uuid.UUID(args.task_id),
+        batch_size=args.batch_size,
+        resume_from=args.resume_from,
+        progress_callback=print_progress
+    )
+    print(f"Done: {result['updated']} evaluations rescored out of {result['processed']} submissions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+import os
+import sys
+import pytest
+
+# Run against the in-memory database; settings are read from the environment on first import
+os.environ.setdefault("DATABASE_BACKEND", "memory")
+os.environ.setdefault("METRICS_ENABLED", "false")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def db():
+    """The in-memory database, emptied for the test"""
+    from app.db.database import get_db
+    client = get_db()
+    client.reset()
+    return client
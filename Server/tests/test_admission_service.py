@@ -0,0 +1,112 @@
+import pytest
+from fastapi import HTTPException
+from app.core.config import settings
+from app.services import admission_service as admission
+from app.services.admission_service import AdmissionService, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(admission.time, "monotonic", fake)
+    return fake
+
+
+def test_token_bucket_allows_burst_then_reports_wait(clock):
+    bucket = TokenBucket(rate_per_second=0.5, capacity=2)
+    assert bucket.take() == 0.0
+    assert bucket.take() == 0.0
+    assert bucket.take() == pytest.approx(2.0)
+
+
+def test_token_bucket_refills_up_to_capacity(clock):
+    bucket = TokenBucket(rate_per_second=1.0, capacity=2)
+    bucket.take()
+    bucket.take()
+    clock.now += 1.0
+    assert bucket.take() == 0.0
+    assert bucket.take() == pytest.approx(1.0)
+
+    clock.now += 60
+    assert [bucket.take() for _ in range(3)] == [0.0, 0.0, pytest.approx(1.0)]
+
+
+def _service(monkeypatch, backlog=0, throughput=0.0):
+    service = AdmissionService()
+    monkeypatch.setattr(service, "_load", lambda: (backlog + service._admitted_since_refresh, throughput))
+    return service
+
+
+def test_admit_rate_limits_per_user(monkeypatch, clock):
+    monkeypatch.setattr(settings, "SUBMISSION_RATE_LIMIT_PER_MINUTE", 60)
+    monkeypatch.setattr(settings, "SUBMISSION_RATE_LIMIT_BURST", 1)
+    service = _service(monkeypatch)
+
+    service.admit("user-a")
+    service.admit("user-b")
+    with pytest.raises(HTTPException) as error:
+        service.admit("user-a")
+    assert error.value.status_code == 429
+    assert error.value.headers["Retry-After"] == "1"
+
+
+def test_admit_rejects_batches_that_overflow_the_queue(monkeypatch, clock):
+    monkeypatch.setattr(settings, "SUBMISSION_RATE_LIMIT_PER_MINUTE", 0)
+    monkeypatch.setattr(settings, "SUBMISSION_MAX_QUEUE_DEPTH", 10)
+    service = _service(monkeypatch, backlog=8, throughput=0.5)
+
+    service.admit("user", count=2)
+    with pytest.raises(HTTPException) as error:
+        service.admit("user", count=1)
+    assert error.value.status_code == 429
+    # One submission over the limit drains in 2s at 0.5/s
+    assert error.value.headers["Retry-After"] == "2"
+
+
+def test_admit_rejects_when_estimated_wait_is_too_long(monkeypatch, clock):
+    monkeypatch.setattr(settings, "SUBMISSION_RATE_LIMIT_PER_MINUTE", 0)
+    monkeypatch.setattr(settings, "SUBMISSION_MAX_QUEUE_DEPTH", 0)
+    monkeypatch.setattr(settings, "SUBMISSION_MAX_ESTIMATED_WAIT_SECONDS", 100)
+    service = _service(monkeypatch, backlog=200, throughput=1.0)
+
+    with pytest.raises(HTTPException) as error:
+        service.admit("user")
+    assert error.value.headers["Retry-After"] == "100"
+
+
+def test_queue_rejection_does_not_use_a_token(monkeypatch, clock):
+    monkeypatch.setattr(settings, "SUBMISSION_RATE_LIMIT_PER_MINUTE", 60)
+    monkeypatch.setattr(settings, "SUBMISSION_RATE_LIMIT_BURST", 1)
+    monkeypatch.setattr(settings, "SUBMISSION_MAX_QUEUE_DEPTH", 1)
+    service = _service(monkeypatch, backlog=1)
+
+    with pytest.raises(HTTPException) as error:
+        service.admit("user")
+    assert error.value.detail.startswith("Evaluation queue is full")
+    # The queue drained; the user's single token is still there
+    monkeypatch.setattr(settings, "SUBMISSION_MAX_QUEUE_DEPTH", 0)
+    service.admit("user")
+
+
+def test_idle_buckets_are_evicted_once_full(monkeypatch, clock):
+    # A token every two minutes
+    monkeypatch.setattr(settings, "SUBMISSION_RATE_LIMIT_PER_MINUTE", 0.5)
+    monkeypatch.setattr(settings, "SUBMISSION_RATE_LIMIT_BURST", 2)
+    service = _service(monkeypatch)
+
+    service.admit("idle")
+    clock.now += 130
+    # Idle has refilled and is swept on this call
+    service.admit("active")
+    # Active is still short of a full bucket at the next sweep
+    clock.now += admission._BUCKET_SWEEP_SECONDS
+    service.admit("other")
+    assert set(service._buckets) == {"active", "other"}
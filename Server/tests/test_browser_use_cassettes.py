@@ -0,0 +1,79 @@
+import json
+import itertools
+import requests
+from app.services import browser_use_cassettes
+from app.services.browser_use_cassettes import CassettePlayer, CassetteRecorder, load_cassette
+
+URL = "https://upstream/api/v1"
+
+
+class FakeUpstream:
+    """Answers task creation with a new id and status polls from a script per task"""
+
+    def __init__(self, statuses):
+        self.statuses = statuses
+        self.ids = (f"task-{n}" for n in itertools.count(1))
+        self.polls = {}
+
+    def __call__(self, method, url, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        if url.endswith("/run-task"):
+            body = {"id": next(self.ids)}
+        else:
+            task_id = url.rsplit("/", 2)[-2]
+            script = self.statuses.get(task_id, ["running"])
+            poll = self.polls[task_id] = self.polls.get(task_id, -1) + 1
+            body = {"id": task_id, "status": script[min(poll, len(script) - 1)]}
+        response._content = json.dumps(body).encode()
+        return response
+
+
+def _record(recorder, upstream, monkeypatch, polls=0, task=None):
+    monkeypatch.setattr(browser_use_cassettes.requests, "request", upstream)
+    payload = {"task": task or "Find the price", "options": {"tags": ["submission_x"]}}
+    task_id = recorder.request("create_task", "POST", "run-task", f"{URL}/run-task", json=payload).json()["id"]
+    for _ in range(polls):
+        recorder.request("get_task_status", "GET", f"task/{task_id}/status", f"{URL}/task/{task_id}/status", task_id)
+    return task_id
+
+
+def test_recorded_cassette_replays_under_a_new_task_id(tmp_path, monkeypatch):
+    upstream = FakeUpstream({"task-1": ["running", "running", "running", "finished"]})
+    task_id = _record(CassetteRecorder(str(tmp_path)), upstream, monkeypatch, polls=4)
+
+    cassette = load_cassette(str(tmp_path / f"{task_id}.jsonl"))
+    # Repeated identical polls are stored once
+    assert [i["json"].get("status") for i in cassette["interactions"]] == [None, "running", "finished"]
+
+    player = CassettePlayer(str(tmp_path), speed=0)
+    replayed = player.request("create_task", "POST", "run-task", f"{URL}/run-task", json={"task": "Find the price", "options": {}})
+    replayed_id = replayed.json()["id"]
+    assert replayed_id != task_id
+    status = player.request("get_task_status", "GET", f"task/{replayed_id}/status", f"{URL}/task/{replayed_id}/status", replayed_id)
+    assert status.json() == {"id": replayed_id, "status": "finished"}
+
+
+def test_cassettes_are_appended_not_rewritten(tmp_path, monkeypatch):
+    recorder = CassetteRecorder(str(tmp_path))
+    writes = []
+    write = recorder._write
+    monkeypatch.setattr(recorder, "_write", lambda task_id, line, mode: writes.append(mode) or write(task_id, line, mode))
+
+    _record(recorder, FakeUpstream({"task-1": ["running", "finished"]}), monkeypatch, polls=2)
+    assert writes == ["w", "a", "a", "a"]
+
+
+def test_only_finished_cassettes_are_closed(tmp_path, monkeypatch):
+    monkeypatch.setattr(browser_use_cassettes, "_MAX_OPEN_CASSETTES", 1)
+    recorder = CassetteRecorder(str(tmp_path))
+    upstream = FakeUpstream({"task-1": ["running"], "task-2": ["finished"]})
+
+    running = _record(recorder, upstream, monkeypatch, polls=1, task="a")
+    finished = _record(recorder, upstream, monkeypatch, polls=1, task="b")
+    assert set(recorder._cassettes) == {running, finished}
+
+    _record(recorder, upstream, monkeypatch, task="c")
+    assert finished not in recorder._cassettes
+    assert running in recorder._cassettes
@@ -0,0 +1,103 @@
+import json
+import pytest
+import requests
+from app.core.config import settings
+from app.services import browser_use_service as browser_use_module
+from app.services.browser_use_key_pool import BrowserUseKeyPool, KeyPoolExhausted, PooledKey
+from app.services.browser_use_service import BrowserUseService
+
+
+def _pool(*limits):
+    return BrowserUseKeyPool([PooledKey(f"key-{n}", max_concurrent_tasks=limit) for n, limit in enumerate(limits)])
+
+
+def test_new_tasks_go_to_the_least_loaded_key():
+    pool = _pool(2, 2)
+    first = pool.acquire()
+    pool.bind(first, "t1")
+    second = pool.acquire()
+    assert second is not first
+    pool.bind(second, "t2")
+    assert pool.route("t1") is first and pool.route("t2") is second
+
+
+def test_acquire_waits_for_capacity():
+    pool = _pool(1)
+    key = pool.acquire()
+    pool.bind(key, "t1")
+    with pytest.raises(KeyPoolExhausted):
+        pool.acquire(timeout=0)
+
+    pool.release("t1")
+    assert pool.acquire(timeout=0) is key
+    # The route outlives the slot, for late details calls
+    assert pool.route("t1") is key
+
+
+def test_unhealthy_keys_leave_rotation(monkeypatch):
+    monkeypatch.setattr(settings, "BROWSER_USE_KEY_COOLDOWN_SECONDS", 60)
+    pool = _pool(0, 0, 0)
+    revoked, throttled, flaky = pool.keys
+
+    pool.report(revoked, 401)
+    pool.report(throttled, 429)
+    for _ in range(2):
+        pool.report(flaky, 503)
+    assert pool.acquire(timeout=0) is flaky
+    pool.report(flaky, None)
+    with pytest.raises(KeyPoolExhausted):
+        pool.acquire(timeout=0)
+    assert [key["healthy"] for key in pool.snapshot()] == [False, False, False]
+
+
+def test_pool_from_settings(monkeypatch):
+    monkeypatch.setattr(settings, "BROWSER_USE_API_KEYS", json.dumps(["plain", {"key": "limited", "maxConcurrentTasks": 5}]))
+    monkeypatch.setattr(settings, "BROWSER_USE_KEY_MAX_CONCURRENT_TASKS", 0)
+    pool = BrowserUseKeyPool.from_settings()
+    assert [(key.api_key, key.max_concurrent_tasks) for key in pool.keys] == [("plain", 0), ("limited", 5)]
+
+
+class FakeUpstream:
+    """Answers per API key: ``statuses`` maps a key to the status code it returns"""
+
+    def __init__(self, statuses, owner=None):
+        self.statuses = statuses
+        self.owner = owner
+        self.calls = []
+
+    def __call__(self, method, url, headers=None, **kwargs):
+        key = headers["Authorization"].split(" ", 1)[1]
+        self.calls.append((key, url.rsplit("/api/v1/", 1)[-1]))
+        response = requests.Response()
+        response.url = url
+        response.status_code = self.statuses.get(key, 200)
+        if url.endswith("/status") and self.owner and key != self.owner:
+            response.status_code = 404
+        response._content = json.dumps({"id": "created", "status": "running"}).encode()
+        return response
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "BROWSER_USE_KEY_COOLDOWN_SECONDS", 60)
+    service = BrowserUseService(base_url="http://upstream/api/v1")
+    service.key_pool = _pool(0, 0)
+    return service
+
+
+def test_create_task_fails_over_to_another_key(service, monkeypatch):
+    upstream = FakeUpstream({"key-0": 429})
+    monkeypatch.setattr(browser_use_module.requests, "request", upstream)
+
+    assert service.create_task("Find the price") == "created"
+    assert [key for key, _ in upstream.calls] == ["key-0", "key-1"]
+    assert service.key_pool.route("created").api_key == "key-1"
+
+
+def test_calls_for_unknown_tasks_find_the_owning_key(service, monkeypatch):
+    upstream = FakeUpstream({}, owner="key-1")
+    monkeypatch.setattr(browser_use_module.requests, "request", upstream)
+
+    assert service.stop_task("elsewhere")
+    assert upstream.calls[-1] == ("key-1", "stop-task")
+    assert service.key_pool.route("elsewhere").api_key == "key-1"
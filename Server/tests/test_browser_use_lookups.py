@@ -0,0 +1,71 @@
+import threading
+import time
+import pytest
+from app.services.browser_use_service import BrowserUseService, _SingleFlight
+
+
+def test_concurrent_lookups_share_one_call():
+    lookups = _SingleFlight(ttl_seconds=0)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"status": "running"}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(lookups.do("task", fetch)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(lookups.do("task", fetch))) for _ in range(5)]
+    for follower in followers:
+        follower.start()
+    # Nothing is cached (ttl 0): only callers that joined the running call avoid a fetch
+    time.sleep(0.1)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == [{"status": "running"}] * 6
+
+
+def test_results_are_served_for_the_window_then_refetched():
+    lookups = _SingleFlight(ttl_seconds=60)
+    calls = []
+    fetch = lambda: calls.append(1) or {"status": "running", "steps": []}
+
+    first = lookups.do("task", fetch)
+    first["steps"].append("mutated by a caller")
+    assert lookups.do("task", fetch) == {"status": "running", "steps": []}
+    assert len(calls) == 1
+
+    lookups.forget("task")
+    lookups.do("task", fetch)
+    assert len(calls) == 2
+
+
+def test_failures_reach_every_waiter_and_are_not_cached():
+    lookups = _SingleFlight(ttl_seconds=60)
+
+    def fail():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        lookups.do("task", fail)
+    assert lookups.do("task", lambda: {"status": "finished"}) == {"status": "finished"}
+
+
+def test_state_changes_drop_cached_lookups(monkeypatch):
+    monkeypatch.setattr(BrowserUseService, "_lookups", _SingleFlight(ttl_seconds=60))
+    service = BrowserUseService(api_key="key", base_url="http://upstream")
+    statuses = iter(["running", "paused"])
+    monkeypatch.setattr(service, "_fetch_task_status", lambda task_id: {"status": next(statuses)})
+    monkeypatch.setattr(service, "_request", lambda *args, **kwargs: None)
+
+    assert service.get_task_status("t1") == {"status": "running"}
+    assert service.get_task_status("t1") == {"status": "running"}
+    assert service.pause_task("t1")
+    assert service.get_task_status("t1") == {"status": "paused"}
@@ -0,0 +1,54 @@
+from fastapi.testclient import TestClient
+from browser_use_simulator import Distribution, SimulatorConfig, create_simulator
+
+INSTANT = Distribution(kind="fixed", mean=0)
+
+
+def _client(**config):
+    config = {"response_latency": INSTANT, "task_duration": Distribution(kind="fixed", mean=60), "seed": 1, **config}
+    return TestClient(create_simulator(SimulatorConfig(**config)))
+
+
+def _run(client, **options):
+    response = client.post("/api/v1/run-task", json={"task": "Find the price", "options": options})
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def test_task_lifecycle():
+    client = _client()
+    task_id = _run(client, tags=["submission_x"])
+    assert client.get(f"/api/v1/task/{task_id}/status").json() == "running"
+
+    assert client.put("/api/v1/pause-task", params={"task_id": task_id}).status_code == 200
+    assert client.get(f"/api/v1/task/{task_id}/status").json() == "paused"
+    assert client.put("/api/v1/resume-task", params={"task_id": task_id}).status_code == 200
+    assert client.put("/api/v1/stop-task", params={"task_id": task_id}).status_code == 200
+
+    details = client.get(f"/api/v1/task/{task_id}").json()
+    assert details["status"] == "stopped"
+    assert details["tags"] == ["submission_x"]
+    assert client.put("/api/v1/stop-task", params={"task_id": task_id}).status_code == 400
+    assert client.get("/api/v1/task/unknown/status").status_code == 404
+
+
+def test_finished_tasks_report_output_and_filter_by_status():
+    client = _client(task_duration=INSTANT)
+    task_id = _run(client, simulated_output={"price": 10})
+
+    details = client.get(f"/api/v1/task/{task_id}").json()
+    assert details["status"] == "finished"
+    assert details["output"] == {"price": 10}
+    assert [t["id"] for t in client.get("/api/v1/tasks", params={"status": "finished"}).json()["tasks"]] == [task_id]
+    assert client.get("/api/v1/tasks", params={"status": "running"}).json()["tasks"] == []
+
+
+def test_concurrency_cap_and_throttling_answer_429():
+    client = _client(max_concurrent_tasks=1, retry_after_seconds=3)
+    _run(client)
+    response = client.post("/api/v1/run-task", json={"task": "Another"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"
+
+    throttled = _client(throttle_rate=1)
+    assert throttled.post("/api/v1/run-task", json={"task": "Find the price"}).status_code == 429
@@ -0,0 +1,133 @@
+import threading
+import time
+import pytest
+from app.core.config import settings
+from app.services.evaluation_scheduler import (
+    EvaluationScheduler, EvaluationCancelled, COMPLETING, PAUSED, QUEUED, RESUMING, RUNNING, STOPPED, TIMED_OUT
+)
+
+
+@pytest.fixture(autouse=True)
+def fast_watchdog(monkeypatch):
+    monkeypatch.setattr(settings, "EVALUATION_WATCHDOG_INTERVAL_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "EVALUATION_TIMEOUT_GRACE_SECONDS", 0)
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def _start(scheduler, submission_id, max_time=60, **kwargs):
+    """Enter a slot on a worker thread that sleeps until cancelled; returns (thread, outcome)"""
+    outcome = {}
+
+    def work():
+        try:
+            with scheduler.slot(submission_id, max_time, **kwargs) as evaluation:
+                outcome["evaluation"] = evaluation
+                evaluation.sleep(0.2)
+                outcome["claimed"] = scheduler.claim(evaluation)
+        except EvaluationCancelled as e:
+            outcome["cancelled"] = str(e)
+
+    thread = threading.Thread(target=work, daemon=True)
+    thread.start()
+    return thread, outcome
+
+
+def test_pause_releases_the_slot_and_resume_waits_for_one():
+    scheduler = EvaluationScheduler(max_concurrency=1)
+    with scheduler.slot("a", 60) as a:
+        assert a.state == RUNNING and scheduler._available == 0
+
+        assert scheduler.pause("a") is a
+        assert a.state == PAUSED and scheduler._available == 1
+        assert scheduler.pause("a") is None
+
+        with scheduler.slot("b", 60) as b:
+            assert b.state == RUNNING
+            assert scheduler.resume("a") is a
+            assert a.state == RESUMING
+            assert scheduler.resume("a") is None
+        assert scheduler._available == 1
+    assert scheduler.get("a") is None
+
+
+def test_stop_cancels_a_queued_evaluation():
+    scheduler = EvaluationScheduler(max_concurrency=1)
+    with scheduler.slot("a", 60):
+        thread, outcome = _start(scheduler, "b")
+        _wait_for(lambda: scheduler.get("b") is not None)
+        assert scheduler.get("b").state == QUEUED
+
+        assert scheduler.stop("b").state == STOPPED
+        thread.join(5)
+    assert "stopped" in outcome["cancelled"]
+    assert scheduler.get("b") is None
+
+
+def test_claim_wins_over_a_later_stop():
+    scheduler = EvaluationScheduler(max_concurrency=1)
+    with scheduler.slot("a", 60) as a:
+        assert scheduler.claim(a)
+        assert a.state == COMPLETING
+        assert scheduler.stop("a") is None
+        assert not scheduler.claim(a)
+
+
+def test_paused_worker_resumes_and_reattaches():
+    scheduler = EvaluationScheduler(max_concurrency=1)
+    resumed = threading.Event()
+    thread, outcome = _start(scheduler, "a", on_resume=lambda evaluation: resumed.set())
+    _wait_for(lambda: "evaluation" in outcome)
+
+    scheduler.pause("a")
+    scheduler.resume("a")
+    thread.join(5)
+    assert resumed.is_set()
+    assert outcome["claimed"] is True
+
+
+def test_stopped_worker_cannot_claim():
+    scheduler = EvaluationScheduler(max_concurrency=1)
+    thread, outcome = _start(scheduler, "a")
+    _wait_for(lambda: "evaluation" in outcome)
+
+    scheduler.pause("a")
+    scheduler.stop("a")
+    thread.join(5)
+    assert "stopped" in outcome["cancelled"]
+    assert scheduler._available == 1
+
+
+def test_watchdog_times_out_overrunning_evaluations():
+    scheduler = EvaluationScheduler(max_concurrency=1)
+    timed_out = []
+    with scheduler.slot("a", 0.05, on_timeout=timed_out.append) as a:
+        _wait_for(lambda: timed_out)
+        assert a.state == TIMED_OUT
+        assert scheduler._available == 1
+        assert not scheduler.claim(a)
+
+
+def test_multi_slot_evaluations_wait_for_every_slot():
+    scheduler = EvaluationScheduler(max_concurrency=3)
+    with scheduler.slot("a", 60):
+        thread, outcome = _start(scheduler, "b", slots=3)
+        _wait_for(lambda: scheduler.get("b") is not None)
+        assert scheduler.get("b").state == QUEUED
+    thread.join(5)
+    assert outcome["evaluation"].slots == 3
+    assert outcome["claimed"] is True
+
+
+def test_attach_task_tracks_every_trial():
+    scheduler = EvaluationScheduler(max_concurrency=1)
+    with scheduler.slot("a", 60) as a:
+        for task_id in ("t1", "t2", "t1"):
+            a.attach_task(task_id)
+        assert a.browser_task_ids == ["t1", "t2"]
+        assert a.to_dict()["browserUseTaskId"] == "t2"
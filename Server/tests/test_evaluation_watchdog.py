@@ -0,0 +1,92 @@
+import threading
+import time
+import uuid
+import pytest
+from app.core import metrics
+from app.core.config import settings
+from app.services import evaluation_scheduler as scheduler_module
+from app.services.evaluation_scheduler import EvaluationScheduler, EvaluationCancelled, PAUSED, RUNNING, TIMED_OUT
+from app.services.submission_service import SubmissionService
+
+
+class FakeBrowserUse:
+    stopped = []
+
+    def stop_task(self, task_id):
+        self.stopped.append(task_id)
+        return True
+
+
+@pytest.fixture(autouse=True)
+def fast_watchdog(monkeypatch):
+    monkeypatch.setattr(settings, "EVALUATION_WATCHDOG_INTERVAL_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "EVALUATION_TIMEOUT_GRACE_SECONDS", 0)
+    monkeypatch.setattr(scheduler_module, "BrowserUseService", FakeBrowserUse)
+    FakeBrowserUse.stopped = []
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def test_expiry_stops_upstream_tasks_and_cancels_the_worker():
+    scheduler = EvaluationScheduler(max_concurrency=1)
+    timeouts_before = metrics.EVALUATION_TIMEOUTS.value()
+    timed_out = []
+
+    with pytest.raises(EvaluationCancelled):
+        with scheduler.slot("a", 0.05, on_timeout=timed_out.append) as evaluation:
+            evaluation.attach_task("t1")
+            evaluation.attach_task("t2")
+            evaluation.sleep(5)
+
+    _wait_for(lambda: timed_out)
+    assert evaluation.state == TIMED_OUT
+    assert FakeBrowserUse.stopped == ["t1", "t2"]
+    assert metrics.EVALUATION_TIMEOUTS.value() == timeouts_before + 1
+    assert scheduler.get("a") is None
+
+
+def test_paused_time_does_not_count_towards_the_limit():
+    scheduler = EvaluationScheduler(max_concurrency=1)
+    outcome = {}
+
+    def work():
+        with scheduler.slot("a", 0.2) as evaluation:
+            outcome["evaluation"] = evaluation
+            evaluation.sleep(0.1)
+            outcome["claimed"] = scheduler.claim(evaluation)
+
+    thread = threading.Thread(target=work, daemon=True)
+    thread.start()
+    _wait_for(lambda: scheduler.get("a") is not None and scheduler.get("a").state == RUNNING)
+    scheduler.pause("a")
+    time.sleep(0.3)
+    assert scheduler.get("a").state == PAUSED
+    scheduler.resume("a")
+    thread.join(5)
+    assert outcome["claimed"] is True
+
+
+def test_grace_period_extends_the_deadline(monkeypatch):
+    monkeypatch.setattr(settings, "EVALUATION_TIMEOUT_GRACE_SECONDS", 0.2)
+    scheduler = EvaluationScheduler(max_concurrency=1)
+    with scheduler.slot("a", 0.01) as evaluation:
+        evaluation.sleep(0.1)
+        assert scheduler.claim(evaluation)
+
+
+def test_timed_out_submission_is_failed(db):
+    submission = {"id": str(uuid.uuid4()), "userId": "u", "agentId": "a", "taskId": "t", "status": "PROCESSING"}
+    db.table("submissions").insert(submission).execute()
+    scheduler = EvaluationScheduler(max_concurrency=1)
+    service = SubmissionService()
+
+    with pytest.raises(EvaluationCancelled):
+        with scheduler.slot(submission["id"], 0.02, on_timeout=lambda e: service._fail_timed_out(submission, e, time.perf_counter())) as evaluation:
+            evaluation.sleep(5)
+
+    _wait_for(lambda: db.table("submissions").select("status").eq("id", submission["id"]).execute().data[0]["status"] == "FAILED")
@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from app.services.export_service import ExportService
+
+START = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def submissions(db):
+    rows = []
+    for n in range(7):
+        row = {
+            "id": str(uuid.UUID(int=n + 1)), "userId": "user", "agentId": "agent", "taskId": "task" if n < 6 else "other",
+            "status": "COMPLETED", "trials": 1, "submittedAt": (START + timedelta(minutes=n)).isoformat()
+        }
+        db.table("submissions").insert(row).execute()
+        db.table("evaluation_results").insert({
+            "id": str(uuid.uuid4()), "submissionId": row["id"], "status": "SUCCESS", "score": n,
+            "resultDetails": {"cached": n % 2 == 0}
+        }).execute()
+        rows.append(row)
+    return rows
+
+
+def _counting(service):
+    """Count submissions reads so tests can see when each chunk is fetched"""
+    reads = []
+    table = service._db.table
+    service._db = type("CountingClient", (), {
+        "table": staticmethod(lambda name: (reads.append(name) if name == "submissions" else None) or table(name))
+    })()
+    return reads
+
+
+def test_chunks_are_read_one_at_a_time(submissions):
+    service = ExportService(chunk_size=3)
+    reads = _counting(service)
+    chunks = service.iter_chunks("submissions")
+
+    first = next(chunks)
+    assert [row["id"] for row in first] == [row["id"] for row in submissions[:3]]
+    # Nothing beyond the first chunk has been read yet
+    assert len(reads) == 1
+    assert [len(chunk) for chunk in chunks] == [3, 1]
+    assert len(reads) == 3
+
+
+def test_stream_encodes_each_chunk_as_it_is_read(submissions):
+    service = ExportService(chunk_size=2)
+    reads = _counting(service)
+    columns = service.columns("evaluations")
+    stream = service.stream("jsonl", columns, service.iter_chunks("evaluations", task_id="task"))
+
+    first = next(stream)
+    assert len(reads) == 1
+    lines = [json.loads(line) for line in (first + b"".join(stream)).decode().splitlines()]
+    assert [line["score"] for line in lines] == list(range(6))
+    assert [line["cached"] for line in lines[:2]] == [True, False]
+    assert set(lines[0]) == set(columns)
+
+
+def test_csv_has_one_header_and_respects_the_date_window(submissions):
+    service = ExportService(chunk_size=2)
+    chunks = service.iter_chunks("submissions", since=START + timedelta(minutes=1), until=START + timedelta(minutes=5))
+    body = b"".join(service.stream("csv", service.columns("submissions"), chunks)).decode()
+    rows = list(csv.reader(io.StringIO(body)))
+    assert rows[0] == service.columns("submissions")
+    assert [row[0] for row in rows[1:]] == [row["id"] for row in submissions[1:5]]
+
+
+def test_invalid_exports_are_rejected_before_streaming(db):
+    service = ExportService()
+    with pytest.raises(HTTPException):
+        service.validate("users", "jsonl")
+    with pytest.raises(HTTPException):
+        service.validate("submissions", "xml")
+    with pytest.raises(HTTPException):
+        service.validate("submissions", "csv", include_details=True)
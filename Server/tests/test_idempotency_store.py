@@ -0,0 +1,95 @@
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi import HTTPException
+from app.services.idempotency_service import IdempotencyStore, request_fingerprint
+
+USER = uuid.uuid4()
+FINGERPRINT = request_fingerprint("agent", "task", 1)
+
+
+def _creator(db, calls, delay=0.0):
+    def create():
+        calls.append(1)
+        time.sleep(delay)
+        row = {
+            "id": str(uuid.uuid4()), "userId": str(USER), "agentId": "agent", "taskId": "task", "trials": 1,
+            "idempotencyKey": "key", "submittedAt": datetime.now(timezone.utc).isoformat(), "status": "QUEUED"
+        }
+        db.table("submissions").insert(row).execute()
+        return row
+    return create
+
+
+def test_concurrent_duplicates_share_one_submission(db):
+    store = IdempotencyStore(ttl_seconds=60)
+    calls, results = [], []
+    create = _creator(db, calls, delay=0.1)
+    threads = [threading.Thread(target=lambda: results.append(store.run(USER, "key", FINGERPRINT, create))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert len({submission_id for submission_id, _ in results}) == 1
+    assert sorted(replayed for _, replayed in results) == [False, True, True, True, True]
+
+
+def test_keys_are_found_on_the_submission_after_a_restart(db):
+    calls = []
+    submission_id, _ = IdempotencyStore(ttl_seconds=60).run(USER, "key", FINGERPRINT, _creator(db, calls))
+    # A fresh store, as on another worker, finds the key on the submission row
+    assert IdempotencyStore(ttl_seconds=60).run(USER, "key", FINGERPRINT, _creator(db, calls)) == (submission_id, True)
+    assert len(calls) == 1
+
+
+def test_expired_keys_create_a_new_submission(db):
+    calls = []
+    store = IdempotencyStore(ttl_seconds=60)
+    first, _ = store.run(USER, "key", FINGERPRINT, _creator(db, calls))
+    db.table("submissions").update({"submittedAt": (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()}).eq("id", first).execute()
+
+    second, replayed = IdempotencyStore(ttl_seconds=60).run(USER, "key", FINGERPRINT, _creator(db, calls))
+    assert second != first and not replayed
+
+
+def test_reusing_a_key_for_another_request_is_rejected(db):
+    store = IdempotencyStore(ttl_seconds=60)
+    store.run(USER, "key", FINGERPRINT, _creator(db, []))
+    with pytest.raises(HTTPException) as error:
+        store.run(USER, "key", request_fingerprint("agent", "task", 3), _creator(db, []))
+    assert error.value.status_code == 422
+
+
+def test_failures_reach_waiters_and_are_not_remembered(db):
+    store = IdempotencyStore(ttl_seconds=60)
+    started, release = threading.Event(), threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("insert failed")
+
+    errors = []
+
+    def submit():
+        try:
+            store.run(USER, "key", FINGERPRINT, fail)
+        except RuntimeError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=submit)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=submit)
+    follower.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert len(errors) == 2
+    assert store.run(USER, "key", FINGERPRINT, _creator(db, []))[1] is False
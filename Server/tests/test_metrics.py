@@ -0,0 +1,56 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core import metrics
+from app.core.metrics import Counter, Histogram, MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, route="/a")
+
+    assert histogram.render()[2:] == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1.0"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 6.05',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+
+
+def test_counter_labels_are_escaped():
+    counter = Counter("errors_total", "Errors", ("message",))
+    counter.inc(message='bad "quote"\n')
+    counter.inc(2, message='bad "quote"\n')
+    assert counter.render()[-1] == 'errors_total{message="bad \\"quote\\"\\n"} 3'
+
+
+def test_registry_rejects_duplicate_names():
+    registry = MetricsRegistry()
+    registry.register(Counter("dup_total", "First"))
+    with pytest.raises(ValueError):
+        registry.register(Counter("dup_total", "Second"))
+
+
+def test_http_metrics_use_the_route_template():
+    app = FastAPI()
+    app.middleware("http")(metrics.metrics_middleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        return {"id": item_id}
+
+    before = metrics.HTTP_REQUESTS.value(method="GET", route="/items/{item_id}", status="200")
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+    assert metrics.HTTP_REQUESTS.value(method="GET", route="/items/{item_id}", status="200") == before + 2
+    assert metrics.HTTP_REQUESTS_IN_FLIGHT.value(method="GET") == 0
+
+
+def test_db_queries_are_counted_per_table_and_operation(db):
+    before = metrics.DB_QUERIES.value(table="agents", operation="select", outcome="ok")
+    db.table("agents").select("*").eq("id", "a").execute()
+    assert metrics.DB_QUERIES.value(table="agents", operation="select", outcome="ok") == before + 1
+    assert "realevals_db_queries_total" in metrics.render_metrics()
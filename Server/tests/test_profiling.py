@@ -0,0 +1,58 @@
+import os
+import threading
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core import profiling
+from app.core.config import settings
+from app.core.profiling import PROFILE_HEADER, ProfilerBusyError, SamplingProfiler
+
+
+def _busy_loop(stop):
+    while not stop.is_set():
+        sum(range(100))
+
+
+def test_sampling_profiler_collects_collapsed_stacks():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_loop, args=(stop,), name="busy-worker")
+    worker.start()
+    try:
+        profiler = SamplingProfiler(interval=0.005, include_idle=False).run(0.1)
+    finally:
+        stop.set()
+        worker.join(5)
+
+    assert profiler.samples > 0
+    busy = [stack for stack in profiler.stacks if stack.startswith("busy-worker;")]
+    assert busy and all("_busy_loop (test_profiling.py" in stack for stack in busy)
+    line = profiler.collapsed().splitlines()[0]
+    assert int(line.rsplit(" ", 1)[1]) >= 1
+    assert profiler.summary(limit=1)["stacks"][0]["count"] >= 1
+
+
+def test_only_one_profile_runs_at_a_time():
+    assert profiling._profiler_lock.acquire(blocking=False)
+    try:
+        with pytest.raises(ProfilerBusyError):
+            SamplingProfiler().run(0.01)
+    finally:
+        profiling._profiler_lock.release()
+
+
+def test_request_profiling_needs_the_admin_secret(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_REQUEST_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILING_OUTPUT_DIR", str(tmp_path))
+    app = FastAPI()
+    app.middleware("http")(profiling.profile_request_middleware)
+
+    @app.get("/work")
+    async def work():
+        return {}
+
+    client = TestClient(app)
+    assert PROFILE_HEADER not in client.get("/work", headers={PROFILE_HEADER: "wrong"}).headers
+    assert os.listdir(tmp_path) == []
+
+    profile_id = client.get("/work", headers={PROFILE_HEADER: settings.ADMIN_SECRET_KEY}).headers[PROFILE_HEADER]
+    assert os.listdir(tmp_path) == [f"request-{profile_id}.prof"]
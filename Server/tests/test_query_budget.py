@@ -0,0 +1,59 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.db.database import get_db
+from app.db.instrumentation import QueryStats, query_stats_middleware
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    app.middleware("http")(query_stats_middleware)
+
+    @app.get("/agents")
+    async def list_agents(n: int = 1):
+        # One lookup per agent: the N+1 pattern the middleware flags
+        for i in range(n):
+            get_db().table("agents").select("*").eq("id", str(i)).execute()
+        return {}
+
+    return TestClient(app)
+
+
+def test_queries_are_reported_per_request(client, monkeypatch):
+    monkeypatch.setattr(settings, "DB_QUERY_BUDGET_ENFORCE", False)
+    response = client.get("/agents", params={"n": 3})
+    assert response.status_code == 200
+    assert response.headers["X-DB-Query-Count"] == "3"
+    assert "X-DB-Time-Ms" in response.headers
+
+
+def test_repeated_query_shapes_fail_when_enforced(client, monkeypatch):
+    monkeypatch.setattr(settings, "DB_QUERY_BUDGET_ENFORCE", True)
+    monkeypatch.setattr(settings, "DB_QUERY_BUDGET", 0)
+    monkeypatch.setattr(settings, "DB_REPEATED_QUERY_THRESHOLD", 3)
+
+    assert client.get("/agents", params={"n": 2}).status_code == 200
+    response = client.get("/agents", params={"n": 3})
+    assert response.status_code == 500
+    assert "'select agents where id eq' ran 3 times (possible N+1)" in response.json()["detail"]
+
+
+def test_query_budget_fails_when_enforced(client, monkeypatch):
+    monkeypatch.setattr(settings, "DB_QUERY_BUDGET_ENFORCE", True)
+    monkeypatch.setattr(settings, "DB_QUERY_BUDGET", 2)
+    monkeypatch.setattr(settings, "DB_REPEATED_QUERY_THRESHOLD", 0)
+
+    response = client.get("/agents", params={"n": 3})
+    assert response.status_code == 500
+    assert "3 queries exceeds the budget of 2" in response.json()["detail"]
+
+
+def test_repeated_shapes_meet_the_threshold():
+    stats = QueryStats()
+    for _ in range(2):
+        stats.record(("agents", "select", ("id eq",)), 0.001)
+    stats.record(("tasks", "select", ()), 0.001)
+    assert stats.repeated_shapes(2) == [(("agents", "select", ("id eq",)), 2)]
+    assert stats.count == 3
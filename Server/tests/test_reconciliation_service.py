@@ -0,0 +1,143 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.core.config import settings
+from app.services.reconciliation_service import UpstreamTaskReconciler, _parse_tags
+from app.services.submission_service import persisted_task_ids
+
+
+class FakeBrowserUse:
+    def __init__(self, tasks):
+        self.tasks = tasks
+        self.stopped = []
+
+    def iter_tasks(self, status=None, page_size=None):
+        return [task for task in self.tasks if task["status"] == status]
+
+    def stop_task(self, task_id):
+        self.stopped.append(task_id)
+        return True
+
+
+def _submission(db, status="PROCESSING", **fields):
+    row = {
+        "id": str(uuid.uuid4()),
+        "userId": str(uuid.uuid4()),
+        "agentId": str(uuid.uuid4()),
+        "taskId": str(uuid.uuid4()),
+        "status": status,
+        **fields
+    }
+    db.table("submissions").insert(row).execute()
+    return row
+
+
+def _ago(seconds):
+    return (datetime.now(timezone.utc) - timedelta(seconds=seconds)).isoformat()
+
+
+def _upstream(submission, task_id=None, status="running", age=3600, **tags):
+    tags = {"submission": submission["id"], "agent": submission["agentId"], "task": submission["taskId"], **tags}
+    return {
+        "id": task_id or str(uuid.uuid4()),
+        "status": status,
+        "created_at": _ago(age),
+        "tags": [f"{kind}_{value}" for kind, value in tags.items()]
+    }
+
+
+def test_parse_tags_keeps_known_kinds():
+    assert _parse_tags(["submission_a-b", "agent_c", "task_d", "other_e", "submission_", "plain"]) == {
+        "submission": "a-b", "agent": "c", "task": "d"
+    }
+    assert _parse_tags(None) == {}
+
+
+def test_task_ids_prefers_the_trial_list():
+    assert persisted_task_ids({"browserUseTaskId": "t2", "browserUseTaskIds": ["t1", "t2"]}) == ["t1", "t2"]
+    assert persisted_task_ids({"browserUseTaskId": "t1", "browserUseTaskIds": None}) == ["t1"]
+    assert persisted_task_ids({}) == []
+
+
+@pytest.mark.parametrize("status, fields, tags, expected", [
+    ("PROCESSING", {"browserUseTaskId": "live"}, {}, "tracked"),
+    ("PROCESSING", {}, {}, "tracked"),
+    ("PROCESSING", {"browserUseTaskIds": ["other", "live"]}, {}, "tracked"),
+    ("PROCESSING", {"browserUseTaskId": "newer"}, {}, "orphaned:superseded"),
+    ("COMPLETED", {"browserUseTaskId": "live"}, {}, "orphaned:finished"),
+    ("PROCESSING", {"browserUseTaskId": "live"}, {"agent": "someone-else"}, "mismatched"),
+])
+def test_classify(db, status, fields, tags, expected):
+    submission = _submission(db, status, **fields)
+    task = _upstream(submission, task_id="live", **tags)
+    assert UpstreamTaskReconciler(FakeBrowserUse([]))._classify(task, {submission["id"]: submission}) == expected
+
+
+def test_classify_untagged_and_deleted():
+    reconciler = UpstreamTaskReconciler(FakeBrowserUse([]))
+    assert reconciler._classify({"id": "x", "tags": ["benchmark"]}, {}) == "untagged"
+    assert reconciler._classify({"id": "x", "tags": [f"submission_{uuid.uuid4()}"]}, {}) == "orphaned:deleted"
+
+
+def test_reconcile_stops_orphans_and_counts_missing_upstream(db, monkeypatch):
+    monkeypatch.setattr(settings, "RECONCILER_STOP_ORPHANS", True)
+    tracked = _submission(db, browserUseTaskIds=["trial-1", "trial-2"])
+    finished = _submission(db, "COMPLETED", browserUseTaskId="done")
+    _submission(db, browserUseTaskId="vanished")
+    # A finished sibling trial is not live, but the submission still has a live one
+    _submission(db, browserUseTaskIds=["finished-trial", "trial-3"])
+
+    browser_use = FakeBrowserUse([
+        _upstream(tracked, task_id="trial-1"),
+        _upstream(tracked, task_id="trial-2", status="paused"),
+        _upstream(finished, task_id="done"),
+        {"id": "manual", "status": "running", "tags": []},
+        {"id": "trial-3", "status": "running", "tags": []},
+    ])
+    report = UpstreamTaskReconciler(browser_use).reconcile()
+
+    assert report["liveTasks"] == 5
+    assert report["tracked"] == 2
+    assert report["untagged"] == 2
+    assert report["orphaned"] == {"finished": 1}
+    assert browser_use.stopped == ["done"]
+    assert report["missingUpstream"] == 1
+
+
+def test_just_created_trial_is_not_superseded(db, monkeypatch):
+    monkeypatch.setattr(settings, "RECONCILER_STOP_ORPHANS", True)
+    monkeypatch.setattr(settings, "RECONCILER_ORPHAN_GRACE_SECONDS", 600)
+    submission = _submission(db, browserUseTaskIds=["trial-1"])
+    # Trial 2 was created moments ago; the worker hasn't written its id yet
+    browser_use = FakeBrowserUse([
+        _upstream(submission, task_id="trial-1", age=120),
+        _upstream(submission, task_id="trial-2", age=1),
+    ])
+    report = UpstreamTaskReconciler(browser_use).reconcile()
+
+    assert report["unrecorded"] == 1
+    assert report["orphaned"] == {}
+    assert browser_use.stopped == []
+
+
+def test_task_older_than_a_recorded_one_is_superseded(db, monkeypatch):
+    monkeypatch.setattr(settings, "RECONCILER_ORPHAN_GRACE_SECONDS", 600)
+    submission = _submission(db, browserUseTaskId="retry")
+    tasks = [_upstream(submission, task_id="first", age=60), _upstream(submission, task_id="retry", age=30)]
+    browser_use = FakeBrowserUse(tasks)
+    report = UpstreamTaskReconciler(browser_use).reconcile()
+
+    assert report["orphaned"] == {"superseded": 1}
+    # Stopping is off by default
+    assert browser_use.stopped == []
+
+
+def test_orphans_younger_than_the_grace_age_are_not_stopped(db, monkeypatch):
+    monkeypatch.setattr(settings, "RECONCILER_STOP_ORPHANS", True)
+    monkeypatch.setattr(settings, "RECONCILER_ORPHAN_GRACE_SECONDS", 600)
+    deleted = {"id": str(uuid.uuid4()), "agentId": "a", "taskId": "t"}
+    browser_use = FakeBrowserUse([_upstream(deleted, task_id="young", age=5), _upstream(deleted, task_id="old")])
+    report = UpstreamTaskReconciler(browser_use).reconcile()
+
+    assert report["orphaned"] == {"deleted": 2}
+    assert browser_use.stopped == ["old"]
@@ -0,0 +1,120 @@
+import asyncio
+import uuid
+import pytest
+from fastapi import HTTPException
+from app.controllers.task_controller import TaskController
+from app.schemas.task_schema import TaskCreate
+from app.services.rescore_service import RescoreService
+from app.services.task_service import TaskService
+
+CONFIG = {
+    "startUrl": "https://shop.example.com",
+    "objective": "Find the price",
+    "expectedResults": {"price": 10},
+    "maxTimeAllowed": 60
+}
+
+
+@pytest.fixture
+def task(db):
+    task = TaskService()._task_row(TaskCreate(
+        title="Find a price",
+        description="Look up the price",
+        difficulty="EASY",
+        webArenaEnvironment="shopping",
+        environmentConfig=CONFIG
+    ).model_dump(mode="json"))
+    db.table("tasks").insert(task).execute()
+    for index, price in enumerate([10, 11, 10, 12, 10]):
+        submission_id = str(uuid.uuid4())
+        db.table("submissions").insert({
+            "id": submission_id, "userId": str(uuid.uuid4()), "agentId": str(uuid.uuid4()),
+            "taskId": task["id"], "status": "COMPLETED", "score": 0
+        }).execute()
+        db.table("evaluation_results").insert({
+            "id": str(uuid.uuid4()), "submissionId": submission_id, "status": "SUCCESS",
+            "score": 0, "accuracy": 0, "timeTaken": 30,
+            "resultDetails": {"output": {"price": price}, "steps": [{}] * 5}
+        }).execute()
+        db.table("leaderboard").insert({
+            "id": str(uuid.uuid4()), "submissionId": submission_id, "taskId": task["id"],
+            "score": 0, "accuracy": 0, "rank": index + 1
+        }).execute()
+    return task
+
+
+def test_rescore_updates_evaluations_leaderboard_and_search_scores(db, task):
+    progress = RescoreService().rescore_task(uuid.UUID(task["id"]), batch_size=2)
+    assert progress["processed"] == 5 and progress["updated"] == 5
+
+    scores = sorted(row["score"] for row in db.table("evaluation_results").select("score").execute().data)
+    assert scores == [pytest.approx(s) for s in [15.0, 15.0, 85.0, 85.0, 85.0]]
+    assert sorted(row["score"] for row in db.table("submissions").select("score").execute().data) == scores
+    ranks = {entry["rank"]: entry["score"] for entry in db.table("leaderboard").select("*").execute().data}
+    assert ranks[1] == pytest.approx(85.0) and ranks[5] == pytest.approx(15.0)
+
+
+def test_rescore_resumes_after_the_cursor(db, task):
+    first = sorted(row["id"] for row in db.table("submissions").select("id").execute().data)[:2]
+    progress = RescoreService().rescore_task(uuid.UUID(task["id"]), batch_size=2, resume_from=first[-1])
+    assert progress["processed"] == 3
+
+
+def test_job_can_be_polled_with_any_spelling_of_the_task_id(db, task):
+    service = RescoreService()
+    job = service.start_job(uuid.UUID(task["id"]), batch_size=2)
+    service.run_job(job["id"])
+
+    controller = TaskController()
+    polled = asyncio.run(controller.get_rescore_job(task["id"].upper(), job["id"]))
+    assert polled.status == "COMPLETED"
+    assert polled.updated == 5
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(controller.get_rescore_job(str(uuid.uuid4()), job["id"]))
+    assert error.value.status_code == 404
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(controller.get_rescore_job("not-a-uuid", job["id"]))
+    assert error.value.status_code == 400
+
+
+def test_rescore_only_writes_the_score_column(db, task):
+    submission = db.table("submissions").select("*").eq("taskId", task["id"]).execute().data[0]
+    db.table("submissions").update({"status": "PROCESSING"}).eq("id", submission["id"]).execute()
+    service = RescoreService()
+    table = service._db.table
+    finished = []
+
+    def finish_concurrently():
+        # The worker completes the submission just before the rescore writes its score
+        if not finished:
+            finished.append(True)
+            db.table("submissions").update({"status": "COMPLETED", "heartbeatAt": "2026-01-01T00:00:00+00:00"}) \
+                .eq("id", submission["id"]).execute()
+
+    class RacingTable:
+        def __init__(self, name):
+            self._query = table(name)
+            self._name = name
+
+        def update(self, values, **kwargs):
+            if self._name == "submissions":
+                finish_concurrently()
+            return self._query.update(values, **kwargs)
+
+        def upsert(self, rows, **kwargs):
+            if self._name == "submissions":
+                finish_concurrently()
+            return self._query.upsert(rows, **kwargs)
+
+        def __getattr__(self, name):
+            return getattr(self._query, name)
+
+    service._db = type("RacingClient", (), {"table": staticmethod(RacingTable)})()
+    service.rescore_task(uuid.UUID(task["id"]))
+
+    assert finished
+    row = db.table("submissions").select("*").eq("id", submission["id"]).execute().data[0]
+    assert row["status"] == "COMPLETED"
+    assert row["heartbeatAt"] == "2026-01-01T00:00:00+00:00"
+    assert row["score"] > 0
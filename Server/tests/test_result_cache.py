@@ -0,0 +1,85 @@
+import threading
+import pytest
+from app.services.result_cache import EvaluationResultCache, make_cache_key
+
+CONFIG = {"startUrl": "https://example.com", "objective": "Find it", "expectedResults": {"price": 10}}
+
+
+def test_cache_key_ignores_volatile_options_and_config():
+    key = make_cache_key("task-1", "instructions", {"headless": True}, CONFIG)
+    assert make_cache_key("task-1", "instructions", {"headless": True, "tags": ["submission_x"]}, CONFIG) == key
+    assert make_cache_key("task-1", "instructions", {"headless": True}, {**CONFIG, "cacheResults": True}) == key
+
+
+def test_cache_key_covers_task_and_scoring_config():
+    key = make_cache_key("task-1", "instructions", {}, CONFIG)
+    assert make_cache_key("task-2", "instructions", {}, CONFIG) != key
+    assert make_cache_key("task-1", "instructions", {}, {**CONFIG, "expectedResults": {"price": 12}}) != key
+    assert make_cache_key("task-1", "instructions", {}, {**CONFIG, "accuracyWeight": 0.9}) != key
+    assert make_cache_key("task-1", "other instructions", {}, CONFIG) != key
+
+
+def test_get_or_compute_caches_cacheable_results_only():
+    cache = EvaluationResultCache(ttl_seconds=60)
+    result, cached = cache.get_or_compute("key", lambda: {"status": "failed"}, is_cacheable=lambda r: r["status"] == "success")
+    assert not cached and cache.get("key") is None
+
+    result, cached = cache.get_or_compute("key", lambda: {"status": "success"}, is_cacheable=lambda r: r["status"] == "success")
+    assert not cached
+    result, cached = cache.get_or_compute("key", lambda: {"status": "recomputed"})
+    assert cached and result == {"status": "success"}
+
+
+def test_get_or_compute_coalesces_concurrent_callers():
+    cache = EvaluationResultCache(ttl_seconds=60)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"status": "success"}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(cache.get_or_compute("key", compute)))
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=lambda: results.append(cache.get_or_compute("key", compute)))
+    follower.start()
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert len(calls) == 1
+    assert sorted(cached for _, cached in results) == [False, True]
+
+
+def test_expired_entries_are_dropped():
+    cache = EvaluationResultCache(ttl_seconds=-1)
+    cache.set("key", {"status": "success"})
+    assert cache.get("key") is None
+
+
+def test_waiting_caller_can_be_cancelled_through_its_sleep():
+    cache = EvaluationResultCache(ttl_seconds=60)
+    started, release = threading.Event(), threading.Event()
+
+    def compute():
+        started.set()
+        release.wait(5)
+        return {"status": "success"}
+
+    class Cancelled(Exception):
+        pass
+
+    def cancelled_sleep(seconds):
+        raise Cancelled()
+
+    leader = threading.Thread(target=lambda: cache.get_or_compute("key", compute))
+    leader.start()
+    started.wait(5)
+    with pytest.raises(Cancelled):
+        cache.get_or_compute("key", compute, sleep=cancelled_sleep)
+    release.set()
+    leader.join(5)
@@ -0,0 +1,71 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi import HTTPException
+from app.models.enums import SubmissionStatus
+from app.services import submission_event_service
+from app.services.submission_event_service import SubmissionEventService, _latency_stats
+
+START = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _events(db, task_id, timeline):
+    """Insert one submission's transitions; ``timeline`` is (seconds after START, status) pairs"""
+    submission_id = str(uuid.uuid4())
+    for seconds, to_status in timeline:
+        db.table("submission_events").insert({
+            "id": str(uuid.uuid4()),
+            "submissionId": submission_id,
+            "taskId": task_id,
+            "agentId": "agent",
+            "toStatus": to_status,
+            "occurredAt": (START + timedelta(seconds=seconds)).isoformat()
+        }).execute()
+
+
+def test_record_normalizes_statuses(db):
+    SubmissionEventService().record({"id": "s1", "taskId": "t1"}, None, SubmissionStatus.QUEUED)
+    SubmissionEventService().record({"id": "s1", "taskId": "t1"}, "SubmissionStatus.QUEUED", "PROCESSING")
+    events = db.table("submission_events").select("*").execute().data
+    assert {(e["fromStatus"], e["toStatus"]) for e in events} == {(None, "QUEUED"), ("QUEUED", "PROCESSING")}
+
+
+def test_stage_latency_per_task(db, monkeypatch):
+    # Paging through the event log must not change the result
+    monkeypatch.setattr(submission_event_service, "_PAGE_SIZE", 2)
+    _events(db, "t1", [(0, "QUEUED"), (2, "PROCESSING"), (12, "COMPLETED")])
+    _events(db, "t1", [(0, "QUEUED"), (4, "PROCESSING"), (34, "FAILED")])
+    _events(db, "t2", [(0, "QUEUED"), (1, "PROCESSING")])
+
+    report = SubmissionEventService().get_stage_latency(group_by="task")
+
+    assert report["submissions"] == 3
+    t1, t2 = report["groups"]
+    assert t1["key"] == "t1"
+    assert t1["stages"]["QUEUED"]["max"] == 4
+    assert t1["stages"]["PROCESSING"]["mean"] == 20
+    assert t1["stages"]["total"]["count"] == 2
+    # Unfinished submissions have stages but no total
+    assert set(t2["stages"]) == {"QUEUED"}
+
+
+def test_stage_latency_window_and_buckets(db):
+    _events(db, "t1", [(0, "QUEUED"), (5, "PROCESSING"), (3600, "COMPLETED")])
+
+    report = SubmissionEventService().get_stage_latency(group_by="none", bucket="hour", until=START + timedelta(seconds=60))
+    assert report["groups"] == [{
+        "key": None,
+        "window": "2026-01-01T12:00:00+00:00",
+        "stages": {"QUEUED": _latency_stats([5.0])}
+    }]
+
+
+def test_invalid_grouping_is_rejected(db):
+    with pytest.raises(HTTPException) as error:
+        SubmissionEventService().get_stage_latency(group_by="user")
+    assert error.value.status_code == 400
+
+
+def test_latency_stats_use_nearest_rank():
+    stats = _latency_stats([float(n) for n in range(1, 101)])
+    assert (stats["p50"], stats["p90"], stats["p99"], stats["max"]) == (50.0, 90.0, 99.0, 100.0)
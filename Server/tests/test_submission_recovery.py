@@ -0,0 +1,135 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.core.config import settings
+from app.services.evaluation_scheduler import EvaluationScheduler
+from app.services.recovery_service import SubmissionRecoveryService
+from app.services.submission_service import SubmissionService
+
+
+def _ago(seconds):
+    return (datetime.now(timezone.utc) - timedelta(seconds=seconds)).isoformat()
+
+
+def _submission(db, status="QUEUED", **fields):
+    row = {
+        "id": str(uuid.uuid4()),
+        "userId": str(uuid.uuid4()),
+        "agentId": str(uuid.uuid4()),
+        "taskId": str(uuid.uuid4()),
+        "status": status,
+        "submittedAt": _ago(3600),
+        "heartbeatAt": None,
+        "claimedBy": None,
+        **fields
+    }
+    db.table("submissions").insert(row).execute()
+    return row
+
+
+@pytest.fixture(autouse=True)
+def stale_after(monkeypatch):
+    monkeypatch.setattr(settings, "RECOVERY_STALE_SECONDS", 60)
+
+
+def test_only_submissions_without_recent_heartbeat_are_stranded(db):
+    stale = _submission(db, heartbeatAt=_ago(120))
+    never_started = _submission(db)
+    _submission(db, heartbeatAt=_ago(5))
+    _submission(db, "COMPLETED")
+
+    stranded = SubmissionRecoveryService().find_stranded()
+    assert sorted(row["id"] for row in stranded) == sorted([stale["id"], never_started["id"]])
+
+
+def test_claim_is_compare_and_set(db):
+    _submission(db, "PROCESSING", heartbeatAt=_ago(120), claimedBy=str(uuid.uuid4()))
+    recovery = SubmissionRecoveryService()
+    row = recovery.find_stranded()[0]
+
+    assert recovery.claim(row)
+    # A second recovery pass working from the same snapshot loses
+    assert not recovery.claim(row)
+
+
+def test_queued_worker_backs_off_after_recovery_claimed(db):
+    submission = _submission(db)
+    recovery = SubmissionRecoveryService()
+    assert recovery.claim(recovery.find_stranded()[0])
+
+    service = SubmissionService()
+    assert service.process_submission(submission["id"]) is None
+    assert db.table("submissions").select("status").eq("id", submission["id"]).execute().data[0]["status"] == "QUEUED"
+
+
+def test_first_worker_claims_from_null(db):
+    submission = _submission(db)
+    service = SubmissionService()
+    assert service._claim(submission)
+    assert not service._claim({**submission, "claimedBy": None})
+
+
+def test_expected_submissions_are_heartbeated(db):
+    waiting = _submission(db, heartbeatAt=_ago(120))
+    scheduler = EvaluationScheduler(max_concurrency=1)
+    scheduler.expect(waiting["id"])
+    scheduler._heartbeat()
+    assert SubmissionRecoveryService().find_stranded() == []
+
+    scheduler.forget(waiting["id"])
+    assert scheduler._pending == set()
+
+
+class FakeBrowserUse:
+    def __init__(self):
+        self.calls = []
+
+    def pause_task(self, task_id):
+        self.calls.append(("pause", task_id))
+
+    def stop_task(self, task_id):
+        self.calls.append(("stop", task_id))
+
+    def resume_task(self, task_id):
+        self.calls.append(("resume", task_id))
+
+
+def _service():
+    service = SubmissionService()
+    service.browser_use_service = FakeBrowserUse()
+    return service
+
+
+def test_stop_without_local_evaluation_stops_persisted_tasks(db):
+    owner = str(uuid.uuid4())
+    submission = _submission(db, "PROCESSING", heartbeatAt=_ago(5), claimedBy=owner, browserUseTaskIds=["t1", "t2"])
+    service = _service()
+
+    assert service.control_submission(submission, "stop")["success"]
+    assert service.browser_use_service.calls == [("stop", "t1"), ("stop", "t2")]
+    row = db.table("submissions").select("*").eq("id", submission["id"]).execute().data[0]
+    assert row["status"] == "FAILED"
+    assert row["claimedBy"] is None
+    # The worker that owned it sees its claim is gone and discards its result
+    assert not SubmissionService()._still_claimed({"id": submission["id"], "claimedBy": owner})
+
+
+def test_resume_adopts_paused_submission_of_a_dead_worker(db, monkeypatch):
+    submission = _submission(db, "PENDING", heartbeatAt=_ago(120), claimedBy=str(uuid.uuid4()), browserUseTaskId="t1")
+    started = []
+    monkeypatch.setattr(SubmissionRecoveryService, "start", lambda self, submission_id: started.append(submission_id))
+    service = _service()
+
+    assert service.control_submission(submission, "resume")["success"]
+    assert service.browser_use_service.calls == [("resume", "t1")]
+    assert started == [submission["id"]]
+    assert db.table("submissions").select("status").eq("id", submission["id"]).execute().data[0]["status"] == "QUEUED"
+
+
+def test_resume_leaves_paused_submission_of_a_live_worker(db, monkeypatch):
+    submission = _submission(db, "PENDING", heartbeatAt=_ago(5), claimedBy=str(uuid.uuid4()), browserUseTaskId="t1")
+    monkeypatch.setattr(SubmissionRecoveryService, "start", lambda self, submission_id: pytest.fail("adopted a live submission"))
+    service = _service()
+
+    assert not service.control_submission(submission, "resume")["success"]
+    assert service.browser_use_service.calls == []
@@ -0,0 +1,81 @@
+import uuid
+import pytest
+from fastapi import HTTPException
+from app.services.submission_service import SubmissionService, _decode_cursor, _encode_cursor
+
+
+def test_cursor_round_trip():
+    cursor = _encode_cursor("score", "desc", 72.5, "b6c1f3a0-0000-0000-0000-000000000001")
+    assert "=" not in cursor
+    assert _decode_cursor(cursor, "score", "desc") == (72.5, "b6c1f3a0-0000-0000-0000-000000000001")
+
+
+def test_cursor_from_a_different_sort_is_rejected():
+    cursor = _encode_cursor("submittedAt", "desc", "2026-01-01T00:00:00", "id")
+    with pytest.raises(HTTPException) as error:
+        _decode_cursor(cursor, "submittedAt", "asc")
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "e30", _encode_cursor("score", "desc", 1, "id")[:-3]])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        _decode_cursor(cursor, "score", "desc")
+    assert error.value.status_code == 400
+
+
+@pytest.fixture
+def submissions(db):
+    user_id = str(uuid.uuid4())
+    rows = []
+    for index in range(23):
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "userId": user_id,
+            "agentId": str(uuid.uuid4()),
+            "taskId": str(uuid.uuid4()),
+            "status": "COMPLETED" if index % 4 else "QUEUED",
+            # Few distinct values, so pages break inside runs of ties
+            "submittedAt": f"2026-01-0{index % 3 + 1}T00:00:00",
+            "score": None if index % 4 == 0 else float(index % 5 * 10)
+        })
+    db.table("submissions").insert(rows).execute()
+    db.table("submissions").insert({**rows[1], "id": str(uuid.uuid4()), "userId": str(uuid.uuid4())}).execute()
+    return user_id, rows
+
+
+def _all_pages(user_id, **kwargs):
+    service, pages, cursor = SubmissionService(), [], None
+    while True:
+        page = service.search_submissions(uuid.UUID(user_id), limit=4, cursor=cursor, **kwargs)
+        pages.append(page["items"])
+        cursor = page["nextCursor"]
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("sort_by", ["submittedAt", "score"])
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_pages_cover_every_row_once_in_order(submissions, sort_by, order):
+    user_id, rows = submissions
+    pages = _all_pages(user_id, sort_by=sort_by, order=order)
+    items = [item for page in pages for item in page]
+
+    expected = [row for row in rows if row[sort_by] is not None]
+    expected.sort(key=lambda row: (row[sort_by], row["id"]), reverse=order == "desc")
+    assert [item["id"] for item in items] == [row["id"] for row in expected]
+    assert all(len(page) == 4 for page in pages[:-1])
+
+
+def test_filters_apply_to_every_page(submissions):
+    user_id, rows = submissions
+    items = [item for page in _all_pages(user_id, statuses=["QUEUED"]) for item in page]
+    assert sorted(item["id"] for item in items) == sorted(row["id"] for row in rows if row["status"] == "QUEUED")
+    assert all(item["evaluation"] is None for item in items)
+
+
+def test_invalid_sort_is_rejected(submissions):
+    user_id, _ = submissions
+    with pytest.raises(HTTPException) as error:
+        SubmissionService().search_submissions(uuid.UUID(user_id), sort_by="title")
+    assert error.value.status_code == 400
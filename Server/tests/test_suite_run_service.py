@@ -0,0 +1,108 @@
+import threading
+import uuid
+import pytest
+from app.services import suite_run_service
+from app.services.evaluation_scheduler import evaluation_scheduler
+from app.services.suite_run_service import SuiteRunService, COMPLETED, RUNNING
+from app.services.task_service import TaskService
+
+
+@pytest.fixture
+def agent(db):
+    agent = {"id": str(uuid.uuid4()), "userId": str(uuid.uuid4()), "name": "agent", "configuration": {}}
+    db.table("agents").insert(agent).execute()
+    return agent
+
+
+def _tasks(count):
+    return [{"id": str(uuid.uuid4())} for _ in range(count)]
+
+
+def test_find_tasks_filters_in_the_query_and_never_guesses_difficulty(db):
+    service = TaskService()
+    for difficulty, environment in [("EASY", "shopping"), ("MEDIUM", "shopping"), ("MEDIUM", "gitlab"), (None, "shopping")]:
+        db.table("tasks").insert(service._task_row({
+            "title": f"{difficulty} {environment}", "difficulty": difficulty,
+            "webArenaEnvironment": environment, "environmentConfig": {}
+        })).execute()
+
+    assert [t["title"] for t in service.find_tasks("MEDIUM", "shopping")] == ["MEDIUM shopping"]
+    assert len(service.find_tasks("MEDIUM")) == 2
+    shopping = service.find_tasks(web_arena_environment="shopping")
+    assert sorted(str(t["difficulty"]) for t in shopping) == ["EASY", "MEDIUM", "None"]
+
+
+def test_create_inserts_every_submission_at_once(db, agent):
+    service = SuiteRunService()
+    inserts = []
+    table = service.submission_service._db.table
+    service.submission_service._db = type("CountingClient", (), {
+        "table": staticmethod(lambda name: inserts.append(name) or table(name))
+    })()
+
+    suite_run = service.create_suite_run(agent["userId"], agent["id"], _tasks(5), trials=2)
+
+    assert inserts.count("submissions") == 1
+    rows = db.table("submissions").select("*").eq("suiteRunId", suite_run["id"]).execute().data
+    assert sorted(row["id"] for row in rows) == sorted(suite_run["submissionIds"])
+    assert {row["trials"] for row in rows} == {2}
+    events = db.table("submission_events").select("*").in_("submissionId", suite_run["submissionIds"]).execute().data
+    assert {event["toStatus"] for event in events} == {"QUEUED"} and len(events) == 5
+    # Heartbeated from creation, so recovery can't take them before dispatch
+    assert set(suite_run["submissionIds"]) <= evaluation_scheduler._pending
+    for submission_id in suite_run["submissionIds"]:
+        evaluation_scheduler.forget(submission_id)
+
+
+def test_dispatch_runs_on_the_bounded_pool(db, agent, monkeypatch):
+    monkeypatch.setattr(suite_run_service, "_workers", None)
+    monkeypatch.setattr(suite_run_service.settings, "EVALUATION_MAX_CONCURRENCY", 2)
+    service = SuiteRunService()
+    suite_run = service.create_suite_run(agent["userId"], agent["id"], _tasks(6))
+
+    lock, running, peak, threads = threading.Lock(), [0], [0], set()
+    done = threading.Semaphore(0)
+
+    def process(submission_id, options=None, claimed=False):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            threads.add(threading.current_thread().name)
+        db.table("submissions").update({"status": "COMPLETED"}).eq("id", submission_id).execute()
+        db.table("evaluation_results").insert({"id": str(uuid.uuid4()), "submissionId": submission_id, "score": 60.0, "accuracy": 1.0, "timeTaken": 10}).execute()
+        evaluation_scheduler.forget(submission_id)
+        with lock:
+            running[0] -= 1
+        done.release()
+
+    monkeypatch.setattr(service.submission_service, "process_submission", process)
+    service.dispatch(suite_run["submissionIds"])
+    for _ in suite_run["submissionIds"]:
+        assert done.acquire(timeout=5)
+
+    assert peak[0] <= 2
+    assert all(name.startswith("suite") for name in threads)
+    suite_run_service._suite_workers().shutdown(wait=True)
+
+    summary = service.get_suite_run(uuid.UUID(suite_run["id"]))
+    assert summary["status"] == COMPLETED
+    assert summary["completed"] == 6
+    assert summary["compositeScore"] == pytest.approx(60.0)
+
+
+def test_failed_tasks_count_as_zero(db, agent):
+    service = SuiteRunService()
+    suite_run = service.create_suite_run(agent["userId"], agent["id"], _tasks(2))
+    completed, failed = suite_run["submissionIds"]
+    db.table("submissions").update({"status": "COMPLETED"}).eq("id", completed).execute()
+    db.table("evaluation_results").insert({"id": str(uuid.uuid4()), "submissionId": completed, "score": 80.0, "accuracy": 1.0, "timeTaken": 5}).execute()
+    summary = service.get_suite_run(uuid.UUID(suite_run["id"]))
+    assert summary["status"] == RUNNING and summary["compositeScore"] == pytest.approx(80.0)
+
+    db.table("submissions").update({"status": "FAILED"}).eq("id", failed).execute()
+    summary = service.get_suite_run(uuid.UUID(suite_run["id"]))
+    assert summary["status"] == COMPLETED
+    assert summary["compositeScore"] == pytest.approx(40.0)
+    assert summary["failed"] == 1
+    for submission_id in suite_run["submissionIds"]:
+        evaluation_scheduler.forget(submission_id)
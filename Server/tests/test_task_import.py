@@ -0,0 +1,101 @@
+import json
+import pytest
+from fastapi import HTTPException
+from app.services.task_service import TaskService, decode_import
+
+
+def _task(title="Find a price", **fields):
+    return {
+        "title": title,
+        "description": "Look up the price",
+        "difficulty": "EASY",
+        "webArenaEnvironment": "shopping",
+        "environmentConfig": {"startUrl": "https://shop.example.com", "objective": "Find the price"},
+        **fields
+    }
+
+
+def test_parse_import_reads_json_arrays():
+    items, errors = TaskService()._parse_import(json.dumps([_task("a"), _task("b")]))
+    assert errors == []
+    assert [(location, item["title"]) for location, item in items] == [("item 0", "a"), ("item 1", "b")]
+
+
+def test_parse_import_reads_jsonl_and_reports_bad_lines():
+    content = "\n".join([json.dumps(_task("a")), "", "{not json", json.dumps(_task("b"))])
+    items, errors = TaskService()._parse_import(content)
+    assert [location for location, _ in items] == ["line 1", "line 4"]
+    assert [error["location"] for error in errors] == ["line 3"]
+    assert errors[0]["message"].startswith("Invalid JSON")
+
+
+def test_parse_import_reports_broken_arrays():
+    items, errors = TaskService()._parse_import('[{"title": "a"},\n{"title": }]')
+    assert items == []
+    assert errors[0]["location"] == "line 2"
+
+
+def test_decode_import_accepts_utf16_with_bom():
+    text = json.dumps([_task()])
+    assert decode_import(text.encode("utf-16")) == text
+    assert decode_import(b"\xef\xbb\xbf" + text.encode()) == text
+    with pytest.raises(HTTPException):
+        decode_import(b"\xc3\x28")
+
+
+def test_import_reports_every_invalid_definition(db):
+    content = json.dumps([_task(), _task(difficulty="TRIVIAL"), {"title": "no fields"}])
+    with pytest.raises(HTTPException) as error:
+        TaskService().import_tasks(content)
+    assert error.value.status_code == 422
+    assert {e["location"] for e in error.value.detail["errors"]} == {"item 1", "item 2"}
+    assert db.table("tasks").select("*").execute().data == []
+
+
+def test_import_writes_in_chunks(db):
+    result = TaskService().import_tasks(json.dumps([_task(str(i)) for i in range(5)]), chunk_size=2)
+    assert result["created"] == 5
+    assert len(db.table("tasks").select("*").execute().data) == 5
+
+
+class _FailingTable:
+    def __init__(self, table, failures):
+        self._table = table
+        self._failures = failures
+
+    def insert(self, rows):
+        self._failures["inserts"] -= 1
+        if self._failures["inserts"] < 0:
+            raise RuntimeError("insert failed")
+        return self._table.insert(rows)
+
+    def delete(self):
+        self._failures["deletes"] -= 1
+        if self._failures["deletes"] < 0:
+            raise RuntimeError("delete failed")
+        return self._table.delete()
+
+
+def _failing_service(db, inserts, deletes):
+    service = TaskService()
+    failures = {"inserts": inserts, "deletes": deletes}
+    service._db = type("FailingClient", (), {"table": staticmethod(lambda name: _FailingTable(db.table(name), failures))})()
+    return service
+
+
+def test_failed_import_is_rolled_back(db):
+    service = _failing_service(db, inserts=2, deletes=10)
+    with pytest.raises(HTTPException) as error:
+        service.import_tasks(json.dumps([_task(str(i)) for i in range(5)]), chunk_size=2)
+    assert error.value.status_code == 500
+    assert "nothing was imported" in error.value.detail
+    assert db.table("tasks").select("*").execute().data == []
+
+
+def test_failed_rollback_reports_the_tasks_left_behind(db):
+    service = _failing_service(db, inserts=2, deletes=1)
+    with pytest.raises(HTTPException) as error:
+        service.import_tasks(json.dumps([_task(str(i)) for i in range(5)]), chunk_size=2)
+    remaining = error.value.detail["remainingTaskIds"]
+    assert len(remaining) == 2
+    assert sorted(row["id"] for row in db.table("tasks").select("*").execute().data) == sorted(remaining)
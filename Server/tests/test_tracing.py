@@ -0,0 +1,91 @@
+import json
+import threading
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core import tracing
+from app.core.config import settings
+
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch):
+    monkeypatch.setattr(settings, "TRACING_ENABLED", True)
+    monkeypatch.setattr(settings, "TRACING_EXPORT_FILE", "")
+    monkeypatch.setattr(settings, "TRACING_OTLP_ENDPOINT", "")
+    monkeypatch.setattr(tracing, "_exporter", None)
+
+
+def test_nested_spans_share_the_trace():
+    with tracing.start_span("parent") as parent:
+        with tracing.start_span("child", {"skipped": None, "kept": 1}) as child:
+            assert tracing.current_span() is child
+            assert tracing.inject_headers({"A": "b"}) == {"A": "b", "traceparent": child.traceparent}
+        assert tracing.current_span() is parent
+
+    assert child.trace_id == parent.trace_id
+    assert child.parent_span_id == parent.span_id
+    assert child.attributes == {"kept": 1}
+    assert tracing.current_span() is None
+
+
+def test_exceptions_mark_the_span_as_failed():
+    @tracing.traced()
+    def fail():
+        captured.append(tracing.current_span())
+        raise ValueError("boom")
+
+    captured = []
+    with pytest.raises(ValueError):
+        fail()
+    assert captured[0].name.endswith("fail")
+    assert captured[0].to_otlp()["status"] == {"code": 2, "message": "ValueError: boom"}
+
+
+def test_propagate_continues_the_trace_on_another_thread():
+    seen = []
+
+    def background():
+        with tracing.start_span("background") as span:
+            seen.append(span)
+
+    with tracing.start_span("request") as request_span:
+        work = tracing.propagate(background)
+    thread = threading.Thread(target=work)
+    thread.start()
+    thread.join(5)
+    assert seen[0].trace_id == request_span.trace_id
+    assert seen[0].parent_span_id == request_span.span_id
+
+
+def test_disabled_tracing_yields_no_span(monkeypatch):
+    monkeypatch.setattr(settings, "TRACING_ENABLED", False)
+    with tracing.start_span("ignored") as span:
+        assert span is None
+    assert tracing.inject_headers({}) == {}
+
+
+def test_middleware_continues_an_incoming_trace():
+    app = FastAPI()
+    app.middleware("http")(tracing.tracing_middleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        return {"traceparent": tracing.current_span().traceparent}
+
+    incoming = f"00-{'a' * 32}-{'b' * 16}-01"
+    response = TestClient(app).get("/items/1", headers={"traceparent": incoming})
+    assert response.headers["traceparent"].startswith(f"00-{'a' * 32}-")
+    assert response.json()["traceparent"] == response.headers["traceparent"]
+
+
+def test_exporter_writes_otlp_json(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    with tracing.start_span("exported", {"count": 2, "ok": True}) as span:
+        pass
+    tracing._BatchExporter(str(path), "", "realevals")._write([span])
+
+    exported = json.loads(path.read_text())["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert exported["name"] == "exported"
+    assert exported["traceId"] == span.trace_id
+    assert {"key": "count", "value": {"intValue": "2"}} in exported["attributes"]
+    assert {"key": "ok", "value": {"boolValue": True}} in exported["attributes"]
@@ -0,0 +1,60 @@
+import math
+import pytest
+from app.models.enums import EvaluationStatus
+from app.services import trial_stats
+from app.services.rescore_service import RescoreService
+
+
+def test_summarize_uses_student_t_interval():
+    stats = trial_stats.summarize([70.0, 80.0, 90.0])
+    assert stats["mean"] == pytest.approx(80.0)
+    assert stats["variance"] == pytest.approx(100.0)
+    assert stats["ciHalfWidth"] == pytest.approx(4.303 * 10 / math.sqrt(3))
+    assert stats["ciLow"] == pytest.approx(80.0 - stats["ciHalfWidth"])
+
+
+def test_summarize_single_value_has_no_interval():
+    stats = trial_stats.summarize([42.0])
+    assert stats["mean"] == 42.0
+    assert stats["variance"] is None and stats["ciHalfWidth"] is None
+
+
+def test_t_critical_falls_back_to_normal():
+    assert trial_stats.t_critical(0) == math.inf
+    assert trial_stats.t_critical(1) == 12.706
+    assert trial_stats.t_critical(100) == 1.960
+
+
+def test_score_half_width_needs_two_runs():
+    assert trial_stats.score_half_width([{"score": 50}]) is None
+    assert trial_stats.score_half_width([{"score": 50}, {"score": 50}]) == 0
+
+
+def _run(output, duration=30):
+    return {
+        "status": EvaluationStatus.SUCCESS,
+        "score": 0,
+        "accuracy": 0,
+        "timeTaken": duration,
+        "resultDetails": {"output": output, "steps": [{}] * 5}
+    }
+
+
+def test_rescore_re_aggregates_every_trial_run():
+    config = {"expectedResults": {"price": 10}, "maxTimeAllowed": 60, "timeWeight": 0.3, "accuracyWeight": 0.7}
+    evaluation = {
+        "id": "evaluation",
+        "status": EvaluationStatus.SUCCESS,
+        "score": 0,
+        "accuracy": 0,
+        "resultDetails": {"trials": {"requested": 2, "runs": [_run({"price": 10}), _run({"price": 11})]}}
+    }
+
+    rescored = RescoreService()._rescore_trials(evaluation, config)
+
+    runs = rescored["resultDetails"]["trials"]["runs"]
+    assert [run["score"] for run in runs] == [pytest.approx(85.0), pytest.approx(15.0)]
+    assert rescored["score"] == pytest.approx(50.0)
+    assert rescored["accuracy"] == pytest.approx(0.5)
+    assert rescored["resultDetails"]["trials"]["score"]["mean"] == pytest.approx(50.0)
+    assert rescored["resultDetails"]["trials"]["requested"] == 2
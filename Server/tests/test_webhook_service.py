@@ -0,0 +1,88 @@
+import hashlib
+import hmac
+import socket
+import uuid
+import pytest
+from fastapi import HTTPException
+from app.core.config import settings
+from app.services import webhook_service
+from app.services.webhook_service import WebhookService, check_url, sign
+
+
+@pytest.fixture
+def resolve(monkeypatch):
+    """Make every host resolve to the addresses set on the returned dict"""
+    answers = {"addresses": ["93.184.216.34"]}
+
+    def getaddrinfo(host, port, *args, **kwargs):
+        if host.endswith(".invalid"):
+            raise socket.gaierror("Name or service not known")
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port)) for address in answers["addresses"]]
+
+    monkeypatch.setattr(webhook_service.socket, "getaddrinfo", getaddrinfo)
+    monkeypatch.setattr(settings, "WEBHOOK_ALLOW_PRIVATE_URLS", False)
+    return answers
+
+
+def test_sign_is_hmac_sha256_of_timestamp_and_body():
+    body = b'{"events":[]}'
+    expected = hmac.new(b"whsec_test", b"1700000000." + body, hashlib.sha256).hexdigest()
+    assert sign("whsec_test", 1700000000, body) == f"t=1700000000,v1={expected}"
+    assert sign("whsec_other", 1700000000, body) != sign("whsec_test", 1700000000, body)
+    assert sign("whsec_test", 1700000001, body) != sign("whsec_test", 1700000000, body)
+
+
+def test_check_url_accepts_public_https(resolve):
+    check_url("https://hooks.example.com/realevals")
+
+
+@pytest.mark.parametrize("url", ["http://hooks.example.com/", "ftp://hooks.example.com/", "https:///path"])
+def test_check_url_rejects_non_https(resolve, url):
+    with pytest.raises(ValueError):
+        check_url(url)
+
+
+@pytest.mark.parametrize("address", [
+    "127.0.0.1", "10.0.0.5", "172.16.0.1", "192.168.1.1", "169.254.169.254", "0.0.0.0",
+    "::1", "fe80::1", "fd00::1", "::ffff:127.0.0.1", "224.0.0.1"
+])
+def test_check_url_rejects_internal_addresses(resolve, address):
+    resolve["addresses"] = ["93.184.216.34", address]
+    with pytest.raises(ValueError, match="not a public address"):
+        check_url("https://hooks.example.com/")
+
+
+def test_check_url_rejects_unresolvable_hosts(resolve):
+    with pytest.raises(ValueError, match="Could not resolve"):
+        check_url("https://nowhere.invalid/")
+
+
+def test_private_urls_can_be_allowed_for_local_development(resolve, monkeypatch):
+    monkeypatch.setattr(settings, "WEBHOOK_ALLOW_PRIVATE_URLS", True)
+    resolve["addresses"] = ["127.0.0.1"]
+    check_url("http://localhost:8000/hook")
+
+
+def test_registration_rejects_blocked_urls(db, resolve):
+    resolve["addresses"] = ["169.254.169.254"]
+    with pytest.raises(HTTPException) as error:
+        WebhookService().create_webhook(uuid.uuid4(), "https://metadata.example.com/")
+    assert error.value.status_code == 400
+    assert db.table("webhooks").select("*").execute().data == []
+
+
+def test_list_deliveries_pages_newest_first(db, resolve):
+    user_id = uuid.uuid4()
+    service = WebhookService()
+    webhook = service.create_webhook(user_id, "https://hooks.example.com/")
+    for attempt in range(30):
+        db.table("webhook_deliveries").insert({
+            "id": str(uuid.uuid4()),
+            "webhookId": webhook["id"],
+            "attempt": attempt,
+            "attemptedAt": f"2026-01-01T00:00:{attempt:02d}+00:00"
+        }).execute()
+
+    page = service.list_deliveries(uuid.UUID(webhook["id"]), user_id, skip=10, limit=10)
+    assert page["total"] == 30
+    assert [delivery["attempt"] for delivery in page["items"]] == list(range(19, 9, -1))
@@ -0,0 +1,119 @@
+-- Schema for the submissions pipeline: columns added to submissions and the tables around it.
+-- Safe to run more than once.
+
+-- Submission status transitions, for stage latency analytics
+CREATE TABLE IF NOT EXISTS "submission_events" (
+    "id" UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    "submissionId" UUID NOT NULL REFERENCES "submissions" ("id") ON DELETE CASCADE,
+    "taskId" UUID REFERENCES "tasks" ("id"),
+    "agentId" UUID REFERENCES "agents" ("id"),
+    "fromStatus" VARCHAR(50),
+    "toStatus" VARCHAR(50) NOT NULL,
+    "occurredAt" TIMESTAMPTZ NOT NULL DEFAULT now(),
+    "details" JSONB
+);
+
+CREATE INDEX IF NOT EXISTS "submission_events_submission_idx" ON "submission_events" ("submissionId");
+CREATE INDEX IF NOT EXISTS "submission_events_task_idx" ON "submission_events" ("taskId");
+CREATE INDEX IF NOT EXISTS "submission_events_agent_idx" ON "submission_events" ("agentId");
+CREATE INDEX IF NOT EXISTS "submission_events_occurred_at_idx" ON "submission_events" ("occurredAt");
+
+-- Crash recovery: the upstream task of each submission and a heartbeat from the worker running it
+ALTER TABLE "submissions" ADD COLUMN IF NOT EXISTS "browserUseTaskId" VARCHAR;
+ALTER TABLE "submissions" ADD COLUMN IF NOT EXISTS "heartbeatAt" TIMESTAMPTZ;
+ALTER TABLE "submissions" ADD COLUMN IF NOT EXISTS "claimedBy" UUID;
+-- Recovery scans for submissions that are still in flight
+CREATE INDEX IF NOT EXISTS "submissions_status_idx" ON "submissions" ("status");
+
+-- Multi-trial submissions
+ALTER TABLE "submissions" ADD COLUMN IF NOT EXISTS "trials" INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE "submissions" ADD COLUMN IF NOT EXISTS "browserUseTaskIds" JSONB;
+
+-- Suite runs: one agent evaluated across a filtered set of tasks
+CREATE TABLE IF NOT EXISTS "suite_runs" (
+    "id" UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    "userId" UUID NOT NULL REFERENCES "users" ("id"),
+    "agentId" UUID NOT NULL REFERENCES "agents" ("id"),
+    "difficulty" VARCHAR,
+    "webArenaEnvironment" VARCHAR,
+    "trials" INTEGER NOT NULL DEFAULT 1,
+    "taskCount" INTEGER NOT NULL,
+    "status" VARCHAR(50) NOT NULL,
+    "compositeScore" DOUBLE PRECISION,
+    "createdAt" TIMESTAMPTZ NOT NULL DEFAULT now(),
+    "finishedAt" TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS "suite_runs_user_idx" ON "suite_runs" ("userId");
+
+-- Suite filters query tasks by difficulty and environment, which were only kept in the environment JSON
+ALTER TABLE "tasks" ADD COLUMN IF NOT EXISTS "difficulty" VARCHAR(20);
+ALTER TABLE "tasks" ADD COLUMN IF NOT EXISTS "webArenaEnvironment" VARCHAR;
+UPDATE "tasks"
+    SET "difficulty" = "environment"::jsonb ->> 'difficulty',
+        "webArenaEnvironment" = COALESCE("environment"::jsonb ->> 'type', 'default')
+    WHERE "webArenaEnvironment" IS NULL AND "environment" LIKE '{%';
+UPDATE "tasks"
+    SET "webArenaEnvironment" = COALESCE("environment", 'default')
+    WHERE "webArenaEnvironment" IS NULL;
+CREATE INDEX IF NOT EXISTS "tasks_environment_difficulty_idx" ON "tasks" ("webArenaEnvironment", "difficulty");
+
+ALTER TABLE "submissions" ADD COLUMN IF NOT EXISTS "suiteRunId" UUID REFERENCES "suite_runs" ("id");
+CREATE INDEX IF NOT EXISTS "submissions_suite_run_idx" ON "submissions" ("suiteRunId");
+
+-- Idempotent submission intake
+ALTER TABLE "submissions" ADD COLUMN IF NOT EXISTS "idempotencyKey" VARCHAR(255);
+CREATE INDEX IF NOT EXISTS "submissions_user_idempotency_key_idx"
+    ON "submissions" ("userId", "idempotencyKey")
+    WHERE "idempotencyKey" IS NOT NULL;
+
+-- Webhooks notified when submissions complete or fail
+CREATE TABLE IF NOT EXISTS "webhooks" (
+    "id" UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    "userId" UUID NOT NULL REFERENCES "users" ("id"),
+    "url" VARCHAR NOT NULL,
+    "submissionId" UUID REFERENCES "submissions" ("id") ON DELETE CASCADE,
+    "secret" VARCHAR NOT NULL,
+    "active" BOOLEAN NOT NULL DEFAULT TRUE,
+    "createdAt" TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS "webhooks_user_idx" ON "webhooks" ("userId");
+
+CREATE TABLE IF NOT EXISTS "webhook_deliveries" (
+    "id" UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    "webhookId" UUID NOT NULL REFERENCES "webhooks" ("id") ON DELETE CASCADE,
+    "userId" UUID NOT NULL REFERENCES "users" ("id"),
+    "deliveryId" UUID NOT NULL,
+    "eventIds" JSONB NOT NULL,
+    "submissionIds" JSONB NOT NULL,
+    "attempt" INTEGER NOT NULL,
+    "status" VARCHAR(50) NOT NULL,
+    "statusCode" INTEGER,
+    "error" VARCHAR,
+    "durationMs" DOUBLE PRECISION,
+    "attemptedAt" TIMESTAMPTZ NOT NULL DEFAULT now(),
+    "nextAttemptAt" TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS "webhook_deliveries_webhook_idx" ON "webhook_deliveries" ("webhookId", "attemptedAt");
+CREATE INDEX IF NOT EXISTS "webhook_deliveries_delivery_idx" ON "webhook_deliveries" ("deliveryId");
+
+-- Copy of the evaluation score, so submissions can be filtered and sorted by it without a join
+ALTER TABLE "submissions" ADD COLUMN IF NOT EXISTS "score" DOUBLE PRECISION;
+
+-- Submission search (GET /submissions/search) pages with keyset cursors on (sort column, id).
+-- Equality filters lead, then the sort column, then id as the tie-breaker.
+CREATE INDEX IF NOT EXISTS "submissions_user_submitted_idx" ON "submissions" ("userId", "submittedAt", "id");
+CREATE INDEX IF NOT EXISTS "submissions_user_task_submitted_idx" ON "submissions" ("userId", "taskId", "submittedAt", "id");
+CREATE INDEX IF NOT EXISTS "submissions_user_agent_submitted_idx" ON "submissions" ("userId", "agentId", "submittedAt", "id");
+CREATE INDEX IF NOT EXISTS "submissions_user_status_submitted_idx" ON "submissions" ("userId", "status", "submittedAt", "id");
+CREATE INDEX IF NOT EXISTS "submissions_user_score_idx" ON "submissions" ("userId", "score", "id");
+CREATE INDEX IF NOT EXISTS "submissions_user_task_score_idx" ON "submissions" ("userId", "taskId", "score", "id");
+
+-- Evaluation results and leaderboard entries are fetched for a page of submissions at once
+CREATE INDEX IF NOT EXISTS "evaluation_results_submission_idx" ON "evaluation_results" ("submissionId");
+CREATE INDEX IF NOT EXISTS "leaderboard_submission_idx" ON "leaderboard" ("submissionId");
+
+-- Make PostgREST pick up the new tables and columns
+NOTIFY pgrst, 'reload schema';